@@ -37,15 +37,17 @@ export const useChat = (chatId) => {
 export const useChatMessages = (chatId) => {
     return useInfiniteQuery({
         queryKey: ['chats', chatId, 'messages'],
-        queryFn: async ({ pageParam = 1 }) => {
-            const { data } = await apiClient.get(`/chats/${chatId}/messages/?page=${pageParam}`);
+        queryFn: async ({ pageParam }) => {
+            const query = pageParam ? `?before=${encodeURIComponent(pageParam)}` : '';
+            const { data } = await apiClient.get(`/chats/${chatId}/messages/${query}`);
             return data;
         },
         enabled: !!chatId,
+        // Pages go back in time: the first page holds the latest messages
         getNextPageParam: (lastPage) => {
-            if (lastPage.next) {
-                const url = new URL(lastPage.next);
-                return url.searchParams.get('page');
+            if (lastPage.previous) {
+                const url = new URL(lastPage.previous);
+                return url.searchParams.get('before');
             }
             return undefined;
         },
@@ -19,21 +19,22 @@ export const useListings = (filters = {}) => {
     const safeFilters = cleanFilters(filters);
     return useInfiniteQuery({
         queryKey: ['listings', safeFilters],
-        queryFn: async ({ pageParam = 1 }) => {
+        queryFn: async ({ pageParam }) => {
             const limit = safeFilters.limit ?? 24;
             const rest = { ...safeFilters };
             delete rest.limit;
-            const params = new URLSearchParams({ page: String(pageParam), limit: String(limit), ...rest });
+            const params = new URLSearchParams({ limit: String(limit), ...rest });
+            if (pageParam) params.set('cursor', pageParam);
             const { data } = await apiClient.get(`/listings/?${params}`);
             return data;
         },
-        initialPageParam: 1,
+        initialPageParam: null,
+        // Backend keyset pagination: keyingi sahifa `next` havolasidagi cursor orqali
         getNextPageParam: (lastPage) => {
             if (lastPage?.next) {
                 try {
                     const url = new URL(lastPage.next);
-                    const page = url.searchParams.get('page');
-                    return page ? Number(page) : undefined;
+                    return url.searchParams.get('cursor') || undefined;
                 } catch {
                     return undefined;
                 }
@@ -20,6 +20,7 @@ export const useWebSocket = (url, options = {}) => {
         onError,
         reconnectInterval = 3000,
         maxReconnectAttempts = 5,
+        heartbeatInterval = 20000, // keeps server-side presence alive (expires after 60s)
         protocols = [],
     } = options;
 
@@ -59,6 +60,7 @@ export const useWebSocket = (url, options = {}) => {
             wsRef.current.onmessage = (event) => {
                 try {
                     const data = JSON.parse(event.data);
+                    if (data?.type === 'pong') return;
                     setLastMessage(data);
                     if (onMessage) onMessage(data);
                 } catch {
@@ -122,6 +124,17 @@ export const useWebSocket = (url, options = {}) => {
         return false;
     }, []);
 
+    // Heartbeat while connected
+    useEffect(() => {
+        if (!isConnected || !heartbeatInterval) return undefined;
+        const timer = setInterval(() => {
+            if (wsRef.current?.readyState === WebSocket.OPEN) {
+                wsRef.current.send(JSON.stringify({ type: 'ping' }));
+            }
+        }, heartbeatInterval);
+        return () => clearInterval(timer);
+    }, [isConnected, heartbeatInterval]);
+
     // Auto-connect on mount (defer to avoid sync setState in effect)
     useEffect(() => {
         queueMicrotask(() => connect());
@@ -70,23 +70,33 @@
 
 /**
  * @typedef {Object} Chat
- * @property {number} id
- * @property {User[]} participants
- * @property {Message|null} last_message
+ * @property {string} id
+ * @property {User|null} counterpart
+ * @property {{online: boolean, last_seen: number|null}|null} counterpart_presence
+ * @property {string} last_message_preview
+ * @property {string|null} last_message_at
  * @property {number} unread_count
- * @property {string} updated_at
+ * @property {string} activity_at
  */
 
 /**
  * @typedef {Object} Message
- * @property {number} id
- * @property {number} chat_id
- * @property {User} sender
- * @property {string} text
+ * @property {string} id
+ * @property {string} sender - user id, see MessagePage.senders
+ * @property {string} content
+ * @property {string} message_type
  * @property {boolean} is_read
  * @property {string} created_at
  */
 
+/**
+ * @typedef {Object} MessagePage
+ * @property {Message[]} results - oldest first
+ * @property {Object<string, User>} senders
+ * @property {string|null} previous - older messages (?before=)
+ * @property {string|null} next - newer messages (?after=)
+ */
+
 /**
  * @typedef {Object} Notification
  * @property {number} id
@@ -19,7 +19,12 @@ export default function ChatRoomPage() {
     const { data: messagesData, isLoading } = useChatMessages(roomId);
     const sendMessageMutation = useSendMessage(roomId);
 
-    const messages = messagesData?.pages?.flatMap((p) => p.results ?? p) ?? [];
+    // Oldest page first; senders are sent once per page and looked up by id
+    const messages = [...(messagesData?.pages ?? [])]
+        .reverse()
+        .flatMap((p) =>
+            (p.results ?? []).map((m) => ({ ...m, sender: p.senders?.[m.sender] ?? { id: m.sender } })),
+        );
 
     const handleSend = (e) => {
         e.preventDefault();
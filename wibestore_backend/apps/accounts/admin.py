@@ -2,15 +2,37 @@
 WibeStore Backend - Accounts Admin
 """
 
+from django import forms
 from django.contrib import admin
 from django.contrib.auth import get_user_model
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.contrib.auth.forms import UserChangeForm
 
 from apps.accounts.models import PasswordHistory, Referral, TelegramRegistrationCode
+from apps.payments.ledger import BalanceLedger
 
 User = get_user_model()
 
 
+class UserAdminChangeForm(UserChangeForm):
+    """Balance is read-only; changes are posted to the ledger as adjustments."""
+
+    balance_adjustment = forms.DecimalField(
+        required=False,
+        max_digits=15,
+        decimal_places=2,
+        help_text="Signed amount to add to the balance (posted as a ledger adjustment).",
+    )
+    adjustment_reason = forms.CharField(required=False, max_length=200)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        amount = cleaned_data.get("balance_adjustment")
+        if amount and self.instance.balance + amount < 0:
+            self.add_error("balance_adjustment", "The balance cannot go negative.")
+        return cleaned_data
+
+
 @admin.register(PasswordHistory)
 class PasswordHistoryAdmin(admin.ModelAdmin):
     list_display = ["user", "created_at"]
@@ -50,6 +72,7 @@ class UserAdmin(BaseUserAdmin):
             "Marketplace",
             {"fields": ("rating", "total_sales", "total_purchases", "balance", "referral_code")},
         ),
+        ("Balance Adjustment", {"fields": ("balance_adjustment", "adjustment_reason")}),
         (
             "Permissions",
             {"fields": ("is_active", "is_staff", "is_superuser", "is_verified", "groups", "user_permissions")},
@@ -57,7 +80,8 @@ class UserAdmin(BaseUserAdmin):
         ("Dates", {"fields": ("last_login", "created_at", "deleted_at")}),
     )
 
-    readonly_fields = ["created_at", "last_login"]
+    form = UserAdminChangeForm
+    readonly_fields = ["created_at", "last_login", "balance"]
 
     add_fieldsets = (
         (
@@ -69,6 +93,25 @@ class UserAdmin(BaseUserAdmin):
         ),
     )
 
+    def save_model(self, request, obj, form, change):
+        if not change:
+            return super().save_model(request, obj, form, change)
+        # Never write the balance column: ledger postings update it with F()
+        fields = [
+            field.attname
+            for field in obj._meta.concrete_fields
+            if not field.primary_key and field.name != "balance"
+        ]
+        obj.save(update_fields=fields)
+        amount = form.cleaned_data.get("balance_adjustment")
+        if amount:
+            reason = form.cleaned_data.get("adjustment_reason") or "Admin adjustment"
+            description = f"{reason} (by {request.user.email})"
+            if amount > 0:
+                BalanceLedger.credit(obj, amount, "adjustment", description)
+            else:
+                BalanceLedger.debit(obj, -amount, "adjustment", description)
+
 
 @admin.register(TelegramRegistrationCode)
 class TelegramRegistrationCodeAdmin(admin.ModelAdmin):
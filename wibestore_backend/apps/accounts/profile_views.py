@@ -13,6 +13,7 @@ from apps.marketplace.serializers import ListingSerializer, FavoriteListSerializ
 from apps.notifications.models import Notification
 from apps.notifications.serializers import NotificationSerializer
 from apps.payments.models import EscrowTransaction
+from core.profiling import SerializerTimingMixin
 
 from .serializers import UserSerializer, UserProfileUpdateSerializer
 
@@ -35,26 +36,32 @@ class ProfileView(generics.RetrieveUpdateAPIView):
 
 
 @extend_schema(tags=["Profile"])
-class MyListingsView(generics.ListAPIView):
+class MyListingsView(SerializerTimingMixin, generics.ListAPIView):
     """GET /api/v1/profile/listings/ — Current user's listings."""
 
     serializer_class = ListingSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Listing.objects.filter(seller=self.request.user).select_related("game")
+        return (
+            Listing.objects.filter(seller=self.request.user)
+            .select_related("game", "seller")
+            .prefetch_related("images")
+        )
 
 
 @extend_schema(tags=["Profile"])
-class MyFavoritesView(generics.ListAPIView):
+class MyFavoritesView(SerializerTimingMixin, generics.ListAPIView):
     """GET /api/v1/profile/favorites/ — Current user's favorites."""
 
     serializer_class = FavoriteListSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Favorite.objects.filter(user=self.request.user).select_related(
-            "listing__game", "listing__seller"
+        return (
+            Favorite.objects.filter(user=self.request.user)
+            .select_related("listing__game", "listing__seller")
+            .prefetch_related("listing__images")
         )
 
 
@@ -139,6 +139,13 @@ class UserProfileUpdateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("This username is already taken.")
         return value
 
+    def update(self, instance, validated_data):
+        # Only the edited columns: a full save would write back a stale balance
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        instance.save(update_fields=[*validated_data, "updated_at"])
+        return instance
+
 
 class PasswordResetRequestSerializer(serializers.Serializer):
     """Serializer for password reset request."""
@@ -304,11 +304,11 @@ class UserService:
 
     @staticmethod
     def update_profile(user: User, **kwargs) -> User:
-        """Update user profile."""
-        for key, value in kwargs.items():
-            if hasattr(user, key):
-                setattr(user, key, value)
-        user.save()
+        """Update user profile (the ledger-owned balance is never written here)."""
+        fields = [key for key in kwargs if hasattr(user, key) and key != "balance"]
+        for key in fields:
+            setattr(user, key, kwargs[key])
+        user.save(update_fields=[*fields, "updated_at"])
         logger.info("Profile updated for: %s", user.email)
         return user
 
@@ -0,0 +1 @@
+# Admin panel management commands
@@ -0,0 +1,27 @@
+"""
+WibeStore Backend - Backfill Daily Statistics
+Capture DailyStatistics rows for past days, e.g. right after deploying the
+dashboard snapshots (the beat task also fills gaps in the last 30 days).
+
+Usage:
+    python manage.py backfill_daily_statistics --days 90
+    python manage.py backfill_daily_statistics --days 7 --force
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.admin_panel.services import BACKFILL_DAYS, StatisticsService
+
+
+class Command(BaseCommand):
+    help = "Capture daily dashboard statistics for past days"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=BACKFILL_DAYS)
+        parser.add_argument(
+            "--force", action="store_true", help="Recapture days that already have a row"
+        )
+
+    def handle(self, *args, **options):
+        captured = StatisticsService.backfill(options["days"], force=options["force"])
+        self.stdout.write(self.style.SUCCESS(f"Captured {len(captured)} day(s)."))
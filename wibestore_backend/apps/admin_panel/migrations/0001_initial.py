@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:55
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyStatistics",
+            fields=[
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                ("date", models.DateField(unique=True)),
+                ("new_users", models.PositiveIntegerField(default=0)),
+                ("new_listings", models.PositiveIntegerField(default=0)),
+                ("listings_sold", models.PositiveIntegerField(default=0)),
+                (
+                    "transactions_volume",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=18),
+                ),
+                ("sales_volume", models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ("commission", models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ("escrows_completed", models.PositiveIntegerField(default=0)),
+                (
+                    "escrow_commission",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=18),
+                ),
+                ("new_reviews", models.PositiveIntegerField(default=0)),
+                ("new_reports", models.PositiveIntegerField(default=0)),
+                ("suspicious_resolved", models.PositiveIntegerField(default=0)),
+                ("total_users", models.PositiveIntegerField(default=0)),
+                ("verified_users", models.PositiveIntegerField(default=0)),
+                ("total_listings", models.PositiveIntegerField(default=0)),
+                ("active_listings", models.PositiveIntegerField(default=0)),
+                ("pending_listings", models.PositiveIntegerField(default=0)),
+                ("average_rating", models.DecimalField(decimal_places=2, default=0, max_digits=3)),
+                ("is_final", models.BooleanField(default=False)),
+            ],
+            options={
+                "verbose_name": "Daily Statistics",
+                "verbose_name_plural": "Daily Statistics",
+                "db_table": "daily_statistics",
+                "ordering": ["-date"],
+            },
+        ),
+    ]
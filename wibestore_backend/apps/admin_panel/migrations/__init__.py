@@ -0,0 +1 @@
+# Migrations for admin_panel app
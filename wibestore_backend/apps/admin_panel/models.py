@@ -0,0 +1,51 @@
+"""
+WibeStore Backend - Admin Panel Models
+"""
+
+from django.db import models
+
+from core.models import BaseModel
+
+
+class DailyStatistics(BaseModel):
+    """
+    Platform statistics for one calendar day (local time).
+
+    Written by the calculate_daily_statistics beat task: today's row is refreshed
+    on every run and closed (``is_final``) once the day is over. Flow fields count
+    what happened during the day; totals are point-in-time values as of ``updated_at``.
+    """
+
+    date = models.DateField(unique=True)
+
+    # Flows during the day
+    new_users = models.PositiveIntegerField(default=0)
+    new_listings = models.PositiveIntegerField(default=0)
+    listings_sold = models.PositiveIntegerField(default=0)
+    transactions_volume = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    sales_volume = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    commission = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    escrows_completed = models.PositiveIntegerField(default=0)
+    escrow_commission = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    new_reviews = models.PositiveIntegerField(default=0)
+    new_reports = models.PositiveIntegerField(default=0)
+    suspicious_resolved = models.PositiveIntegerField(default=0)
+
+    # Totals at capture time
+    total_users = models.PositiveIntegerField(default=0)
+    verified_users = models.PositiveIntegerField(default=0)
+    total_listings = models.PositiveIntegerField(default=0)
+    active_listings = models.PositiveIntegerField(default=0)
+    pending_listings = models.PositiveIntegerField(default=0)
+    average_rating = models.DecimalField(max_digits=3, decimal_places=2, default=0)
+
+    is_final = models.BooleanField(default=False)
+
+    class Meta:
+        db_table = "daily_statistics"
+        ordering = ["-date"]
+        verbose_name = "Daily Statistics"
+        verbose_name_plural = "Daily Statistics"
+
+    def __str__(self) -> str:
+        return f"Statistics for {self.date}"
@@ -0,0 +1,232 @@
+"""
+WibeStore Backend - Admin Panel Services
+"""
+
+import logging
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Avg, Count, Q, Sum
+from django.utils import timezone
+
+from apps.marketplace.models import Listing
+from apps.payments.models import EscrowTransaction, Transaction
+from apps.reports.models import Report, SuspiciousActivity
+from apps.reviews.models import Review
+
+from .models import DailyStatistics
+
+logger = logging.getLogger("apps.admin_panel")
+
+User = get_user_model()
+
+LIVE_COUNTERS_CACHE_KEY = "admin_panel:live_counters"
+LIVE_COUNTERS_TTL = 60  # seconds
+BACKFILL_DAYS = 30  # the longest dashboard window
+
+
+def _day_bounds(day) -> tuple[datetime, datetime]:
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def _zero(value) -> Decimal | int:
+    return value if value is not None else 0
+
+
+class StatisticsService:
+    """
+    Admin statistics.
+
+    Live counters (current totals by status) are computed with one conditional
+    aggregate per table and cached briefly; rolling windows ("this week", "this
+    month") are summed from DailyStatistics rows.
+    """
+
+    @staticmethod
+    def capture_day(day, *, final: bool = False) -> DailyStatistics:
+        """Compute and store the statistics row for ``day`` (one query per table)."""
+        start, end = _day_bounds(day)
+        in_day = {"created_at__gte": start, "created_at__lt": end}
+
+        users = User.objects.aggregate(
+            new=Count("id", filter=Q(**in_day)),
+            total=Count("id", filter=Q(is_active=True)),
+            verified=Count("id", filter=Q(is_verified=True)),
+        )
+        listings = Listing.objects.aggregate(
+            new=Count("id", filter=Q(**in_day)),
+            sold=Count("id", filter=Q(sold_at__gte=start, sold_at__lt=end)),
+            total=Count("id"),
+            active=Count("id", filter=Q(status="active")),
+            pending=Count("id", filter=Q(status="pending")),
+        )
+        processed_in_day = Q(status="completed", processed_at__gte=start, processed_at__lt=end)
+        transactions = Transaction.objects.aggregate(
+            volume=Sum("amount", filter=Q(status="completed", **in_day)),
+            sales=Sum("amount", filter=processed_in_day & Q(type="purchase")),
+            commission=Sum("amount", filter=processed_in_day & Q(type="commission")),
+        )
+        confirmed_in_day = Q(
+            status="confirmed", buyer_confirmed_at__gte=start, buyer_confirmed_at__lt=end
+        )
+        escrow = EscrowTransaction.objects.aggregate(
+            completed=Count("id", filter=confirmed_in_day),
+            commission=Sum("commission_amount", filter=confirmed_in_day),
+        )
+        reviews = Review.objects.aggregate(
+            new=Count("id", filter=Q(**in_day)), average=Avg("rating")
+        )
+        new_reports = Report.objects.filter(**in_day).count()
+        suspicious_resolved = SuspiciousActivity.objects.filter(
+            resolved=True, resolved_at__gte=start, resolved_at__lt=end
+        ).count()
+
+        stats, _ = DailyStatistics.objects.update_or_create(
+            date=day,
+            defaults={
+                "new_users": users["new"],
+                "new_listings": listings["new"],
+                "listings_sold": listings["sold"],
+                "transactions_volume": _zero(transactions["volume"]),
+                "sales_volume": _zero(transactions["sales"]),
+                "commission": _zero(transactions["commission"]),
+                "escrows_completed": escrow["completed"],
+                "escrow_commission": _zero(escrow["commission"]),
+                "new_reviews": reviews["new"],
+                "new_reports": new_reports,
+                "suspicious_resolved": suspicious_resolved,
+                "total_users": users["total"],
+                "verified_users": users["verified"],
+                "total_listings": listings["total"],
+                "active_listings": listings["active"],
+                "pending_listings": listings["pending"],
+                "average_rating": round(Decimal(_zero(reviews["average"])), 2),
+                "is_final": final,
+            },
+        )
+        return stats
+
+    @staticmethod
+    def backfill(days: int = BACKFILL_DAYS, *, force: bool = False) -> list:
+        """
+        Capture closed rows for the ``days`` finished days before today that have
+        none (all of them with ``force``); returns the dates captured.
+
+        Flow fields are exact for any past day; snapshot fields (totals) of a
+        backfilled row reflect the moment of the backfill.
+        """
+        today = timezone.localdate()
+        wanted = [today - timedelta(days=offset) for offset in range(1, days + 1)]
+        if not force:
+            existing = set(
+                DailyStatistics.objects.filter(date__in=wanted).values_list("date", flat=True)
+            )
+            wanted = [day for day in wanted if day not in existing]
+        for day in sorted(wanted):
+            StatisticsService.capture_day(day, final=True)
+        if wanted:
+            logger.info("Backfilled daily statistics for %d day(s)", len(wanted))
+        return wanted
+
+    @staticmethod
+    def refresh() -> DailyStatistics:
+        """
+        Refresh today's row, closing any earlier days that are still open and
+        backfilling missing days of the dashboard windows.
+        """
+        today = timezone.localdate()
+        for stats in DailyStatistics.objects.filter(date__lt=today, is_final=False):
+            StatisticsService.capture_day(stats.date, final=True)
+        StatisticsService.backfill()
+        return StatisticsService.capture_day(today)
+
+    @staticmethod
+    def get_window_totals() -> dict:
+        """
+        Flows summed over the last 7 and 30 days (today included), one query.
+        Rows are written only by the calculate_daily_statistics beat task.
+        """
+        today = timezone.localdate()
+        week = Q(date__gt=today - timedelta(days=7))
+        month = Q(date__gt=today - timedelta(days=30))
+        totals = DailyStatistics.objects.filter(date__lte=today).aggregate(
+            new_users_week=Sum("new_users", filter=week),
+            new_users_month=Sum("new_users", filter=month),
+            transactions_volume_month=Sum("transactions_volume", filter=month),
+            suspicious_resolved_week=Sum("suspicious_resolved", filter=week),
+        )
+        return {key: _zero(value) for key, value in totals.items()}
+
+    @staticmethod
+    def get_live_counters() -> dict:
+        """Current totals by status, one query per table, cached for a minute."""
+        counters = cache.get(LIVE_COUNTERS_CACHE_KEY)
+        if counters is not None:
+            return counters
+
+        counters = {
+            "users": User.objects.aggregate(
+                total=Count("id", filter=Q(is_active=True)),
+                verified=Count("id", filter=Q(is_verified=True)),
+            ),
+            "listings": Listing.objects.aggregate(
+                total=Count("id"),
+                active=Count("id", filter=Q(status="active")),
+                pending=Count("id", filter=Q(status="pending")),
+                sold=Count("id", filter=Q(status="sold")),
+            ),
+            "transactions": Transaction.objects.aggregate(
+                total_volume=Sum("amount", filter=Q(status="completed")),
+            ),
+            "escrow": EscrowTransaction.objects.aggregate(
+                active=Count("id", filter=Q(status__in=["pending_payment", "paid", "delivered"])),
+                disputed=Count("id", filter=Q(status="disputed")),
+                completed=Count("id", filter=Q(status="confirmed")),
+                total_commission=Sum("commission_amount", filter=Q(status="confirmed")),
+            ),
+            "reports": Report.objects.aggregate(
+                total=Count("id"),
+                pending=Count("id", filter=Q(status="pending")),
+            ),
+            "suspicious": SuspiciousActivity.objects.aggregate(
+                unresolved=Count("id", filter=Q(resolved=False)),
+            ),
+        }
+        counters["transactions"]["total_volume"] = _zero(counters["transactions"]["total_volume"])
+        counters["escrow"]["total_commission"] = _zero(counters["escrow"]["total_commission"])
+        cache.set(LIVE_COUNTERS_CACHE_KEY, counters, LIVE_COUNTERS_TTL)
+        return counters
+
+    @staticmethod
+    def get_dashboard() -> dict:
+        live = StatisticsService.get_live_counters()
+        window = StatisticsService.get_window_totals()
+        return {
+            "users": {
+                "total": live["users"]["total"],
+                "new_this_month": window["new_users_month"],
+                "new_this_week": window["new_users_week"],
+                "verified": live["users"]["verified"],
+            },
+            "listings": live["listings"],
+            "transactions": {
+                "total_volume": live["transactions"]["total_volume"],
+                "month_volume": window["transactions_volume_month"],
+            },
+            "escrow": live["escrow"],
+            "reports": live["reports"],
+        }
+
+    @staticmethod
+    def get_fraud_stats() -> dict:
+        live = StatisticsService.get_live_counters()
+        window = StatisticsService.get_window_totals()
+        return {
+            "suspicious_activities_unresolved": live["suspicious"]["unresolved"],
+            "suspicious_resolved_this_week": window["suspicious_resolved_week"],
+            "escrow_disputed": live["escrow"]["disputed"],
+            "reports_pending": live["reports"]["pending"],
+        }
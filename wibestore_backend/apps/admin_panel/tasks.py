@@ -5,11 +5,8 @@ Admin Panel App - Tasks
 import logging
 from celery import shared_task
 from django.utils import timezone
-from django.db.models import Count, Sum, Avg
 from django.contrib.auth import get_user_model
 from apps.marketplace.models import Listing
-from apps.payments.models import Transaction, EscrowTransaction
-from apps.reviews.models import Review
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -17,86 +14,13 @@ User = get_user_model()
 
 @shared_task
 def calculate_daily_statistics():
-    """Calculate and store daily platform statistics."""
-    today = timezone.now().date()
-    
+    """Refresh today's DailyStatistics row (and close finished days)."""
+    from apps.admin_panel.services import StatisticsService
+
     try:
-        # User statistics
-        total_users = User.objects.count()
-        active_users = User.objects.filter(is_active=True).count()
-        new_users_today = User.objects.filter(
-            created_at__date=today
-        ).count()
-        
-        # Listing statistics
-        total_listings = Listing.objects.count()
-        active_listings = Listing.objects.filter(status='active').count()
-        pending_listings = Listing.objects.filter(status='pending').count()
-        sold_today = Listing.objects.filter(
-            status='sold',
-            updated_at__date=today
-        ).count()
-        
-        # Financial statistics
-        total_sales = Transaction.objects.filter(
-            type='purchase',
-            status='completed'
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        today_revenue = Transaction.objects.filter(
-            type='purchase',
-            status='completed',
-            processed_at__date=today
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        total_commission = Transaction.objects.filter(
-            type='commission',
-            status='completed'
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        # Escrow statistics
-        pending_escrow = EscrowTransaction.objects.filter(
-            status='delivered'
-        ).count()
-        
-        disputed_escrow = EscrowTransaction.objects.filter(
-            status='disputed'
-        ).count()
-        
-        # Review statistics
-        total_reviews = Review.objects.count()
-        avg_rating = Review.objects.aggregate(Avg('rating'))['rating__avg'] or 0
-        new_reviews_today = Review.objects.filter(
-            created_at__date=today
-        ).count()
-        
-        # Log statistics
-        stats = {
-            'date': str(today),
-            'total_users': total_users,
-            'active_users': active_users,
-            'new_users_today': new_users_today,
-            'total_listings': total_listings,
-            'active_listings': active_listings,
-            'pending_listings': pending_listings,
-            'sold_today': sold_today,
-            'total_sales': float(total_sales),
-            'today_revenue': float(today_revenue),
-            'total_commission': float(total_commission),
-            'pending_escrow': pending_escrow,
-            'disputed_escrow': disputed_escrow,
-            'total_reviews': total_reviews,
-            'avg_rating': round(float(avg_rating), 2),
-            'new_reviews_today': new_reviews_today,
-        }
-        
-        logger.info(f"Daily statistics calculated: {stats}")
-        
-        # Here you could save to a DailyStatistics model if needed
-        # For now, just log the statistics
-        
-        return stats
-        
+        stats = StatisticsService.refresh()
+        logger.info(f"Daily statistics updated for {stats.date}")
+        return str(stats.date)
     except Exception as e:
         logger.error(f"Error calculating daily statistics: {e}")
         raise
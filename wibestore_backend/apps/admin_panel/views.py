@@ -2,10 +2,8 @@
 WibeStore Backend - Admin Panel Views (Dashboard API)
 """
 
-from datetime import timedelta
-
 from django.contrib.auth import get_user_model
-from django.db.models import Count, Sum, Q
+from django.db.models import Count, Q
 from django.utils import timezone
 from drf_spectacular.utils import extend_schema
 from rest_framework import generics, permissions, status
@@ -17,10 +15,13 @@ from apps.marketplace.serializers import ListingSerializer
 from apps.marketplace.services import ListingService
 from apps.payments.models import EscrowTransaction, Transaction
 from apps.payments.services import EscrowService
-from apps.reports.models import Report, SuspiciousActivity
+from apps.reports.models import Report
 from apps.reports.serializers import ReportSerializer
+from core.pagination import EstimatedCountPagination
 from core.permissions import IsAdminUser
 
+from .services import StatisticsService
+
 User = get_user_model()
 
 
@@ -31,49 +32,7 @@ class AdminDashboardView(APIView):
     permission_classes = [IsAdminUser]
 
     def get(self, request):
-        now = timezone.now()
-        thirty_days_ago = now - timedelta(days=30)
-        seven_days_ago = now - timedelta(days=7)
-
-        stats = {
-            "users": {
-                "total": User.objects.filter(is_active=True).count(),
-                "new_this_month": User.objects.filter(created_at__gte=thirty_days_ago).count(),
-                "new_this_week": User.objects.filter(created_at__gte=seven_days_ago).count(),
-                "verified": User.objects.filter(is_verified=True).count(),
-            },
-            "listings": {
-                "total": Listing.objects.count(),
-                "active": Listing.objects.filter(status="active").count(),
-                "pending": Listing.objects.filter(status="pending").count(),
-                "sold": Listing.objects.filter(status="sold").count(),
-            },
-            "transactions": {
-                "total_volume": Transaction.objects.filter(
-                    status="completed"
-                ).aggregate(total=Sum("amount"))["total"] or 0,
-                "month_volume": Transaction.objects.filter(
-                    status="completed",
-                    created_at__gte=thirty_days_ago,
-                ).aggregate(total=Sum("amount"))["total"] or 0,
-            },
-            "escrow": {
-                "active": EscrowTransaction.objects.filter(
-                    status__in=["pending_payment", "paid", "delivered"]
-                ).count(),
-                "disputed": EscrowTransaction.objects.filter(status="disputed").count(),
-                "completed": EscrowTransaction.objects.filter(status="confirmed").count(),
-                "total_commission": EscrowTransaction.objects.filter(
-                    status="confirmed"
-                ).aggregate(total=Sum("commission_amount"))["total"] or 0,
-            },
-            "reports": {
-                "pending": Report.objects.filter(status="pending").count(),
-                "total": Report.objects.count(),
-            },
-        }
-
-        return Response({"success": True, "data": stats})
+        return Response({"success": True, "data": StatisticsService.get_dashboard()})
 
 
 @extend_schema(tags=["Admin"])
@@ -83,23 +42,7 @@ class AdminFraudStatsView(APIView):
     permission_classes = [IsAdminUser]
 
     def get(self, request):
-        now = timezone.now()
-        seven_days_ago = now - timedelta(days=7)
-        suspicious_unresolved = SuspiciousActivity.objects.filter(resolved=False).count()
-        suspicious_resolved_week = SuspiciousActivity.objects.filter(
-            resolved=True, resolved_at__gte=seven_days_ago
-        ).count()
-        disputed = EscrowTransaction.objects.filter(status="disputed").count()
-        reports_pending = Report.objects.filter(status="pending").count()
-        return Response({
-            "success": True,
-            "data": {
-                "suspicious_activities_unresolved": suspicious_unresolved,
-                "suspicious_resolved_this_week": suspicious_resolved_week,
-                "escrow_disputed": disputed,
-                "reports_pending": reports_pending,
-            },
-        })
+        return Response({"success": True, "data": StatisticsService.get_fraud_stats()})
 
 
 @extend_schema(tags=["Admin"])
@@ -110,9 +53,12 @@ class AdminPendingListingsView(generics.ListAPIView):
     permission_classes = [IsAdminUser]
 
     def get_queryset(self):
-        return Listing.objects.filter(status="pending").select_related(
-            "game", "seller"
-        ).order_by("created_at")
+        return (
+            Listing.objects.filter(status="pending")
+            .select_related("game", "seller")
+            .prefetch_related("images")
+            .order_by("created_at")
+        )
 
 
 @extend_schema(tags=["Admin"])
@@ -247,6 +193,7 @@ class AdminUsersView(generics.ListAPIView):
     """GET /api/v1/admin/users/ — All users."""
 
     permission_classes = [IsAdminUser]
+    pagination_class = EstimatedCountPagination
 
     def get_queryset(self):
         from apps.accounts.serializers import UserSerializer
@@ -293,6 +240,7 @@ class AdminTransactionsView(generics.ListAPIView):
     """GET /api/v1/admin-panel/transactions/ — All transactions."""
 
     permission_classes = [IsAdminUser]
+    pagination_class = EstimatedCountPagination
 
     def get_queryset(self):
         return Transaction.objects.all().select_related("user").order_by("-created_at")
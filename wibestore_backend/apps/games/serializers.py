@@ -45,6 +45,10 @@ class GameListSerializer(serializers.ModelSerializer):
         read_only_fields = ["active_listings_count"]
 
     def get_active_listings_count(self, obj) -> int:
+        # Listing pages resolve the counts for all their games at once
+        counts = self.context.get("game_listing_counts")
+        if counts is not None:
+            return counts.get(obj.id, 0)
         return obj.get_active_listings_count()
 
 
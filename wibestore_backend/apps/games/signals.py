@@ -0,0 +1,21 @@
+"""
+WibeStore Backend - Games Signals
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.response_cache import bump_generation
+
+from .models import Category, Game
+
+
+@receiver([post_save, post_delete], sender=Game)
+def game_invalidate_response_cache(sender, **kwargs):
+    """Listing responses embed the game, so both namespaces go stale."""
+    bump_generation("games", "listings")
+
+
+@receiver([post_save, post_delete], sender=Category)
+def category_invalidate_response_cache(sender, **kwargs):
+    bump_generation("games")
@@ -7,15 +7,19 @@ from rest_framework import generics, permissions
 
 from apps.marketplace.models import Listing
 from apps.marketplace.serializers import ListingSerializer
+from core.pagination import EstimatedCountPagination
+from core.profiling import SerializerTimingMixin
+from core.response_cache import CachedResponseMixin
 
 from .models import Game
 from .serializers import CategorySerializer, GameListSerializer, GameSerializer
 
 
 @extend_schema(tags=["Games"])
-class GameListView(generics.ListAPIView):
+class GameListView(CachedResponseMixin, generics.ListAPIView):
     """GET /api/v1/games/ — List all active games."""
 
+    response_cache_namespaces = ("games",)
     serializer_class = GameListSerializer
     permission_classes = [permissions.AllowAny]
 
@@ -24,9 +28,10 @@ class GameListView(generics.ListAPIView):
 
 
 @extend_schema(tags=["Games"])
-class GameDetailView(generics.RetrieveAPIView):
+class GameDetailView(CachedResponseMixin, generics.RetrieveAPIView):
     """GET /api/v1/games/{slug}/ — Game details."""
 
+    response_cache_namespaces = ("games",)
     serializer_class = GameSerializer
     permission_classes = [permissions.AllowAny]
     lookup_field = "slug"
@@ -36,27 +41,30 @@ class GameDetailView(generics.RetrieveAPIView):
 
 
 @extend_schema(tags=["Games"])
-class GameListingsView(generics.ListAPIView):
+class GameListingsView(SerializerTimingMixin, generics.ListAPIView):
     """GET /api/v1/games/{slug}/listings/ — Listings for a specific game."""
 
     serializer_class = ListingSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = EstimatedCountPagination
 
     def get_queryset(self):
         slug = self.kwargs.get("slug")
         return (
             Listing.objects.filter(game__slug=slug, status="active")
             .select_related("game", "seller")
+            .prefetch_related("images")
             .order_by("-is_premium", "-created_at")
         )
 
 
 @extend_schema(tags=["Games"])
-class CategoryListView(generics.ListAPIView):
+class CategoryListView(CachedResponseMixin, generics.ListAPIView):
     """GET /api/v1/games/categories/ — List all categories."""
 
     from .models import Category
 
+    response_cache_namespaces = ("games",)
     serializer_class = CategorySerializer
     permission_classes = [permissions.AllowAny]
     queryset = Category.objects.all().order_by("name")
@@ -0,0 +1,212 @@
+"""
+WibeStore Backend - Marketplace Counters
+Write-behind listing view counter.
+
+Views are de-duplicated per listing and day in Redis and buffered there; the
+``flush_listing_views`` beat task moves them into ``listings.views_count`` and
+``listing_views`` in bulk, so recording a view never writes to the database.
+Without Redis (development, tests), or while Redis is failing, views are
+written synchronously, as before.
+"""
+
+import json
+import logging
+import uuid
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.db import bulk_increment
+from core.redis import get_redis_client
+
+logger = logging.getLogger("apps.marketplace")
+
+KEY_PREFIX = "wibestore:listing_views"
+PENDING_KEY = f"{KEY_PREFIX}:pending"
+FLUSHING_KEY = f"{KEY_PREFIX}:flushing"
+PENDING_COUNTS_KEY = f"{KEY_PREFIX}:pending_counts"
+FLUSH_LOCK_KEY = f"{KEY_PREFIX}:flush_lock"
+
+SEEN_TTL = 2 * 24 * 60 * 60  # viewer sets outlive their day, then expire
+FLUSH_LOCK_TTL = 5 * 60  # extended after every batch while a flush makes progress
+FLUSH_BATCH_SIZE = 1000  # entries read, written and trimmed at a time
+
+# KEYS: seen set, pending list, pending counts hash
+# ARGV: viewer, seen ttl, pending entry, listing id
+# Returns the listing's buffered (not yet flushed) view count.
+_RECORD_SCRIPT = """
+if redis.call('SADD', KEYS[1], ARGV[1]) == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+    redis.call('RPUSH', KEYS[2], ARGV[3])
+    return redis.call('HINCRBY', KEYS[3], ARGV[4], 1)
+end
+return tonumber(redis.call('HGET', KEYS[3], ARGV[4]) or '0')
+"""
+
+# KEYS: flushing list, pending counts hash
+# ARGV: number of entries written, then listing id / count pairs
+# Drops the written entries and their buffered counts (fields reaching 0 are removed).
+_SETTLE_SCRIPT = """
+redis.call('LTRIM', KEYS[1], ARGV[1], -1)
+for i = 2, #ARGV, 2 do
+    if redis.call('HINCRBY', KEYS[2], ARGV[i], -tonumber(ARGV[i + 1])) <= 0 then
+        redis.call('HDEL', KEYS[2], ARGV[i])
+    end
+end
+return 1
+"""
+
+# KEYS: lock; ARGV: owner token, ttl. Extends the lock only if we still own it.
+_EXTEND_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# KEYS: lock; ARGV: owner token. Releases the lock only if we still own it.
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class ListingViewCounter:
+    """Record unique daily listing views and flush them to the database in bulk."""
+
+    @staticmethod
+    def record(listing, user=None, ip_address: str | None = None) -> int:
+        """Count a view (once per viewer per day) and return the listing's view count."""
+        client = get_redis_client()
+        if client is None:
+            return ListingViewCounter._record_sync(listing, user, ip_address)
+
+        now = timezone.now()
+        viewer = f"u:{user.pk}" if user else f"ip:{ip_address or ''}"
+        seen_key = f"{KEY_PREFIX}:seen:{listing.pk}:{timezone.localdate(now):%Y%m%d}"
+        entry = json.dumps(
+            {
+                "listing": str(listing.pk),
+                "user": str(user.pk) if user else None,
+                "ip": ip_address or None,
+                "at": now.isoformat(),
+            }
+        )
+        try:
+            pending = client.eval(
+                _RECORD_SCRIPT,
+                3,
+                seen_key,
+                PENDING_KEY,
+                PENDING_COUNTS_KEY,
+                viewer,
+                SEEN_TTL,
+                entry,
+                str(listing.pk),
+            )
+        except Exception as e:
+            logger.warning("Buffering listing view failed, writing it directly: %s", e)
+            return ListingViewCounter._record_sync(listing, user, ip_address)
+        return listing.views_count + int(pending)
+
+    @staticmethod
+    def _record_sync(listing, user, ip_address) -> int:
+        from .models import ListingView
+
+        existing = ListingView.objects.filter(
+            listing=listing, viewed_at__date=timezone.localdate()
+        )
+        existing = existing.filter(user=user) if user else existing.filter(ip_address=ip_address)
+
+        if not existing.exists():
+            ListingView.objects.create(listing=listing, user=user, ip_address=ip_address)
+            type(listing).all_objects.filter(pk=listing.pk).update(
+                views_count=F("views_count") + 1
+            )
+            listing.views_count += 1
+        return listing.views_count
+
+    @staticmethod
+    def flush() -> int:
+        """
+        Move buffered views into the database; returns the number of views flushed.
+
+        The pending list is renamed aside before processing, so views recorded
+        meanwhile land in a fresh buffer. It is then drained FLUSH_BATCH_SIZE
+        entries at a time: each batch is written in one transaction and trimmed
+        off the list afterwards, so a backlog never has to fit in memory and a
+        failed run resumes at the first unwritten batch.
+        """
+        client = get_redis_client()
+        if client is None:
+            return 0
+        token = uuid.uuid4().hex
+        if not client.set(FLUSH_LOCK_KEY, token, nx=True, ex=FLUSH_LOCK_TTL):
+            logger.info("Listing view flush already running, skipping")
+            return 0
+
+        flushed, listings = 0, set()
+        try:
+            if not client.exists(FLUSHING_KEY):
+                if not client.exists(PENDING_KEY):
+                    return 0
+                client.rename(PENDING_KEY, FLUSHING_KEY)
+
+            while batch := client.lrange(FLUSHING_KEY, 0, FLUSH_BATCH_SIZE - 1):
+                counts = ListingViewCounter._write_batch([json.loads(raw) for raw in batch])
+                pairs = [value for item in counts.items() for value in item]
+                client.eval(
+                    _SETTLE_SCRIPT, 2, FLUSHING_KEY, PENDING_COUNTS_KEY, len(batch), *pairs
+                )
+                flushed += len(batch)
+                listings.update(counts)
+                if not client.eval(_EXTEND_LOCK_SCRIPT, 1, FLUSH_LOCK_KEY, token, FLUSH_LOCK_TTL):
+                    logger.warning("Listing view flush lost its lock, stopping")
+                    break
+        finally:
+            # A run that outlived the lock TTL must not release its successor's lock
+            client.eval(_RELEASE_LOCK_SCRIPT, 1, FLUSH_LOCK_KEY, token)
+
+        logger.info("Flushed %d listing views for %d listings", flushed, len(listings))
+        return flushed
+
+    @staticmethod
+    @transaction.atomic
+    def _write_batch(entries: list[dict]) -> Counter:
+        """One bulk counter UPDATE plus a bulk INSERT of view rows."""
+        from apps.accounts.models import User
+
+        from .models import Listing, ListingView
+
+        counts = Counter(entry["listing"] for entry in entries)
+        listing_ids = Listing.all_objects.filter(pk__in=counts).values_list("pk", flat=True)
+        existing_listings = {str(pk) for pk in listing_ids}
+        user_ids = {entry["user"] for entry in entries if entry["user"]}
+        existing_users = {
+            str(pk) for pk in User.objects.filter(pk__in=user_ids).values_list("pk", flat=True)
+        }
+
+        bulk_increment(
+            Listing,
+            "views_count",
+            {pk: count for pk, count in counts.items() if pk in existing_listings},
+        )
+        ListingView.objects.bulk_create(
+            [
+                ListingView(
+                    listing_id=entry["listing"],
+                    user_id=entry["user"] if entry["user"] in existing_users else None,
+                    ip_address=entry["ip"],
+                    viewed_at=parse_datetime(entry["at"]),
+                )
+                for entry in entries
+                if entry["listing"] in existing_listings
+            ],
+            batch_size=FLUSH_BATCH_SIZE,
+        )
+        return counts
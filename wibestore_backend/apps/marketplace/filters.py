@@ -3,8 +3,10 @@ Marketplace App - Filters
 """
 
 import django_filters
-from django.db.models import Q
+from rest_framework import filters as drf_filters
+
 from apps.marketplace.models import Listing
+from apps.marketplace.search import search_listings
 
 
 class ListingFilter(django_filters.FilterSet):
@@ -112,21 +114,30 @@ class ListingFilter(django_filters.FilterSet):
         return queryset
     
     def filter_search(self, queryset, name, value):
-        """Filter by search term across multiple fields."""
-        if value:
-            return queryset.filter(
-                Q(title__icontains=value) |
-                Q(description__icontains=value) |
-                Q(game__name__icontains=value) |
-                Q(seller__full_name__icontains=value)
-            )
-        return queryset
+        """Full-text search (ranked on PostgreSQL, icontains elsewhere)."""
+        return search_listings(
+            queryset,
+            value,
+            fallback_fields=("title", "description", "game__name", "seller__full_name"),
+        )
 
 
 # Alias for views that expect ListingFilterSet
 ListingFilterSet = ListingFilter
 
 
+class ListingOrderingFilter(drf_filters.OrderingFilter):
+    """Ordering filter that puts the most relevant search hits first unless ?ordering= is set."""
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if "search_rank" in queryset.query.annotations and not request.query_params.get(
+            self.ordering_param
+        ):
+            return ["-search_rank", *(ordering or [])]
+        return ordering
+
+
 class ListingBackend(django_filters.rest_framework.backends.DjangoFilterBackend):
     """Custom filter backend for listings."""
 
@@ -0,0 +1 @@
+# Marketplace management package
@@ -0,0 +1,151 @@
+"""
+WibeStore Backend - Listing Search Benchmark
+Compares full-text search (tsvector + GIN) with the legacy icontains path.
+
+Seeds listings inside a transaction that is rolled back afterwards (unless --keep).
+Requires PostgreSQL.
+
+Usage:
+    python manage.py benchmark_listing_search --listings 100000 --runs 5
+"""
+
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+
+from apps.accounts.models import User
+from apps.games.models import Game
+from apps.marketplace.models import Listing
+from apps.marketplace.search import (
+    is_full_text_search_available,
+    order_by_relevance,
+    refresh_search_vectors,
+    search_listings,
+)
+
+WORDS = [
+    "account",
+    "legendary",
+    "mythic",
+    "skins",
+    "rare",
+    "level",
+    "max",
+    "conqueror",
+    "diamond",
+    "platinum",
+    "heroes",
+    "season",
+    "pass",
+    "royale",
+    "glacier",
+    "donat",
+    "akkaunt",
+    "arzon",
+    "tez",
+    "kafolat",
+    "prime",
+    "elite",
+    "collector",
+    "vip",
+]
+GAMES = ["PUBG Mobile", "Free Fire", "Mobile Legends", "Standoff 2", "Clash of Clans", "Dota 2"]
+RANKS = ["Bronze", "Silver", "Gold", "Platinum", "Diamond", "Crown", "Ace", "Conqueror"]
+DEFAULT_QUERIES = ["conqueror", "mythic skins", "pubg", "glacier", "kafolat akkaunt"]
+
+
+class Command(BaseCommand):
+    help = "Benchmark listing full-text search against the icontains path"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--listings", type=int, default=100_000)
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--batch-size", type=int, default=5_000)
+        parser.add_argument("--query", action="append", dest="queries")
+        parser.add_argument(
+            "--keep", action="store_true", help="Keep the seeded listings instead of rolling back"
+        )
+
+    def handle(self, *args, **options):
+        if not is_full_text_search_available():
+            raise CommandError("Listing search benchmark requires PostgreSQL.")
+
+        with transaction.atomic():
+            self.seed(options["listings"], options["batch_size"])
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE listings")
+
+            for query in options["queries"] or DEFAULT_QUERIES:
+                legacy = self.measure(self.icontains_queryset(query), options["runs"])
+                fts = self.measure(self.full_text_queryset(query), options["runs"])
+                self.stdout.write(
+                    f"{query!r:24} icontains: {legacy:8.1f} ms   "
+                    f"full-text: {fts:8.1f} ms   speedup: {legacy / max(fts, 0.001):5.1f}x"
+                )
+
+            if not options["keep"]:
+                transaction.set_rollback(True)
+                self.stdout.write("Seeded listings rolled back.")
+
+    def seed(self, total: int, batch_size: int) -> None:
+        seller, _ = User.objects.get_or_create(
+            email="search-benchmark@wibestore.uz", defaults={"full_name": "Search Benchmark"}
+        )
+        games = [
+            Game.objects.get_or_create(name=name, defaults={"is_active": True})[0]
+            for name in GAMES
+        ]
+
+        started = time.monotonic()
+        for offset in range(0, total, batch_size):
+            Listing.objects.bulk_create(
+                [
+                    Listing(
+                        seller=seller,
+                        game=random.choice(games),
+                        title=" ".join(random.sample(WORDS, 4)),
+                        description=" ".join(random.choices(WORDS, k=40)),
+                        price=random.randint(10_000, 5_000_000),
+                        status="active",
+                        rank=random.choice(RANKS),
+                    )
+                    for _ in range(min(batch_size, total - offset))
+                ]
+            )
+        refresh_search_vectors(Listing.all_objects.filter(seller=seller))
+        self.stdout.write(f"Seeded {total} listings in {time.monotonic() - started:.1f}s")
+
+    @staticmethod
+    def icontains_queryset(query: str):
+        return (
+            Listing.objects.filter(status="active")
+            .filter(
+                Q(title__icontains=query)
+                | Q(description__icontains=query)
+                | Q(game__name__icontains=query)
+            )
+            .select_related("game", "seller")
+            .order_by("-is_premium", "-created_at")
+        )
+
+    @staticmethod
+    def full_text_queryset(query: str):
+        qs = search_listings(
+            Listing.objects.filter(status="active").select_related("game", "seller"), query
+        )
+        return order_by_relevance(qs, "-is_premium", "-created_at")
+
+    @staticmethod
+    def measure(queryset, runs: int) -> float:
+        """Median wall time (ms) of a count plus the first page, like the list endpoint."""
+        timings = []
+        for _ in range(runs):
+            started = time.monotonic()
+            queryset.count()
+            list(queryset[:20])
+            timings.append((time.monotonic() - started) * 1000)
+        return statistics.median(timings)
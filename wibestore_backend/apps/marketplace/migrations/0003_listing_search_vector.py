@@ -0,0 +1,54 @@
+# Full-text search: stored, weighted search vector on listings with a GIN index.
+# The index and backfill are PostgreSQL-only; other databases only get the column.
+
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+SEARCH_INDEX_NAME = "listings_search_vector_gin"
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    config = getattr(settings, "LISTING_SEARCH_CONFIG", "simple")
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {SEARCH_INDEX_NAME} ON listings USING gin (search_vector)"
+    )
+    schema_editor.execute(
+        """
+        UPDATE listings AS l SET search_vector =
+            setweight(to_tsvector(%s::regconfig, coalesce(l.title, '')), 'A')
+            || setweight(to_tsvector(%s::regconfig, coalesce(g.name, '')), 'B')
+            || setweight(to_tsvector(%s::regconfig, coalesce(l.rank, '')), 'C')
+            || setweight(to_tsvector(%s::regconfig, coalesce(l.description, '')), 'D')
+        FROM games AS g
+        WHERE g.id = l.game_id
+        """,
+        params=[config] * 4,
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {SEARCH_INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("marketplace", "0002_warranty_sale_promo_savedsearch"),
+        ("games", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="listing",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                blank=True, editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,37 @@
+# Autocomplete: trigram GIN indexes on listing titles and ranks (PostgreSQL only).
+
+from django.db import migrations
+
+TRIGRAM_INDEXES = {
+    "listings_title_trgm": "title",
+    "listings_rank_trgm": "rank",
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, column in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON listings USING gin ({column} gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("marketplace", "0003_listing_search_vector"),
+        # pg_trgm extension
+        ("games", "0002_game_name_trigram_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,17 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("marketplace", "0004_listing_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="listingview",
+            name="viewed_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
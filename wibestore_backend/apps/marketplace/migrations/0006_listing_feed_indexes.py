@@ -0,0 +1,45 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("marketplace", "0005_listingview_viewed_at_default"),
+    ]
+
+    operations = [
+        # Superseded by listings_feed_default_idx (same leading columns)
+        migrations.RemoveIndex(
+            model_name="listing",
+            name="listings_status_4063e0_idx",
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["status", "-is_premium", "-created_at", "-id"],
+                name="listings_feed_default_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["status", "created_at", "id"], name="listings_feed_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(fields=["status", "price", "id"], name="listings_feed_price_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["status", "views_count", "id"], name="listings_feed_views_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["status", "favorites_count", "id"], name="listings_feed_favorites_idx"
+            ),
+        ),
+    ]
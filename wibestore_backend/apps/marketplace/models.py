@@ -4,7 +4,9 @@ Listing, ListingImage, Favorite, View models.
 """
 
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.utils import timezone
 
 from core.constants import LISTING_STATUS_CHOICES, LOGIN_METHOD_CHOICES
 from core.models import BaseModel, BaseSoftDeleteModel
@@ -84,6 +86,9 @@ class Listing(BaseSoftDeleteModel):
     rejection_reason = models.TextField(blank=True, default="")
     sold_at = models.DateTimeField(null=True, blank=True)
 
+    # Full-text search (maintained by signals; GIN-indexed on PostgreSQL)
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
+
     class Meta:
         db_table = "listings"
         ordering = ["-is_premium", "-created_at"]
@@ -92,8 +97,19 @@ class Listing(BaseSoftDeleteModel):
         indexes = [
             models.Index(fields=["seller", "status"]),
             models.Index(fields=["game", "status", "created_at"]),
-            models.Index(fields=["status", "is_premium"]),
             models.Index(fields=["price"]),
+            # Keyset pagination of the feed: one index per orderable column, with the
+            # primary key as tie-breaker (scanned backwards for descending orderings)
+            models.Index(
+                fields=["status", "-is_premium", "-created_at", "-id"],
+                name="listings_feed_default_idx",
+            ),
+            models.Index(fields=["status", "created_at", "id"], name="listings_feed_created_idx"),
+            models.Index(fields=["status", "price", "id"], name="listings_feed_price_idx"),
+            models.Index(fields=["status", "views_count", "id"], name="listings_feed_views_idx"),
+            models.Index(
+                fields=["status", "favorites_count", "id"], name="listings_feed_favorites_idx"
+            ),
         ]
 
     def __str__(self) -> str:
@@ -172,7 +188,8 @@ class ListingView(models.Model):
         blank=True,
     )
     ip_address = models.GenericIPAddressField(null=True, blank=True)
-    viewed_at = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add: buffered views are inserted later with their original time
+    viewed_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         db_table = "listing_views"
@@ -0,0 +1,202 @@
+"""
+WibeStore Backend - Marketplace Full-Text Search
+Weighted tsvector search over listings, backed by a GIN index on PostgreSQL,
+and trigram-based autocomplete for listing titles, ranks and game names.
+Other databases (SQLite in tests, local development) fall back to icontains matching.
+"""
+
+import logging
+
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity,
+)
+from django.db import connection
+from django.db.models import F, Q, QuerySet, Value
+
+from core.cache import LocalTTLCache
+
+logger = logging.getLogger("apps.marketplace")
+
+# Listing fields that feed the stored search vector (game name is joined in separately)
+SEARCH_VECTOR_FIELDS = ("title", "description", "rank", "game")
+
+# Fields matched with icontains when full-text search is not available
+DEFAULT_FALLBACK_FIELDS = ("title", "description", "game__name")
+
+# Autocomplete
+SUGGEST_MIN_LENGTH = 2
+SUGGEST_MAX_LIMIT = 10
+
+# Hot prefixes are answered from process memory for a short while
+_suggest_cache = LocalTTLCache(maxsize=2048, ttl=60)
+
+
+def is_full_text_search_available() -> bool:
+    """Full-text search requires PostgreSQL (tsvector, GIN)."""
+    return connection.vendor == "postgresql"
+
+
+def get_search_config() -> str:
+    """Text search configuration; 'simple' suits mixed uz/ru/en content."""
+    return getattr(settings, "LISTING_SEARCH_CONFIG", "simple")
+
+
+def build_search_vector(game_name: str) -> SearchVector:
+    """Weighted vector: title (A), game name (B), rank (C), description (D)."""
+    config = get_search_config()
+    return (
+        SearchVector("title", weight="A", config=config)
+        + SearchVector(Value(game_name), weight="B", config=config)
+        + SearchVector("rank", weight="C", config=config)
+        + SearchVector("description", weight="D", config=config)
+    )
+
+
+def update_listing_search_vector(listing) -> None:
+    """Recompute the stored search vector of a single listing."""
+    if not is_full_text_search_available():
+        return
+    from .models import Listing
+
+    Listing.all_objects.filter(pk=listing.pk).update(
+        search_vector=build_search_vector(listing.game.name)
+    )
+
+
+def refresh_search_vectors(queryset: QuerySet | None = None) -> int:
+    """Recompute stored search vectors in bulk, one UPDATE per game."""
+    if not is_full_text_search_available():
+        return 0
+    from apps.games.models import Game
+
+    from .models import Listing
+
+    if queryset is None:
+        queryset = Listing.all_objects.all()
+
+    games = Game.objects.filter(id__in=queryset.values("game_id")).values_list("id", "name")
+    updated = 0
+    for game_id, game_name in games:
+        updated += queryset.filter(game_id=game_id).update(
+            search_vector=build_search_vector(game_name)
+        )
+    logger.info("Refreshed search vectors for %d listings", updated)
+    return updated
+
+
+def search_listings(
+    queryset: QuerySet, query: str, fallback_fields: tuple = DEFAULT_FALLBACK_FIELDS
+) -> QuerySet:
+    """
+    Filter listings matching ``query``.
+
+    On PostgreSQL the queryset is matched against the stored search vector and
+    annotated with ``search_rank``; elsewhere ``fallback_fields`` are matched with
+    icontains, as before.
+    """
+    query = (query or "").strip()
+    if not query:
+        return queryset
+
+    if not is_full_text_search_available():
+        condition = Q()
+        for field in fallback_fields:
+            condition |= Q(**{f"{field}__icontains": query})
+        return queryset.filter(condition)
+
+    search_query = SearchQuery(query, search_type="websearch", config=get_search_config())
+    return queryset.filter(search_vector=search_query).annotate(
+        search_rank=SearchRank(F("search_vector"), search_query)
+    )
+
+
+def order_by_relevance(queryset: QuerySet, *ordering: str) -> QuerySet:
+    """Order by ``search_rank`` first when the queryset was ranked by search_listings."""
+    if "search_rank" in queryset.query.annotations:
+        return queryset.order_by("-search_rank", *ordering)
+    return queryset.order_by(*ordering)
+
+
+def normalize_suggest_prefix(prefix: str) -> str:
+    """Lowercase and collapse whitespace so equivalent prefixes share a cache entry."""
+    return " ".join((prefix or "").lower().split())
+
+
+def get_suggestions(prefix: str, limit: int = SUGGEST_MAX_LIMIT) -> list[dict]:
+    """
+    Return up to ``limit`` de-duplicated suggestions for a typed prefix.
+
+    Games come first, then listing titles, then ranks. Results are cached
+    in-process per normalized prefix.
+    """
+    prefix = normalize_suggest_prefix(prefix)
+    limit = max(1, min(limit, SUGGEST_MAX_LIMIT))
+    if len(prefix) < SUGGEST_MIN_LENGTH:
+        return []
+
+    cache_key = (prefix, limit)
+    suggestions = _suggest_cache.get(cache_key)
+    if suggestions is None:
+        suggestions = _query_suggestions(prefix, limit)
+        _suggest_cache.set(cache_key, suggestions)
+    return suggestions
+
+
+def _query_suggestions(prefix: str, limit: int) -> list[dict]:
+    from apps.games.models import Game
+
+    from .models import Listing
+
+    games = Game.objects.filter(is_active=True)
+    listings = Listing.objects.filter(status="active").order_by()
+
+    if is_full_text_search_available():
+        # %> (word similarity) is served by the gin_trgm_ops indexes and also matches
+        # typed prefixes ("pub" -> "PUBG Mobile"); UPPER(...) LIKE lookups would not be
+        games = (
+            games.filter(name__trigram_word_similar=prefix)
+            .annotate(score=TrigramWordSimilarity(prefix, "name"))
+            .order_by("-score", "sort_order")
+        )
+        titles = (
+            listings.filter(title__trigram_word_similar=prefix)
+            .annotate(score=TrigramWordSimilarity(prefix, "title"))
+            .order_by("-score")
+        )
+        ranks = listings.filter(rank__trigram_word_similar=prefix)
+    else:
+        games = games.filter(name__icontains=prefix).order_by("sort_order", "name")
+        titles = listings.filter(title__icontains=prefix).order_by("-is_premium", "-created_at")
+        ranks = listings.filter(rank__icontains=prefix)
+
+    sources = (
+        (
+            {"type": "game", "text": name, "slug": slug}
+            for name, slug in games.values_list("name", "slug")[:limit]
+        ),
+        (
+            {"type": "listing", "text": title}
+            for title in titles.values_list("title", flat=True)[: limit * 2]
+        ),
+        (
+            {"type": "rank", "text": rank}
+            for rank in ranks.values_list("rank", flat=True).distinct()[:limit]
+        ),
+    )
+
+    # Sources are lazy: later queries only run while there is room left
+    suggestions = []
+    seen = set()
+    for source in sources:
+        for candidate in source:
+            key = candidate["text"].strip().lower()
+            if key and key not in seen:
+                seen.add(key)
+                suggestions.append(candidate)
+            if len(suggestions) >= limit:
+                return suggestions
+    return suggestions
@@ -2,9 +2,11 @@
 WibeStore Backend - Marketplace Selectors
 """
 
-from django.db.models import Q, QuerySet
+from django.db.models import QuerySet
 
-from .models import Listing
+from .models import Favorite, Listing
+from .search import order_by_relevance
+from .search import search_listings as search_listings_queryset
 
 
 def get_active_listings(game_slug: str | None = None) -> QuerySet:
@@ -25,16 +27,22 @@ def get_premium_listings(limit: int = 10) -> QuerySet:
 
 
 def search_listings(query: str) -> QuerySet:
-    """Full-text search across listings."""
-    return (
-        Listing.objects.filter(
-            status="active",
-        )
-        .filter(
-            Q(title__icontains=query)
-            | Q(description__icontains=query)
-            | Q(game__name__icontains=query)
+    """Full-text search across listings, most relevant first."""
+    qs = search_listings_queryset(
+        Listing.objects.filter(status="active").select_related("game", "seller"), query
+    )
+    return order_by_relevance(qs, "-is_premium", "-created_at")
+
+
+def get_favorited_listing_ids(user, listing_ids) -> set:
+    """IDs among ``listing_ids`` that ``user`` has favorited, in one query."""
+    if user is None or not user.is_authenticated:
+        return set()
+    listing_ids = list(listing_ids)
+    if not listing_ids:
+        return set()
+    return set(
+        Favorite.objects.filter(user=user, listing_id__in=listing_ids).values_list(
+            "listing_id", flat=True
         )
-        .select_related("game", "seller")
-        .order_by("-is_premium", "-created_at")
     )
@@ -3,12 +3,15 @@ WibeStore Backend - Marketplace Serializers
 """
 
 from django.contrib.auth import get_user_model
+from django.db.models import Count
+from django.db.models.manager import BaseManager
 from rest_framework import serializers
 
 from apps.accounts.serializers import UserPublicSerializer
 from apps.games.serializers import GameListSerializer
 
 from .models import Favorite, Listing, ListingImage, ListingView, SavedSearch
+from .selectors import get_favorited_listing_ids
 
 User = get_user_model()
 
@@ -26,6 +29,37 @@ class ListingImageSerializer(serializers.ModelSerializer):
         fields = ["id", "image", "is_primary", "sort_order"]
 
 
+class ListingPageSerializer(serializers.ListSerializer):
+    """
+    ``many=True`` serializer for listing pages.
+
+    Resolves per-row lookups for the whole page up front and shares them through
+    the serializer context, so a page costs the same number of queries as one row:
+
+    - ``favorited_listing_ids``: listings the requesting user has favorited
+    - ``game_listing_counts``: active listing count per game (GameListSerializer)
+    """
+
+    def to_representation(self, data):
+        listings = list(data.all() if isinstance(data, BaseManager) else data)
+        fields = self.child.fields
+
+        if "is_favorited" in fields:
+            request = self.context.get("request")
+            self.context["favorited_listing_ids"] = get_favorited_listing_ids(
+                request and request.user, [listing.pk for listing in listings]
+            )
+        if "game" in fields:
+            game_ids = {listing.game_id for listing in listings}
+            self.context["game_listing_counts"] = dict(
+                Listing.objects.filter(game_id__in=game_ids, status="active")
+                .order_by()
+                .values_list("game_id")
+                .annotate(total=Count("id"))
+            )
+        return super().to_representation(listings)
+
+
 class ListingSerializer(serializers.ModelSerializer):
     """Full listing serializer."""
 
@@ -72,12 +106,15 @@ class ListingSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         ]
+        list_serializer_class = ListingPageSerializer
 
     def get_is_favorited(self, obj) -> bool:
-        request = self.context.get("request")
-        if request and request.user.is_authenticated:
-            return Favorite.objects.filter(user=request.user, listing=obj).exists()
-        return False
+        favorited = self.context.get("favorited_listing_ids")
+        if favorited is None:
+            # Single listing (detail view): one lookup
+            request = self.context.get("request")
+            favorited = get_favorited_listing_ids(request and request.user, [obj.pk])
+        return obj.pk in favorited
 
 
 class ListingCreateSerializer(serializers.ModelSerializer):
@@ -154,13 +191,15 @@ class ListingListSerializer(serializers.ModelSerializer):
             "primary_image",
             "created_at",
         ]
+        list_serializer_class = ListingPageSerializer
 
     def get_primary_image(self, obj) -> str | None:
-        primary = obj.images.filter(is_primary=True).first()
-        if primary:
-            return primary.image.url
-        first = obj.images.first()
-        return first.image.url if first else None
+        # Iterate images.all() so prefetch_related("images") is used
+        images = list(obj.images.all())
+        primary = next((image for image in images if image.is_primary), None)
+        if primary is None and images:
+            primary = images[0]
+        return primary.image.url if primary else None
 
 
 class FavoriteListSerializer(serializers.ModelSerializer):
@@ -8,12 +8,14 @@ from decimal import Decimal
 
 from django.conf import settings
 from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 from core.exceptions import BusinessLogicError
 from core.utils import calculate_commission, calculate_seller_earnings
 
-from .models import Listing
+from .models import Favorite, Listing
 
 logger = logging.getLogger("apps.marketplace")
 
@@ -94,3 +96,71 @@ class ListingService:
 
         logger.info("Listing marked as sold: %s", listing.id)
         return listing
+
+
+class FavoriteService:
+    """Favorites and the denormalized ``Listing.favorites_count`` counter."""
+
+    RECONCILE_BATCH_SIZE = 1000
+
+    @staticmethod
+    @transaction.atomic
+    def add_favorite(user, listing: Listing) -> bool:
+        """Favorite a listing; returns False if it was already favorited."""
+        _, created = Favorite.objects.get_or_create(user=user, listing=listing)
+        if created:
+            # Increment in SQL: no read-modify-write, no lost updates
+            Listing.all_objects.filter(pk=listing.pk).update(
+                favorites_count=F("favorites_count") + 1
+            )
+        return created
+
+    @staticmethod
+    @transaction.atomic
+    def remove_favorite(user, listing_id) -> bool:
+        """Unfavorite a listing; returns False if it was not favorited."""
+        deleted, _ = Favorite.objects.filter(user=user, listing_id=listing_id).delete()
+        if deleted:
+            Listing.all_objects.filter(pk=listing_id, favorites_count__gt=0).update(
+                favorites_count=F("favorites_count") - 1
+            )
+        return bool(deleted)
+
+    @staticmethod
+    def reconcile_favorites_counts(batch_size: int = RECONCILE_BATCH_SIZE) -> int:
+        """
+        Recompute ``favorites_count`` from the favorites table, walking listings
+        in primary-key batches. Returns the number of listings corrected.
+
+        Each batch is a single ``UPDATE ... SET favorites_count = (SELECT COUNT(*) ...)``,
+        so a favorite committed while the job runs is never overwritten by a
+        count taken before it.
+        """
+        actual = Coalesce(
+            Subquery(
+                Favorite.objects.filter(listing_id=OuterRef("pk"))
+                .order_by()
+                .values("listing_id")
+                .annotate(total=Count("id"))
+                .values("total")
+            ),
+            0,
+        )
+        corrected = 0
+        last_pk = None
+        while True:
+            batch = Listing.all_objects.order_by("pk")
+            if last_pk is not None:
+                batch = batch.filter(pk__gt=last_pk)
+            pks = list(batch.values_list("pk", flat=True)[:batch_size])
+            if not pks:
+                break
+            last_pk = pks[-1]
+            corrected += (
+                Listing.all_objects.filter(pk__in=pks)
+                .exclude(favorites_count=actual)
+                .update(favorites_count=actual)
+            )
+
+        logger.info("Reconciled favorites_count for %d listings", corrected)
+        return corrected
@@ -0,0 +1,49 @@
+"""
+WibeStore Backend - Marketplace Signals
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.games.models import Game
+from core.response_cache import bump_generation
+
+from .models import Listing, ListingImage
+from .search import (
+    SEARCH_VECTOR_FIELDS,
+    is_full_text_search_available,
+    refresh_search_vectors,
+    update_listing_search_vector,
+)
+
+
+@receiver(post_save, sender=Listing)
+def listing_update_search_vector(sender, instance, created, update_fields=None, **kwargs):
+    """Keep the stored search vector in sync with the indexed listing fields."""
+    if update_fields is not None and not set(update_fields) & set(SEARCH_VECTOR_FIELDS):
+        return
+    update_listing_search_vector(instance)
+
+
+@receiver(pre_save, sender=Game)
+def game_track_name_change(sender, instance, **kwargs):
+    """Remember whether the game was renamed, so listings are reindexed only then."""
+    if instance._state.adding or not is_full_text_search_available():
+        instance._search_name_changed = False
+        return
+    previous = Game.objects.filter(pk=instance.pk).values_list("name", flat=True).first()
+    instance._search_name_changed = previous is not None and previous != instance.name
+
+
+@receiver(post_save, sender=Game)
+def game_refresh_listing_search_vectors(sender, instance, created, **kwargs):
+    """Reindex the game's listings after a rename (game name is a weighted field)."""
+    if getattr(instance, "_search_name_changed", False):
+        refresh_search_vectors(Listing.all_objects.filter(game=instance))
+
+
+@receiver([post_save, post_delete], sender=Listing)
+@receiver([post_save, post_delete], sender=ListingImage)
+def listing_invalidate_response_cache(sender, **kwargs):
+    """Cached feeds and game listing counts change with any listing write."""
+    bump_generation("listings", "games")
@@ -59,5 +59,26 @@ def archive_old_listings() -> int:
         sold_at__isnull=True,
     )
     count = old_listings.update(status="archived")
+    if count:
+        # update() sends no post_save; drop the cached feeds the signal would have
+        from core.response_cache import bump_generation
+
+        bump_generation("listings", "games")
     logger.info("Archived %d old listings", count)
     return count
+
+
+@shared_task(name="apps.marketplace.tasks.flush_listing_views")
+def flush_listing_views() -> int:
+    """Move buffered listing views from Redis into the database."""
+    from apps.marketplace.counters import ListingViewCounter
+
+    return ListingViewCounter.flush()
+
+
+@shared_task(name="apps.marketplace.tasks.reconcile_favorites_counts")
+def reconcile_favorites_counts() -> int:
+    """Recompute listing favorites counters from the favorites table."""
+    from apps.marketplace.services import FavoriteService
+
+    return FavoriteService.reconcile_favorites_counts()
@@ -10,6 +10,7 @@ app_name = "marketplace"
 
 urlpatterns = [
     path("", views.ListingListCreateView.as_view(), name="listing-list-create"),
+    path("suggest/", views.ListingSuggestView.as_view(), name="listing-suggest"),
     path("promo/apply/", views.ApplyPromoView.as_view(), name="promo-apply"),
     path("<uuid:pk>/", views.ListingDetailView.as_view(), name="listing-detail"),
     path("<uuid:pk>/favorite/", views.ListingFavoriteView.as_view(), name="listing-favorite"),
@@ -6,34 +6,47 @@ import logging
 
 from django_filters.rest_framework.backends import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema
-from rest_framework import filters, generics, parsers, permissions, status
+from rest_framework import generics, parsers, permissions, status, throttling
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from core.pagination import KeysetPagination
 from core.permissions import IsOwnerOrReadOnly
+from core.profiling import SerializerTimingMixin
+from core.response_cache import CachedResponseMixin
 
-from .filters import ListingFilterSet
-from .models import Favorite, Listing, ListingImage, ListingView
+from .counters import ListingViewCounter
+from .filters import ListingFilterSet, ListingOrderingFilter
+from .models import Listing, ListingImage
+from .search import SUGGEST_MAX_LIMIT, get_suggestions
 from .serializers import (
     ListingCreateSerializer,
     ListingImageSerializer,
     ListingListSerializer,
     ListingSerializer,
 )
-from .services import ListingService
+from .services import FavoriteService, ListingService
 
 logger = logging.getLogger("apps.marketplace")
 
 
 @extend_schema(tags=["Listings"])
-class ListingListCreateView(generics.ListCreateAPIView):
+class ListingListCreateView(
+    CachedResponseMixin, SerializerTimingMixin, generics.ListCreateAPIView
+):
     """GET /api/v1/listings/ — List or create listings."""
 
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # Anonymous feed reads are cached; is_favorited makes the response per-user otherwise
+    response_cache_namespaces = ("listings", "games")
+    response_cache_anonymous_only = True
+
+    # ?search= is handled by ListingFilterSet (full-text search, see search.py)
+    filter_backends = [DjangoFilterBackend, ListingOrderingFilter]
     filterset_class = ListingFilterSet
-    search_fields = ["title", "description"]
     ordering_fields = ["created_at", "price", "views_count", "favorites_count"]
     ordering = ["-is_premium", "-created_at"]
+    # Constant-cost infinite scroll; ?offset= keeps the old limit/offset paging
+    pagination_class = KeysetPagination
 
     def get_permissions(self):
         if self.request.method == "GET":
@@ -53,8 +66,30 @@ class ListingListCreateView(generics.ListCreateAPIView):
         )
 
 
+class ListingSuggestThrottle(throttling.UserRateThrottle):
+    """Autocomplete fires per keystroke, so it gets its own, more generous bucket."""
+
+    scope = "suggest"
+
+
 @extend_schema(tags=["Listings"])
-class ListingDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ListingSuggestView(APIView):
+    """GET /api/v1/listings/suggest/?q= — Autocomplete for games, listing titles and ranks."""
+
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = [ListingSuggestThrottle]
+
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get("limit", SUGGEST_MAX_LIMIT))
+        except ValueError:
+            limit = SUGGEST_MAX_LIMIT
+        suggestions = get_suggestions(request.query_params.get("q", ""), limit)
+        return Response({"success": True, "data": suggestions})
+
+
+@extend_schema(tags=["Listings"])
+class ListingDetailView(SerializerTimingMixin, generics.RetrieveUpdateDestroyAPIView):
     """GET/PUT/PATCH/DELETE /api/v1/listings/{id}/ — Listing detail."""
 
     queryset = Listing.objects.filter(deleted_at__isnull=True).select_related("game", "seller").prefetch_related("images")
@@ -85,13 +120,7 @@ class ListingFavoriteView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        favorite, created = Favorite.objects.get_or_create(
-            user=request.user, listing=listing
-        )
-
-        if created:
-            listing.favorites_count += 1
-            listing.save(update_fields=["favorites_count"])
+        if FavoriteService.add_favorite(request.user, listing):
             return Response(
                 {"success": True, "message": "Added to favorites."},
                 status=status.HTTP_201_CREATED,
@@ -102,16 +131,7 @@ class ListingFavoriteView(APIView):
         )
 
     def delete(self, request, pk):
-        deleted, _ = Favorite.objects.filter(
-            user=request.user, listing_id=pk
-        ).delete()
-        if deleted:
-            try:
-                listing = Listing.objects.get(pk=pk)
-                listing.favorites_count = max(0, listing.favorites_count - 1)
-                listing.save(update_fields=["favorites_count"])
-            except Listing.DoesNotExist:
-                pass
+        if FavoriteService.remove_favorite(request.user, pk):
             return Response(
                 {"success": True, "message": "Removed from favorites."},
                 status=status.HTTP_200_OK,
@@ -130,7 +150,7 @@ class ListingViewCountView(APIView):
 
     def post(self, request, pk):
         try:
-            listing = Listing.objects.get(pk=pk, status="active")
+            listing = Listing.objects.only("id", "views_count").get(pk=pk, status="active")
         except Listing.DoesNotExist:
             return Response(
                 {"success": False, "error": {"message": "Listing not found."}},
@@ -139,26 +159,10 @@ class ListingViewCountView(APIView):
 
         ip = request.META.get("REMOTE_ADDR", "")
         user = request.user if request.user.is_authenticated else None
-
-        # Check for unique view today
-        from django.utils import timezone
-        today = timezone.now().date()
-        existing = ListingView.objects.filter(
-            listing=listing,
-            viewed_at__date=today,
-        )
-        if user:
-            existing = existing.filter(user=user)
-        else:
-            existing = existing.filter(ip_address=ip)
-
-        if not existing.exists():
-            ListingView.objects.create(listing=listing, user=user, ip_address=ip)
-            listing.views_count += 1
-            listing.save(update_fields=["views_count"])
+        views_count = ListingViewCounter.record(listing, user=user, ip_address=ip)
 
         return Response(
-            {"success": True, "views_count": listing.views_count},
+            {"success": True, "views_count": views_count},
             status=status.HTTP_200_OK,
         )
 
@@ -5,3 +5,6 @@ class MessagingConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.messaging"
     verbose_name = "Messaging"
+
+    def ready(self):
+        import apps.messaging.signals  # noqa: F401
@@ -2,22 +2,32 @@
 WibeStore Backend - Messaging WebSocket Consumer
 """
 
-import json
+import asyncio
 import logging
+import time
 
+from asgiref.sync import sync_to_async
 from channels.db import database_sync_to_async
-from channels.generic.websocket import AsyncJsonWebSocketConsumer
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.conf import settings
+from django.utils import timezone
+
+from . import presence
+from .participants import participant_cache
+from .persistence import get_batcher
 
 logger = logging.getLogger("apps.messaging")
 
 
-class ChatConsumer(AsyncJsonWebSocketConsumer):
+class ChatConsumer(presence.PresenceMixin, AsyncJsonWebsocketConsumer):
     """WebSocket consumer for real-time chat."""
 
     async def connect(self):
         self.room_id = self.scope["url_route"]["kwargs"]["room_id"]
         self.room_group_name = f"chat_{self.room_id}"
         self.user = self.scope.get("user")
+        self.pending_acks = set()
+        self.typing_sent_at = 0.0
 
         if not self.user or self.user.is_anonymous:
             await self.close()
@@ -31,21 +41,24 @@ class ChatConsumer(AsyncJsonWebSocketConsumer):
 
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
         await self.accept()
+        await self.presence_connect()
         logger.info("WebSocket connected: user=%s, room=%s", self.user.email, self.room_id)
 
     async def disconnect(self, close_code):
+        # Don't leave this connection's messages waiting for the next flush timer
+        await get_batcher().flush()
         await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
+        await self.presence_disconnect()
         logger.info("WebSocket disconnected: room=%s", self.room_id)
 
     async def receive_json(self, content):
         message_type = content.get("type", "chat.message")
         message_content = content.get("content", "")
+        await self.presence_touch()
 
         if message_type == "chat.message" and message_content:
-            # Save message to database
-            message_data = await self.save_message(message_content)
-
-            # Broadcast to room
+            # Broadcast first; the batcher stores the message and we ack the sender
+            message, message_data = self.build_message(message_content)
             await self.channel_layer.group_send(
                 self.room_group_name,
                 {
@@ -53,25 +66,54 @@ class ChatConsumer(AsyncJsonWebSocketConsumer):
                     "message": message_data,
                 },
             )
+            stored = get_batcher().submit(message)
+            ack = asyncio.ensure_future(
+                self.acknowledge(stored, message, content.get("client_id"))
+            )
+            self.pending_acks.add(ack)
+            ack.add_done_callback(self.pending_acks.discard)
 
         elif message_type == "chat.typing":
-            await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    "type": "chat_typing",
-                    "user_id": str(self.user.id),
-                    "username": self.user.display_name,
-                },
-            )
+            if await self.typing_due():
+                await self.channel_layer.group_send(
+                    self.room_group_name,
+                    {
+                        "type": "chat_typing",
+                        "user_id": str(self.user.id),
+                        "username": self.user.display_name,
+                    },
+                )
+
+        elif message_type == "ping":
+            # Keeps presence alive while the user is idle
+            await self.send_json({"type": "pong"})
 
         elif message_type == "chat.read":
+            # "Read up to message_id": one watermark update, one broadcast
             message_id = content.get("message_id")
-            if message_id:
-                await self.mark_message_read(message_id)
+            if message_id and await self.mark_read(message_id):
+                await self.channel_layer.group_send(
+                    self.room_group_name,
+                    {
+                        "type": "chat_read",
+                        "user_id": str(self.user.id),
+                        "message_id": str(message_id),
+                    },
+                )
 
     async def chat_message(self, event):
         await self.send_json(event["message"])
 
+    async def chat_read(self, event):
+        if event["user_id"] != str(self.user.id):
+            await self.send_json(
+                {
+                    "type": "read",
+                    "user_id": event["user_id"],
+                    "message_id": event["message_id"],
+                }
+            )
+
     async def chat_typing(self, event):
         # Don't send typing indicator to the sender
         if event["user_id"] != str(self.user.id):
@@ -83,27 +125,31 @@ class ChatConsumer(AsyncJsonWebSocketConsumer):
                 }
             )
 
-    @database_sync_to_async
-    def check_participation(self) -> bool:
-        from .models import ChatRoom
-        return ChatRoom.objects.filter(
-            id=self.room_id, participants=self.user
-        ).exists()
-
-    @database_sync_to_async
-    def save_message(self, content: str) -> dict:
-        from django.utils import timezone
-        from .models import ChatRoom, Message
-
-        room = ChatRoom.objects.get(id=self.room_id)
-        message = Message.objects.create(
-            room=room, sender=self.user, content=content
+    async def check_participation(self) -> bool:
+        # Reconnect storms are mostly answered from the in-process cache, without a thread hop
+        cached = participant_cache.peek(self.room_id)
+        if cached is not None:
+            return bool(cached) and str(self.user.id) in cached[1]
+        return await database_sync_to_async(participant_cache.is_participant)(
+            self.room_id, self.user.id
+        )
+
+    async def typing_due(self) -> bool:
+        """At most one typing broadcast per user and room per CHAT_TYPING_INTERVAL."""
+        now = time.monotonic()
+        if now - self.typing_sent_at < settings.CHAT_TYPING_INTERVAL:
+            return False
+        self.typing_sent_at = now
+        return await sync_to_async(presence.claim_typing_slot, thread_sensitive=False)(
+            self.room_id, self.user.id
         )
-        room.last_message = content[:200]
-        room.last_message_at = timezone.now()
-        room.save(update_fields=["last_message", "last_message_at"])
 
-        return {
+    def build_message(self, content: str):
+        """Unsaved Message plus the payload broadcast to the room."""
+        from .models import Message
+
+        message = Message(room_id=self.room_id, sender=self.user, content=content)
+        return message, {
             "type": "message",
             "id": str(message.id),
             "sender": {
@@ -112,14 +158,38 @@ class ChatConsumer(AsyncJsonWebSocketConsumer):
                 "display_name": self.user.display_name,
             },
             "content": message.content,
-            "created_at": message.created_at.isoformat(),
+            "created_at": timezone.now().isoformat(),
         }
 
-    @database_sync_to_async
-    def mark_message_read(self, message_id: str) -> None:
-        from .models import Message
+    async def acknowledge(self, stored: asyncio.Future, message, client_id=None) -> None:
+        """Tell the sender whether the message was persisted."""
         try:
-            message = Message.objects.get(id=message_id, room_id=self.room_id)
-            message.mark_as_read()
-        except Message.DoesNotExist:
-            pass
+            await stored
+        except Exception:
+            ack = {"type": "message.error", "id": str(message.id)}
+        else:
+            ack = {
+                "type": "message.ack",
+                "id": str(message.id),
+                "created_at": message.created_at.isoformat(),
+            }
+        if client_id is not None:
+            ack["client_id"] = client_id
+        try:
+            await self.send_json(ack)
+        except Exception as e:
+            logger.debug("Could not acknowledge message %s: %s", message.id, e)
+
+    async def mark_read(self, message_id: str) -> bool:
+        from django.core.exceptions import ValidationError
+
+        from .services import mark_room_read
+
+        # The receipt may name a message still waiting in this process's batcher
+        await get_batcher().flush()
+        try:
+            return await database_sync_to_async(mark_room_read)(
+                self.room_id, self.user, message_id
+            )
+        except ValidationError:
+            return False
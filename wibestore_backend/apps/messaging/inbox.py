@@ -0,0 +1,135 @@
+"""
+WibeStore Backend - Chat Inbox
+Maintenance of the denormalized per-user inbox (InboxEntry).
+
+Entries are created and removed with room membership (m2m_changed, see
+signals.py), moved forward on every message write (one UPDATE per room and
+batch) and recounted when the user's read watermark moves.
+"""
+
+from collections import Counter, OrderedDict
+
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    IntegerField,
+    OuterRef,
+    Q,
+    Subquery,
+    TextField,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import ChatRoom, InboxEntry
+from .selectors import get_unread_messages
+
+
+def _counterpart(user_id, participants: list) -> str | None:
+    """The other party of ``user_id``'s conversation; staff only if nobody else is there."""
+    others = [p for p in participants if p["id"] != user_id]
+    preferred = [p for p in others if not p["is_staff"]] or others
+    return preferred[0]["id"] if preferred else None
+
+
+def sync_room_members(room_id) -> None:
+    """Match a room's inbox entries to its current participants."""
+    room = (
+        ChatRoom.objects.filter(id=room_id)
+        .values("listing_id", "last_message", "last_message_at", "is_active")
+        .first()
+    )
+    if room is None:
+        return
+    participants = [
+        {"id": user_id, "is_staff": is_staff}
+        for user_id, is_staff in ChatRoom.participants.through.objects.filter(
+            chatroom_id=room_id
+        ).values_list("user_id", "user__is_staff")
+    ]
+    member_ids = [p["id"] for p in participants]
+    InboxEntry.objects.filter(room_id=room_id).exclude(user_id__in=member_ids).delete()
+
+    existing = {entry.user_id: entry for entry in InboxEntry.objects.filter(room_id=room_id)}
+    changed = []
+    for user_id, entry in existing.items():
+        counterpart = _counterpart(user_id, participants)
+        if entry.counterpart_id != counterpart:
+            entry.counterpart_id = counterpart
+            changed.append(entry)
+    if changed:
+        InboxEntry.objects.bulk_update(changed, ["counterpart"])
+
+    now = timezone.now()
+    new_entries = [
+        InboxEntry(
+            user_id=user_id,
+            room_id=room_id,
+            counterpart_id=_counterpart(user_id, participants),
+            listing_id=room["listing_id"],
+            last_message=room["last_message"],
+            last_message_at=room["last_message_at"],
+            activity_at=room["last_message_at"] or now,
+            unread_count=(
+                get_unread_messages(room_id, user_id).count() if room["last_message_at"] else 0
+            ),
+            is_active=room["is_active"],
+        )
+        for user_id in member_ids
+        if user_id not in existing
+    ]
+    InboxEntry.objects.bulk_create(new_entries, ignore_conflicts=True)
+
+
+def record_messages(messages) -> None:
+    """Move the inbox entries of each room forward for newly stored ``messages``."""
+    rooms = OrderedDict()
+    for message in messages:
+        rooms.setdefault(message.room_id, []).append(message)
+
+    for room_id, room_messages in rooms.items():
+        latest = room_messages[-1]
+        sent_by = Counter(message.sender_id for message in room_messages)
+        # Everyone gets all new messages as unread, minus the ones they sent themselves
+        own = Case(
+            *[When(user_id=sender_id, then=Value(n)) for sender_id, n in sent_by.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        newer = Q(last_message_at__isnull=True) | Q(last_message_at__lte=latest.created_at)
+        InboxEntry.objects.filter(room_id=room_id).update(
+            unread_count=F("unread_count") + len(room_messages) - own,
+            last_message=Case(
+                When(newer, then=Value(latest.content[:200])),
+                default=F("last_message"),
+                output_field=TextField(),
+            ),
+            last_message_at=Case(
+                When(newer, then=Value(latest.created_at)), default=F("last_message_at")
+            ),
+            activity_at=Greatest(F("activity_at"), Value(latest.created_at)),
+        )
+
+
+def refresh_unread(room_id, user_id) -> None:
+    """Recount one entry's unread messages from the read watermark (one UPDATE)."""
+    unread = (
+        get_unread_messages(room_id, user_id)
+        .filter(room=OuterRef("room"))
+        .order_by()
+        .values("room")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    InboxEntry.objects.filter(room_id=room_id, user_id=user_id).update(
+        unread_count=Coalesce(Subquery(unread, output_field=IntegerField()), Value(0))
+    )
+
+
+def set_room_active(room_id, is_active: bool) -> None:
+    InboxEntry.objects.filter(room_id=room_id).exclude(is_active=is_active).update(
+        is_active=is_active
+    )
@@ -0,0 +1,122 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:09
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max
+
+
+MEMBERSHIP_CHUNK_SIZE = 2000
+
+
+def backfill_read_states(apps, schema_editor):
+    """
+    Start each participant's watermark at the newest message from others marked read.
+
+    One grouped query per chunk of memberships: the newest read message per room
+    and sender, from which each participant takes the newest not sent by them.
+    """
+    ChatRoom = apps.get_model("messaging", "ChatRoom")
+    ChatReadState = apps.get_model("messaging", "ChatReadState")
+    Message = apps.get_model("messaging", "Message")
+    Membership = ChatRoom.participants.through
+
+    memberships = Membership.objects.order_by("chatroom_id").values_list("chatroom_id", "user_id")
+    chunk = []
+    for membership in memberships.iterator(chunk_size=MEMBERSHIP_CHUNK_SIZE):
+        chunk.append(membership)
+        if len(chunk) == MEMBERSHIP_CHUNK_SIZE:
+            _backfill_chunk(ChatReadState, Message, chunk)
+            chunk = []
+    if chunk:
+        _backfill_chunk(ChatReadState, Message, chunk)
+
+
+def _backfill_chunk(ChatReadState, Message, memberships):
+    latest_read = {}  # room id -> {sender id: newest read message time}
+    rows = (
+        Message.objects.filter(room_id__in={room_id for room_id, _ in memberships}, is_read=True)
+        .order_by()
+        .values_list("room_id", "sender_id")
+        .annotate(last=Max("created_at"))
+    )
+    for room_id, sender_id, last in rows:
+        latest_read.setdefault(room_id, {})[sender_id] = last
+
+    states = []
+    for room_id, user_id in memberships:
+        times = [
+            last
+            for sender_id, last in latest_read.get(room_id, {}).items()
+            if sender_id != user_id
+        ]
+        if times:
+            states.append(ChatReadState(room_id=room_id, user_id=user_id, last_read_at=max(times)))
+    ChatReadState.objects.bulk_create(states, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("messaging", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChatReadState",
+            fields=[
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                ("last_read_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "last_read_message",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="messaging.message",
+                    ),
+                ),
+                (
+                    "room",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="read_states",
+                        to="messaging.chatroom",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="chat_read_states",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Chat Read State",
+                "verbose_name_plural": "Chat Read States",
+                "db_table": "chat_read_states",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("room", "user"), name="chat_read_state_room_user_uniq"
+                    )
+                ],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(fields=["room", "created_at"], name="messages_room_created_idx"),
+        ),
+        migrations.RunPython(backfill_read_states, migrations.RunPython.noop),
+    ]
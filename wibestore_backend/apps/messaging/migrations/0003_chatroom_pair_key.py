@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:13
+
+from django.db import migrations, models
+
+
+def backfill_pair_keys(apps, schema_editor):
+    """Key existing one-to-one rooms; the oldest room wins where pairs were duplicated."""
+    ChatRoom = apps.get_model("messaging", "ChatRoom")
+    seen = set()
+    rooms = ChatRoom.objects.order_by("created_at").prefetch_related("participants")
+    for room in rooms.iterator(chunk_size=500):
+        participants = list(room.participants.all())
+        # Order chats also hold the site admins; the pair is buyer and seller
+        pair = (
+            participants
+            if len(participants) == 2
+            else [user for user in participants if not user.is_staff]
+        )
+        if len(pair) != 2:
+            continue
+        low, high = sorted(str(user.pk) for user in pair)
+        key = f"{low}:{high}:{room.listing_id or '-'}"
+        if key in seen:
+            continue
+        seen.add(key)
+        ChatRoom.objects.filter(pk=room.pk).update(pair_key=key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("messaging", "0002_chat_read_states"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chatroom",
+            name="pair_key",
+            field=models.CharField(blank=True, max_length=120, null=True, unique=True),
+        ),
+        migrations.RunPython(backfill_pair_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,171 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:15
+
+import django.db.models.deletion
+import uuid
+from datetime import UTC, datetime
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+ROOM_CHUNK_SIZE = 500
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def backfill_inbox(apps, schema_editor):
+    """
+    One entry per room participant, with unread counts from the read watermarks.
+
+    Two queries per chunk of rooms: the rooms, and their memberships with each
+    participant's unread count computed by correlated subqueries.
+    """
+    ChatRoom = apps.get_model("messaging", "ChatRoom")
+    ChatReadState = apps.get_model("messaging", "ChatReadState")
+    InboxEntry = apps.get_model("messaging", "InboxEntry")
+    Message = apps.get_model("messaging", "Message")
+    Membership = ChatRoom.participants.through
+
+    now = timezone.now()
+    epoch = datetime(1970, 1, 1, tzinfo=UTC)
+    watermark = ChatReadState.objects.filter(
+        room_id=OuterRef("chatroom_id"), user_id=OuterRef("user_id")
+    ).values("last_read_at")[:1]
+    unread = (
+        Message.objects.filter(room_id=OuterRef("chatroom_id"), created_at__gt=OuterRef("read_at"))
+        .exclude(sender_id=OuterRef("user_id"))
+        .order_by()
+        .values("room_id")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+
+    rooms = ChatRoom.objects.order_by("pk").values(
+        "pk", "listing_id", "last_message", "last_message_at", "created_at", "is_active"
+    )
+    for chunk in _chunks(rooms.iterator(chunk_size=ROOM_CHUNK_SIZE), ROOM_CHUNK_SIZE):
+        members = {}
+        memberships = (
+            Membership.objects.filter(chatroom_id__in=[room["pk"] for room in chunk])
+            .annotate(read_at=Coalesce(Subquery(watermark), Value(epoch)))
+            .annotate(unread=Coalesce(Subquery(unread), 0))
+            .order_by("chatroom_id", "-user__created_at")
+            .values_list("chatroom_id", "user_id", "user__is_staff", "unread")
+        )
+        for room_id, user_id, is_staff, unread_count in memberships:
+            members.setdefault(room_id, []).append((user_id, is_staff, unread_count))
+
+        entries = []
+        for room in chunk:
+            participants = members.get(room["pk"], [])
+            for user_id, _, unread_count in participants:
+                others = [p for p in participants if p[0] != user_id]
+                counterpart = ([p for p in others if not p[1]] or others or [(None,)])[0][0]
+                entries.append(
+                    InboxEntry(
+                        user_id=user_id,
+                        room_id=room["pk"],
+                        counterpart_id=counterpart,
+                        listing_id=room["listing_id"],
+                        last_message=room["last_message"],
+                        last_message_at=room["last_message_at"],
+                        activity_at=room["last_message_at"] or room["created_at"] or now,
+                        unread_count=unread_count,
+                        is_active=room["is_active"],
+                    )
+                )
+        InboxEntry.objects.bulk_create(entries, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("marketplace", "0006_listing_feed_indexes"),
+        ("messaging", "0003_chatroom_pair_key"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InboxEntry",
+            fields=[
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                ("last_message", models.TextField(blank=True, default="")),
+                ("last_message_at", models.DateTimeField(blank=True, null=True)),
+                ("activity_at", models.DateTimeField()),
+                ("unread_count", models.PositiveIntegerField(default=0)),
+                ("is_active", models.BooleanField(default=True)),
+                (
+                    "counterpart",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "listing",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="marketplace.listing",
+                    ),
+                ),
+                (
+                    "room",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="inbox_entries",
+                        to="messaging.chatroom",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="inbox_entries",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Inbox Entry",
+                "verbose_name_plural": "Inbox Entries",
+                "db_table": "chat_inbox",
+                "ordering": ["-activity_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["user", "is_active", "-activity_at", "-id"],
+                        name="chat_inbox_user_feed_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "room"), name="chat_inbox_user_room_uniq"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_inbox, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("messaging", "0004_chat_inbox"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    # The new index covers the old one's prefix; create it first so watermark
+    # queries are never left without an index.
+    operations = [
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["room", "created_at", "id"], name="messages_room_history_idx"
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="message",
+            name="messages_room_created_idx",
+        ),
+    ]
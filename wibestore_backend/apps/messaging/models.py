@@ -12,6 +12,9 @@ from core.models import BaseModel
 class ChatRoom(BaseModel):
     """Chat room between two users."""
 
+    # "<lower user id>:<higher user id>:<listing id or ->" for one-to-one rooms
+    pair_key = models.CharField(max_length=120, unique=True, null=True, blank=True)
+
     participants = models.ManyToManyField(
         settings.AUTH_USER_MODEL, related_name="chat_rooms"
     )
@@ -35,6 +38,12 @@ class ChatRoom(BaseModel):
     def __str__(self) -> str:
         return f"ChatRoom {self.id}"
 
+    @staticmethod
+    def make_pair_key(user_id, other_user_id, listing_id=None) -> str:
+        """Canonical key of the room between two users (about a listing), order-independent."""
+        low, high = sorted([str(user_id), str(other_user_id)])
+        return f"{low}:{high}:{listing_id or '-'}"
+
 
 class Message(BaseModel):
     """Chat message."""
@@ -58,6 +67,10 @@ class Message(BaseModel):
         ordering = ["created_at"]
         verbose_name = "Message"
         verbose_name_plural = "Messages"
+        indexes = [
+            # History pages (keyset on created_at, id) and unread counts after a watermark
+            models.Index(fields=["room", "created_at", "id"], name="messages_room_history_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.sender.email}: {self.content[:50]}"
@@ -68,3 +81,92 @@ class Message(BaseModel):
             self.is_read = True
             self.read_at = timezone.now()
             self.save(update_fields=["is_read", "read_at"])
+
+
+class ChatReadState(BaseModel):
+    """
+    How far a participant has read a room ("read up to message X").
+
+    Unread counts are messages from others created after ``last_read_at``;
+    the watermark only ever moves forward.
+    """
+
+    room = models.ForeignKey(ChatRoom, on_delete=models.CASCADE, related_name="read_states")
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="chat_read_states",
+    )
+    last_read_message = models.ForeignKey(
+        Message, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    last_read_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "chat_read_states"
+        verbose_name = "Chat Read State"
+        verbose_name_plural = "Chat Read States"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["room", "user"], name="chat_read_state_room_user_uniq"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user_id} read {self.room_id} up to {self.last_read_at}"
+
+
+class InboxEntry(BaseModel):
+    """
+    One row per room participant: the user's inbox, kept denormalized.
+
+    Maintained by apps.messaging.inbox on message writes, read receipts and
+    membership changes, so the inbox is served from this table alone (plus the
+    counterpart's user row) with keyset pagination on ``activity_at``.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="inbox_entries",
+    )
+    room = models.ForeignKey(ChatRoom, on_delete=models.CASCADE, related_name="inbox_entries")
+    # The other side of the conversation (order chats: the non-staff other party)
+    counterpart = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    listing = models.ForeignKey(
+        "marketplace.Listing",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    last_message = models.TextField(blank=True, default="")
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    # Last message time, or when the user joined the room; the inbox sort key
+    activity_at = models.DateTimeField()
+    unread_count = models.PositiveIntegerField(default=0)
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        db_table = "chat_inbox"
+        ordering = ["-activity_at"]
+        verbose_name = "Inbox Entry"
+        verbose_name_plural = "Inbox Entries"
+        constraints = [
+            models.UniqueConstraint(fields=["user", "room"], name="chat_inbox_user_room_uniq"),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "is_active", "-activity_at", "-id"],
+                name="chat_inbox_user_feed_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"Inbox {self.user_id} / {self.room_id}"
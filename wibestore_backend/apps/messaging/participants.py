@@ -0,0 +1,142 @@
+"""
+WibeStore Backend - Chat Participant Cache
+Room membership lookups for WebSocket connects and messaging views.
+
+Each room's ``(is_active, participant ids)`` is kept in Redis (shared by all
+processes) with a small in-process LRU in front. ``m2m_changed`` on
+ChatRoom.participants and ChatRoom saves/deletes invalidate both (see
+signals.py); other processes' LRU entries expire after
+CHAT_PARTICIPANT_LOCAL_TTL seconds. Without Redis, or while it is failing, the
+database is queried behind the LRU.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from core.redis import get_redis_client
+
+KEY_PREFIX = "wibestore:chat:participants"
+
+logger = logging.getLogger("apps.messaging")
+
+
+def _redis_key(room_id) -> str:
+    return f"{KEY_PREFIX}:{room_id}"
+
+
+class ParticipantCache:
+    """``room_id -> (is_active, frozenset of participant id strings)``."""
+
+    def __init__(self):
+        self._local: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def peek(self, room_id):
+        """The in-process entry for ``room_id`` if fresh, without any I/O."""
+        key = str(room_id)
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return value
+
+    def get(self, room_id):
+        """``(is_active, participant ids)`` for ``room_id``, or None if it doesn't exist."""
+        value = self.peek(room_id)
+        if value is not None:
+            return value or None
+
+        client = get_redis_client()
+        raw = None
+        if client is not None:
+            try:
+                raw = client.get(_redis_key(room_id))
+            except Exception as e:
+                logger.warning("Failed to read participants of room %s: %s", room_id, e)
+                client = None
+        if raw is not None:
+            value = self._decode(raw)
+        else:
+            value = self._load(room_id)
+            if client is not None:
+                self._store(client, room_id, value)
+        self._remember(room_id, value)
+        return value or None
+
+    def is_participant(self, room_id, user_id, *, require_active: bool = False) -> bool:
+        value = self.get(room_id)
+        if value is None:
+            return False
+        is_active, participant_ids = value
+        return (is_active or not require_active) and str(user_id) in participant_ids
+
+    def invalidate(self, room_id) -> None:
+        with self._lock:
+            self._local.pop(str(room_id), None)
+        client = get_redis_client()
+        if client is None:
+            return
+        try:
+            client.delete(_redis_key(room_id))
+        except Exception as e:
+            # The local TTL and the on-commit invalidation bound the staleness
+            logger.warning("Failed to invalidate participants of room %s: %s", room_id, e)
+
+    def clear_local(self) -> None:
+        with self._lock:
+            self._local.clear()
+
+    def _store(self, client, room_id, value) -> None:
+        try:
+            client.set(
+                _redis_key(room_id), self._encode(value), ex=settings.CHAT_PARTICIPANT_CACHE_TTL
+            )
+        except Exception as e:
+            logger.warning("Failed to cache participants of room %s: %s", room_id, e)
+
+    def _remember(self, room_id, value) -> None:
+        expires_at = time.monotonic() + settings.CHAT_PARTICIPANT_LOCAL_TTL
+        with self._lock:
+            self._local[str(room_id)] = (expires_at, value)
+            self._local.move_to_end(str(room_id))
+            while len(self._local) > settings.CHAT_PARTICIPANT_LOCAL_SIZE:
+                self._local.popitem(last=False)
+
+    @staticmethod
+    def _load(room_id):
+        """Room state from the database; ``()`` marks a missing room."""
+        from .models import ChatRoom
+
+        room = ChatRoom.objects.filter(id=room_id).values("is_active").first()
+        if room is None:
+            return ()
+        ids = ChatRoom.participants.through.objects.filter(chatroom_id=room_id).values_list(
+            "user_id", flat=True
+        )
+        return (room["is_active"], frozenset(str(user_id) for user_id in ids))
+
+    @staticmethod
+    def _encode(value) -> str:
+        if not value:
+            return "[]"
+        return json.dumps([value[0], sorted(value[1])])
+
+    @staticmethod
+    def _decode(raw: str):
+        data = json.loads(raw)
+        if not data:
+            return ()
+        return (data[0], frozenset(data[1]))
+
+
+participant_cache = ParticipantCache()
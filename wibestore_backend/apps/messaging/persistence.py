@@ -0,0 +1,151 @@
+"""
+WibeStore Backend - Chat Message Persistence
+Write-coalescing batcher used by ChatConsumer.
+
+Messages are broadcast as soon as they arrive and queued here; the batcher
+writes everything queued within CHAT_PERSIST_FLUSH_INTERVAL seconds (or
+CHAT_PERSIST_BATCH_SIZE messages) with one bulk INSERT and one ChatRoom UPDATE
+per room. Flushes run one at a time in queue order, so messages are stored in
+the order they were received. Each submit() returns a future that resolves once
+the message is committed (or fails with the database error), which the
+consumer turns into an acknowledgement for the sender. Unread counters are
+updated only after the futures are resolved, so a counter failure can never
+hold back or fail an acknowledgement.
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import Q
+
+from apps.notifications.counters import UnreadCounters
+
+from . import inbox
+from .models import ChatRoom, Message
+
+logger = logging.getLogger("apps.messaging")
+
+
+def write_messages(messages: list[Message]) -> list[Message]:
+    """Insert ``messages`` in order and move each room's last_message forward."""
+    with transaction.atomic():
+        Message.objects.bulk_create(messages)
+        latest = OrderedDict()
+        for message in messages:
+            latest[message.room_id] = message
+        for room_id, message in latest.items():
+            # Never move last_message back behind a write from another process
+            ChatRoom.objects.filter(
+                Q(last_message_at__isnull=True) | Q(last_message_at__lte=message.created_at),
+                id=room_id,
+            ).update(last_message=message.content[:200], last_message_at=message.created_at)
+        inbox.record_messages(messages)
+    return messages
+
+
+class MessageBatcher:
+    """Per-event-loop queue of unsaved messages, flushed in batches."""
+
+    def __init__(self, batch_size: int | None = None, flush_interval: float | None = None):
+        self.batch_size = batch_size or settings.CHAT_PERSIST_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.CHAT_PERSIST_FLUSH_INTERVAL
+        self.loop = asyncio.get_running_loop()
+        self._pending: list[tuple[Message, asyncio.Future]] = []
+        self._flush_lock = asyncio.Lock()
+        self._timer = None
+        self._tasks: set[asyncio.Task] = set()
+
+    def submit(self, message: Message) -> asyncio.Future:
+        """Queue ``message``; the returned future resolves to it once stored."""
+        future = self.loop.create_future()
+        self._pending.append((message, future))
+        if len(self._pending) >= self.batch_size:
+            self._schedule_flush()
+        elif self._timer is None:
+            self._timer = self.loop.call_later(self.flush_interval, self._schedule_flush)
+        return future
+
+    def _schedule_flush(self) -> None:
+        task = self.loop.create_task(self.flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self) -> None:
+        """Write everything queued so far."""
+        async with self._flush_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            batch, self._pending = self._pending, []
+            if not batch:
+                return
+            try:
+                await database_sync_to_async(write_messages)([message for message, _ in batch])
+            except DatabaseError:
+                # One bad room (e.g. deleted meanwhile) must not drop the others
+                stored = await self._flush_per_room(batch)
+            except Exception as exc:
+                logger.exception("Failed to store %d message(s)", len(batch))
+                self._fail(batch, exc)
+                return
+            else:
+                stored = [message for message, _ in batch]
+                for message, future in batch:
+                    if not future.done():
+                        future.set_result(message)
+            finally:
+                # Nothing may leave a sender waiting for an acknowledgement
+                self._fail(batch, RuntimeError("Message was not stored."))
+            if stored:
+                await self._count_unread(stored)
+
+    async def _flush_per_room(self, batch: list) -> list[Message]:
+        """Write ``batch`` room by room; returns the messages that were stored."""
+        rooms = OrderedDict()
+        for message, future in batch:
+            rooms.setdefault(message.room_id, []).append((message, future))
+        stored = []
+        for room_id, items in rooms.items():
+            try:
+                await database_sync_to_async(write_messages)([message for message, _ in items])
+            except Exception as exc:
+                logger.error(
+                    "Failed to store %d message(s) for room %s: %s", len(items), room_id, exc
+                )
+                self._fail(items, exc)
+                continue
+            for message, future in items:
+                stored.append(message)
+                if not future.done():
+                    future.set_result(message)
+        return stored
+
+    @staticmethod
+    def _fail(items: list, exc: Exception) -> None:
+        for _, future in items:
+            if not future.done():
+                future.set_exception(exc)
+
+    @staticmethod
+    async def _count_unread(messages: list[Message]) -> None:
+        """Best-effort badge updates; the messages are already stored and acknowledged."""
+        try:
+            await database_sync_to_async(UnreadCounters.add_chat_messages)(messages)
+        except Exception:
+            logger.exception("Failed to update unread counters for %d message(s)", len(messages))
+
+
+_batcher: MessageBatcher | None = None
+
+
+def get_batcher() -> MessageBatcher:
+    """The batcher of the running event loop (one per server process)."""
+    global _batcher
+    loop = asyncio.get_running_loop()
+    if _batcher is None or _batcher.loop is not loop:
+        _batcher = MessageBatcher()
+    return _batcher
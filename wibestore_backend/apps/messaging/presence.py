@@ -0,0 +1,134 @@
+"""
+WibeStore Backend - Chat Presence
+Online / last-seen tracking and typing-indicator throttling, kept in Redis.
+
+Every open WebSocket (chat rooms and the notification socket) is a member of its
+user's ``wibestore:presence:<user id>`` sorted set, scored with the time its
+heartbeat expires; a user is online while any member's score is in the future,
+so a crashed process's connections simply age out after CHAT_PRESENCE_TTL
+seconds. ``wibestore:presence:seen:<user id>`` holds the last heartbeat time.
+Lookups for many users (the inbox) are one pipelined round trip and never touch
+the database.
+
+Typing frames are coalesced to at most one broadcast per user and room every
+CHAT_TYPING_INTERVAL seconds: each connection drops repeats locally, and a
+``SET NX PX`` key makes the limit hold across tabs and processes.
+Without Redis presence is not tracked (everyone is offline) and typing is only
+throttled per connection. Presence is decorative: Redis errors are logged and
+treated the same way.
+"""
+
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from core.redis import get_redis_client
+
+KEY_PREFIX = "wibestore:presence"
+TYPING_PREFIX = "wibestore:typing"
+
+logger = logging.getLogger("apps.messaging")
+
+
+def _online_key(user_id) -> str:
+    return f"{KEY_PREFIX}:{user_id}"
+
+
+def _seen_key(user_id) -> str:
+    return f"{KEY_PREFIX}:seen:{user_id}"
+
+
+def heartbeat(user_id, connection_id: str) -> None:
+    """Mark ``connection_id`` of ``user_id`` as alive for another CHAT_PRESENCE_TTL seconds."""
+    client = get_redis_client()
+    if client is None:
+        return
+    now = time.time()
+    ttl = settings.CHAT_PRESENCE_TTL
+    try:
+        pipe = client.pipeline(transaction=False)
+        pipe.zadd(_online_key(user_id), {connection_id: now + ttl})
+        pipe.zremrangebyscore(_online_key(user_id), "-inf", now)
+        pipe.expire(_online_key(user_id), ttl)
+        pipe.set(_seen_key(user_id), int(now), ex=settings.CHAT_PRESENCE_LAST_SEEN_TTL)
+        pipe.execute()
+    except Exception as e:
+        logger.warning("Failed to record presence heartbeat of %s: %s", user_id, e)
+
+
+def leave(user_id, connection_id: str) -> None:
+    """Drop a closed connection; the user stays online while others are alive."""
+    client = get_redis_client()
+    if client is None:
+        return
+    try:
+        pipe = client.pipeline(transaction=False)
+        pipe.zrem(_online_key(user_id), connection_id)
+        pipe.set(_seen_key(user_id), int(time.time()), ex=settings.CHAT_PRESENCE_LAST_SEEN_TTL)
+        pipe.execute()
+    except Exception as e:
+        logger.warning("Failed to record presence leave of %s: %s", user_id, e)
+
+
+def get_presence(user_ids) -> dict:
+    """``{user id: {"online": bool, "last_seen": epoch seconds or None}}`` for ``user_ids``."""
+    user_ids = [str(user_id) for user_id in dict.fromkeys(user_ids) if user_id]
+    offline = {user_id: {"online": False, "last_seen": None} for user_id in user_ids}
+    client = get_redis_client()
+    if client is None or not user_ids:
+        return offline
+
+    now = time.time()
+    try:
+        pipe = client.pipeline(transaction=False)
+        for user_id in user_ids:
+            pipe.zcount(_online_key(user_id), now, "+inf")
+        pipe.mget([_seen_key(user_id) for user_id in user_ids])
+        *alive, seen = pipe.execute()
+    except Exception as e:
+        logger.warning("Failed to read presence of %d user(s): %s", len(user_ids), e)
+        return offline
+    return {
+        user_id: {"online": count > 0, "last_seen": int(last_seen) if last_seen else None}
+        for user_id, count, last_seen in zip(user_ids, alive, seen, strict=True)
+    }
+
+
+def claim_typing_slot(room_id, user_id) -> bool:
+    """Whether a typing broadcast by ``user_id`` in ``room_id`` is due, across all processes."""
+    client = get_redis_client()
+    if client is None:
+        return True
+    interval_ms = int(settings.CHAT_TYPING_INTERVAL * 1000)
+    try:
+        return bool(client.set(f"{TYPING_PREFIX}:{room_id}:{user_id}", 1, nx=True, px=interval_ms))
+    except Exception as e:
+        logger.warning("Failed to claim typing slot in room %s: %s", room_id, e)
+        return True
+
+
+class PresenceMixin:
+    """
+    Presence for WebSocket consumers: call ``presence_connect`` after accepting,
+    ``presence_touch`` on incoming frames and ``presence_disconnect`` on close.
+    Heartbeats are written at most every third of CHAT_PRESENCE_TTL.
+    """
+
+    presence_refreshed_at = 0.0
+
+    async def presence_connect(self) -> None:
+        self.presence_refreshed_at = 0.0
+        await self.presence_touch()
+
+    async def presence_touch(self) -> None:
+        now = time.monotonic()
+        if now - self.presence_refreshed_at < settings.CHAT_PRESENCE_TTL / 3:
+            return
+        self.presence_refreshed_at = now
+        await sync_to_async(heartbeat, thread_sensitive=False)(self.user.id, self.channel_name)
+
+    async def presence_disconnect(self) -> None:
+        if self.presence_refreshed_at:
+            await sync_to_async(leave, thread_sensitive=False)(self.user.id, self.channel_name)
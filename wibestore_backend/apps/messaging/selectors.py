@@ -0,0 +1,19 @@
+"""
+WibeStore Backend - Messaging Selectors
+"""
+
+from django.db.models import Exists, OuterRef, QuerySet
+
+from .models import ChatReadState, Message
+
+
+def _unread(messages: QuerySet, user) -> QuerySet:
+    """Messages from others that are newer than ``user``'s read watermark of their room."""
+    read = ChatReadState.objects.filter(
+        room=OuterRef("room"), user=user, last_read_at__gte=OuterRef("created_at")
+    )
+    return messages.exclude(sender=user).filter(~Exists(read))
+
+
+def get_unread_messages(room_id, user) -> QuerySet:
+    return _unread(Message.objects.filter(room_id=room_id), user)
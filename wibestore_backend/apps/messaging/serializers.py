@@ -6,7 +6,8 @@ from rest_framework import serializers
 
 from apps.accounts.serializers import UserPublicSerializer
 
-from .models import ChatRoom, Message
+from .models import ChatRoom, InboxEntry, Message
+from .selectors import get_unread_messages
 
 
 class MessageSerializer(serializers.ModelSerializer):
@@ -28,6 +29,29 @@ class MessageSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "sender", "is_read", "read_at", "created_at"]
 
 
+class MessageHistorySerializer(serializers.ModelSerializer):
+    """
+    A message in a history page: ``sender`` is the sender's id, resolved through
+    the page's ``senders`` map instead of repeating the user object per message.
+    """
+
+    sender = serializers.UUIDField(source="sender_id", read_only=True)
+
+    class Meta:
+        model = Message
+        fields = [
+            "id",
+            "sender",
+            "content",
+            "message_type",
+            "attachment",
+            "is_read",
+            "read_at",
+            "created_at",
+        ]
+        read_only_fields = fields
+
+
 class ChatRoomSerializer(serializers.ModelSerializer):
     participants = UserPublicSerializer(many=True, read_only=True)
     last_message_preview = serializers.CharField(source="last_message", read_only=True)
@@ -49,10 +73,42 @@ class ChatRoomSerializer(serializers.ModelSerializer):
     def get_unread_count(self, obj) -> int:
         request = self.context.get("request")
         if request and request.user.is_authenticated:
-            return obj.messages.filter(is_read=False).exclude(sender=request.user).count()
+            return get_unread_messages(obj.id, request.user).count()
         return 0
 
 
+class InboxEntrySerializer(serializers.ModelSerializer):
+    """
+    A room as listed in the user's inbox (``id`` is the room id).
+    ``counterpart_presence`` comes from the ``presence`` map in the context.
+    """
+
+    id = serializers.UUIDField(source="room_id", read_only=True)
+    counterpart = UserPublicSerializer(read_only=True)
+    counterpart_presence = serializers.SerializerMethodField()
+    last_message_preview = serializers.CharField(source="last_message", read_only=True)
+
+    class Meta:
+        model = InboxEntry
+        fields = [
+            "id",
+            "counterpart",
+            "counterpart_presence",
+            "listing",
+            "last_message_preview",
+            "last_message_at",
+            "unread_count",
+            "is_active",
+            "activity_at",
+        ]
+
+    def get_counterpart_presence(self, obj) -> dict | None:
+        if obj.counterpart_id is None:
+            return None
+        presence = self.context.get("presence", {})
+        return presence.get(str(obj.counterpart_id), {"online": False, "last_seen": None})
+
+
 class CreateChatRoomSerializer(serializers.Serializer):
     participant_id = serializers.UUIDField()
     listing_id = serializers.UUIDField(required=False)
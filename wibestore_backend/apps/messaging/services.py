@@ -5,14 +5,43 @@ WibeStore Backend - Messaging Services
 import logging
 
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Exists, Q, Subquery
 from django.utils import timezone
 
-from .models import ChatRoom, Message
+from apps.notifications.counters import UnreadCounters
+
+from . import inbox
+from .models import ChatReadState, ChatRoom, Message
 
 User = get_user_model()
 logger = logging.getLogger("apps.messaging")
 
 
+def record_new_messages(messages) -> None:
+    """Inbox entries and unread counters for messages just stored."""
+    inbox.record_messages(messages)
+    UnreadCounters.add_chat_messages(messages)
+
+
+def get_or_create_direct_room(user, other_user, listing_id=None) -> tuple[ChatRoom, bool]:
+    """
+    The room between two users (about a listing), created if missing.
+
+    One lookup on the unique pair_key. Concurrent creators race on that index:
+    the loser's INSERT waits for the winner's transaction (which includes the
+    participants) and then returns its room.
+    """
+    with transaction.atomic():
+        room, created = ChatRoom.objects.get_or_create(
+            pair_key=ChatRoom.make_pair_key(user.pk, other_user.pk, listing_id),
+            defaults={"listing_id": listing_id},
+        )
+        if created:
+            room.participants.add(user, other_user)
+    return room, created
+
+
 def create_order_chat_for_escrow(escrow):
     """
     Create or get a chat room for an escrow (order) with buyer, seller and all site admins.
@@ -22,20 +51,10 @@ def create_order_chat_for_escrow(escrow):
     seller = escrow.seller
     listing = escrow.listing
 
-    # Find existing room for this listing with buyer and seller
-    existing = (
-        ChatRoom.objects.filter(listing=listing, is_active=True)
-        .filter(participants=buyer)
-        .filter(participants=seller)
-    ).first()
-
-    if existing:
-        room = existing
-        created = False
-    else:
-        room = ChatRoom.objects.create(listing=listing)
-        room.participants.add(buyer, seller)
-        created = True
+    room, created = get_or_create_direct_room(buyer, seller, listing.id)
+    if not room.is_active:
+        room.is_active = True
+        room.save(update_fields=["is_active"])
 
     # Add all site administrators (is_staff) to the chat
     admins = User.objects.filter(is_staff=True, is_active=True).exclude(
@@ -56,10 +75,50 @@ def create_order_chat_for_escrow(escrow):
             f"Xarid tasdiqlandi. «{listing.title}» uchun suhbat boshlandi. "
             "Savollar bo'lsa shu yerda yozing."
         )
-        Message.objects.create(room=room, sender=buyer, content=welcome)
+        welcome_message = Message.objects.create(room=room, sender=buyer, content=welcome)
+        record_new_messages([welcome_message])
         room.last_message = welcome[:200]
         room.last_message_at = timezone.now()
         room.save(update_fields=["last_message", "last_message_at"])
         logger.info("Order chat created: room %s for escrow %s (buyer=%s, seller=%s)", room.id, escrow.id, buyer.email, seller.email)
 
     return room
+
+
+def mark_room_read(room_id, user, message_id) -> bool:
+    """
+    Move ``user``'s read watermark in the room up to ``message_id``.
+
+    One UPDATE moves an existing watermark forward (it never moves back); the
+    first receipt in a room creates it. Messages from others up to the
+    watermark get their is_read flag in one more statement. Returns whether
+    the watermark advanced.
+    """
+    message = Message.objects.filter(id=message_id, room_id=room_id)
+    read_at = Subquery(message.values("created_at")[:1])
+    now = timezone.now()
+
+    advanced = ChatReadState.objects.filter(
+        Exists(message),
+        Q(last_read_at__isnull=True) | Q(last_read_at__lt=read_at),
+        room_id=room_id,
+        user=user,
+    ).update(last_read_at=read_at, last_read_message_id=message_id, updated_at=now)
+
+    if not advanced and not ChatReadState.objects.filter(room_id=room_id, user=user).exists():
+        created_at = message.values_list("created_at", flat=True).first()
+        if created_at is None:
+            return False
+        _, advanced = ChatReadState.objects.get_or_create(
+            room_id=room_id,
+            user=user,
+            defaults={"last_read_at": created_at, "last_read_message_id": message_id},
+        )
+
+    if advanced:
+        Message.objects.filter(room_id=room_id, is_read=False, created_at__lte=read_at).exclude(
+            sender=user
+        ).update(is_read=True, read_at=now)
+        inbox.refresh_unread(room_id, user.id)
+        UnreadCounters.refresh_chat_room(user.id, room_id)
+    return bool(advanced)
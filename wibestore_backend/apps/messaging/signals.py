@@ -0,0 +1,57 @@
+"""
+WibeStore Backend - Messaging Signals
+"""
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from . import inbox
+from .models import ChatRoom
+from .participants import participant_cache
+
+
+def _invalidate_rooms(room_ids, *, membership: bool = False) -> None:
+    room_ids = list(room_ids)
+    for room_id in room_ids:
+        participant_cache.invalidate(room_id)
+        if membership:
+            inbox.sync_room_members(room_id)
+
+    # Again after commit, in case a reader re-cached the old state meanwhile
+    def invalidate_after_commit():
+        for room_id in room_ids:
+            participant_cache.invalidate(room_id)
+
+    transaction.on_commit(invalidate_after_commit)
+
+
+@receiver(m2m_changed, sender=ChatRoom.participants.through)
+def chat_room_participants_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Drop cached participant sets and resync inboxes of rooms whose membership changed."""
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            _invalidate_rooms([instance.pk], membership=True)
+    elif action == "pre_clear":
+        # user.chat_rooms.clear(): remember the rooms before the rows are gone
+        instance._cleared_chat_room_ids = list(instance.chat_rooms.values_list("pk", flat=True))
+    elif action == "post_clear":
+        _invalidate_rooms(getattr(instance, "_cleared_chat_room_ids", []), membership=True)
+    elif action in ("post_add", "post_remove"):
+        _invalidate_rooms(pk_set or [], membership=True)
+
+
+@receiver([post_save, post_delete], sender=ChatRoom)
+def chat_room_invalidate_participants(sender, instance, update_fields=None, **kwargs):
+    """is_active is cached alongside the participants (last_message saves don't matter)."""
+    if update_fields is not None and "is_active" not in update_fields:
+        return
+    _invalidate_rooms([instance.pk])
+
+
+@receiver(post_save, sender=ChatRoom)
+def chat_room_sync_inbox_active(sender, instance, created, update_fields=None, **kwargs):
+    """Hide or show the room in its participants' inboxes."""
+    if created or (update_fields is not None and "is_active" not in update_fields):
+        return
+    inbox.set_room_active(instance.pk, instance.is_active)
@@ -8,28 +8,47 @@ from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import ChatRoom, Message
+from apps.accounts.serializers import UserPublicSerializer
+from core.pagination import AnchoredKeysetPagination, KeysetPagination
+
+from .models import ChatRoom, InboxEntry, Message
+from .participants import participant_cache
+from .presence import get_presence
 from .serializers import (
     ChatRoomSerializer,
     CreateChatRoomSerializer,
+    InboxEntrySerializer,
+    MessageHistorySerializer,
     MessageSerializer,
     SendMessageSerializer,
 )
+from .services import get_or_create_direct_room, record_new_messages
 
 User = get_user_model()
 
 
 @extend_schema(tags=["Messaging"])
 class ChatRoomListView(generics.ListAPIView):
-    """GET /api/v1/chat/ — User's chat rooms."""
+    """GET /api/v1/chat/ — User's chat rooms (inbox), most recent activity first."""
 
-    serializer_class = ChatRoomSerializer
+    serializer_class = InboxEntrySerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
-        return ChatRoom.objects.filter(
-            participants=self.request.user, is_active=True
-        ).prefetch_related("participants")
+        return (
+            InboxEntry.objects.filter(user=self.request.user, is_active=True)
+            .select_related("counterpart")
+            .order_by("-activity_at")
+        )
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        # One Redis round trip for the whole page, no database access
+        context = self.get_serializer_context()
+        context["presence"] = get_presence(entry.counterpart_id for entry in page)
+        serializer = self.get_serializer_class()(page, many=True, context=context)
+        return self.get_paginated_response(serializer.data)
 
 
 @extend_schema(tags=["Messaging"])
@@ -54,25 +73,15 @@ class ChatRoomCreateView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        # Check for existing room between these users
-        existing_rooms = ChatRoom.objects.filter(participants=request.user).filter(
-            participants=other_user
-        )
-        if listing_id:
-            existing_rooms = existing_rooms.filter(listing_id=listing_id)
-
-        if existing_rooms.exists():
-            room = existing_rooms.first()
-        else:
-            room = ChatRoom.objects.create(listing_id=listing_id)
-            room.participants.add(request.user, other_user)
+        room, _ = get_or_create_direct_room(request.user, other_user, listing_id)
 
         # Send initial message if provided
         initial_message = serializer.validated_data.get("initial_message", "")
         if initial_message:
-            Message.objects.create(
+            message = Message.objects.create(
                 room=room, sender=request.user, content=initial_message
             )
+            record_new_messages([message])
             room.last_message = initial_message
             from django.utils import timezone
             room.last_message_at = timezone.now()
@@ -89,16 +98,34 @@ class ChatRoomCreateView(APIView):
 
 @extend_schema(tags=["Messaging"])
 class ChatRoomMessagesView(generics.ListAPIView):
-    """GET /api/v1/chat/{room_id}/messages/ — Chat room messages."""
+    """
+    GET /api/v1/chat/{room_id}/messages/ — Chat room history, oldest first.
+
+    Returns the latest messages; ``?before=`` / ``?after=`` (a cursor from the
+    ``previous`` / ``next`` link, or a message id) load older / newer ones.
+    Senders are listed once per page in ``senders``, keyed by user id.
+    """
 
-    serializer_class = MessageSerializer
+    serializer_class = MessageHistorySerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = AnchoredKeysetPagination
 
     def get_queryset(self):
         room_id = self.kwargs.get("room_id")
-        return Message.objects.filter(
-            room_id=room_id, room__participants=self.request.user
-        ).select_related("sender")
+        if not participant_cache.is_participant(room_id, self.request.user.id):
+            return Message.objects.none()
+        return Message.objects.filter(room_id=room_id).order_by("created_at", "id")
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+        sender_ids = {message.sender_id for message in page}
+        senders = User.objects.filter(id__in=sender_ids) if sender_ids else []
+        response.data["senders"] = {
+            str(user.id): UserPublicSerializer(user, context=self.get_serializer_context()).data
+            for user in senders
+        }
+        return response
 
 
 @extend_schema(tags=["Messaging"])
@@ -112,11 +139,10 @@ class SendMessageView(APIView):
         serializer = SendMessageSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        try:
-            room = ChatRoom.objects.get(
-                id=room_id, participants=request.user, is_active=True
-            )
-        except ChatRoom.DoesNotExist:
+        room = None
+        if participant_cache.is_participant(room_id, request.user.id, require_active=True):
+            room = ChatRoom.objects.filter(id=room_id).first()
+        if room is None:
             return Response(
                 {"success": False, "error": {"message": "Chat room not found."}},
                 status=status.HTTP_404_NOT_FOUND,
@@ -128,6 +154,7 @@ class SendMessageView(APIView):
             content=serializer.validated_data["content"],
             message_type=serializer.validated_data.get("message_type", "text"),
         )
+        record_new_messages([message])
 
         room.last_message = message.content[:200]
         from django.utils import timezone
@@ -3,12 +3,15 @@ WibeStore Backend - Notifications WebSocket Consumer
 """
 
 import logging
-from channels.generic.websocket import AsyncJsonWebSocketConsumer
+
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from apps.messaging.presence import PresenceMixin
 
 logger = logging.getLogger("apps.notifications")
 
 
-class NotificationConsumer(AsyncJsonWebSocketConsumer):
+class NotificationConsumer(PresenceMixin, AsyncJsonWebsocketConsumer):
     """WebSocket consumer for real-time notifications."""
 
     async def connect(self):
@@ -20,12 +23,23 @@ class NotificationConsumer(AsyncJsonWebSocketConsumer):
         self.group_name = f"notifications_{self.user.id}"
         await self.channel_layer.group_add(self.group_name, self.channel_name)
         await self.accept()
+        await self.presence_connect()
         logger.info("Notification WS connected: user=%s", self.user.email)
 
     async def disconnect(self, close_code):
         if hasattr(self, "group_name"):
             await self.channel_layer.group_discard(self.group_name, self.channel_name)
+            await self.presence_disconnect()
+
+    async def receive_json(self, content):
+        await self.presence_touch()
+        if content.get("type") == "ping":
+            await self.send_json({"type": "pong"})
 
     async def notification_message(self, event):
         """Send notification to WebSocket client."""
         await self.send_json(event["notification"])
+
+    async def badge_counts(self, event):
+        """Send updated unread badge counts to WebSocket client."""
+        await self.send_json({"type": "badges", "counts": event["counts"]})
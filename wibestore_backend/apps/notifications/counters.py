@@ -0,0 +1,244 @@
+"""
+WibeStore Backend - Unread Counters
+Badge counts (unread notifications, unread chat messages per room) in Redis.
+
+Each user has one hash ``wibestore:unread:<user id>`` with a ``notifications``
+field and a ``chat:<room id>`` field per room with unread messages, so all
+badges are read with a single HGETALL. Hashes are built from the database on
+first read and then kept current by increments on create and resets on read;
+increments only apply to hashes that exist, so a missing or expired hash is
+simply rebuilt. The ``rebuild_unread_counters`` beat task corrects any drift.
+
+Changes caused by reads and chat messages are pushed to the user's
+notification WebSocket as a ``badges`` event; new notifications are not, since
+their own ``notification_message`` event already implies +1.
+Without Redis (development, tests) badges are counted in the database on read
+and nothing is pushed, so hot write paths never pay for counting.
+Writes and pushes are best-effort: a Redis error is logged and skipped (the
+hourly rebuild corrects the counts) and never fails the write that caused it.
+"""
+
+import logging
+from collections import Counter
+
+from asgiref.sync import async_to_sync
+
+from core.redis import get_redis_client
+
+logger = logging.getLogger("apps.notifications")
+
+KEY_PREFIX = "wibestore:unread"
+READY_FIELD = "_ready"
+NOTIFICATIONS_FIELD = "notifications"
+CHAT_FIELD_PREFIX = "chat:"
+COUNTER_TTL = 7 * 24 * 60 * 60  # idle users' hashes expire and are rebuilt on demand
+
+# KEYS: user hash; ARGV: field, delta, drop field at zero (1/0).
+# Skips missing hashes and never goes below zero.
+_INCREMENT_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return nil
+end
+local value = redis.call('HINCRBY', KEYS[1], ARGV[1], ARGV[2])
+if value <= 0 and ARGV[3] == '1' then
+    redis.call('HDEL', KEYS[1], ARGV[1])
+    value = 0
+elseif value < 0 then
+    redis.call('HSET', KEYS[1], ARGV[1], 0)
+    value = 0
+end
+return value
+"""
+
+
+def _key(user_id) -> str:
+    return f"{KEY_PREFIX}:{user_id}"
+
+
+def _chat_field(room_id) -> str:
+    return f"{CHAT_FIELD_PREFIX}{room_id}"
+
+
+class UnreadCounters:
+    """Per-user badge counts."""
+
+    @staticmethod
+    def get(user_id) -> dict:
+        """All badge counts of a user: ``{notifications, chat: {room: n}, chat_total}``."""
+        client = get_redis_client()
+        if client is None:
+            return UnreadCounters._format(UnreadCounters._count_in_database(user_id))
+
+        try:
+            fields = client.hgetall(_key(user_id))
+            if fields:
+                client.expire(_key(user_id), COUNTER_TTL)
+        except Exception as e:
+            logger.warning("Failed to read unread counters of %s: %s", user_id, e)
+            return UnreadCounters._format(UnreadCounters._count_in_database(user_id))
+        if not fields:
+            return UnreadCounters.rebuild(user_id)
+        return UnreadCounters._format(fields)
+
+    @staticmethod
+    def rebuild(user_id) -> dict:
+        """Recount a user's badges from the database (and store them when Redis is on)."""
+        fields = UnreadCounters._count_in_database(user_id)
+        client = get_redis_client()
+        if client is not None:
+            try:
+                pipe = client.pipeline()
+                pipe.delete(_key(user_id))
+                pipe.hset(_key(user_id), mapping=fields)
+                pipe.expire(_key(user_id), COUNTER_TTL)
+                pipe.execute()
+            except Exception as e:
+                logger.warning("Failed to store unread counters of %s: %s", user_id, e)
+        return UnreadCounters._format(fields)
+
+    @staticmethod
+    def add_notifications(user_ids, delta: int = 1) -> None:
+        UnreadCounters._increment([(user_id, NOTIFICATIONS_FIELD, delta) for user_id in user_ids])
+
+    @staticmethod
+    def reset_notifications(user_id) -> None:
+        client = get_redis_client()
+        try:
+            if client is not None and client.exists(_key(user_id)):
+                client.hset(_key(user_id), NOTIFICATIONS_FIELD, 0)
+        except Exception as e:
+            logger.warning("Failed to reset notification counter of %s: %s", user_id, e)
+        UnreadCounters.push([user_id])
+
+    @staticmethod
+    def add_chat_messages(messages) -> None:
+        """Count new messages for every room participant except their sender."""
+        if get_redis_client() is None:
+            return
+        from apps.messaging.participants import participant_cache
+
+        deltas = Counter()
+        try:
+            for message in messages:
+                room = participant_cache.get(message.room_id)
+                if room is None:
+                    continue
+                for user_id in room[1]:
+                    if user_id != str(message.sender_id):
+                        deltas[(user_id, _chat_field(message.room_id))] += 1
+        except Exception as e:
+            logger.warning("Failed to count %d chat message(s): %s", len(messages), e)
+            return
+        if not deltas:
+            return
+        UnreadCounters._increment([(user_id, field, n) for (user_id, field), n in deltas.items()])
+        UnreadCounters.push({user_id for user_id, _ in deltas})
+
+    @staticmethod
+    def refresh_chat_room(user_id, room_id) -> None:
+        """Recount one room after its read watermark moved."""
+        client = get_redis_client()
+        if client is None:
+            return
+        from apps.messaging.selectors import get_unread_messages
+
+        try:
+            if not client.exists(_key(user_id)):
+                return
+            count = get_unread_messages(room_id, user_id).count()
+            if count > 0:
+                client.hset(_key(user_id), _chat_field(room_id), count)
+            else:
+                client.hdel(_key(user_id), _chat_field(room_id))
+        except Exception as e:
+            logger.warning("Failed to refresh chat counter of %s: %s", user_id, e)
+            return
+        UnreadCounters.push([user_id])
+
+    @staticmethod
+    def push(user_ids) -> None:
+        """
+        Send current badge counts to each user's notification WebSocket.
+
+        Counts are read with one pipelined HGETALL; users without a hash are
+        skipped (their client rebuilds it on the next read) rather than
+        recounted in the database on every message.
+        """
+        user_ids = list(user_ids)
+        client = get_redis_client()
+        if not user_ids or client is None:
+            return
+        try:
+            import asyncio
+
+            from channels.layers import get_channel_layer
+
+            pipe = client.pipeline(transaction=False)
+            for user_id in user_ids:
+                pipe.hgetall(_key(user_id))
+            events = [
+                (user_id, UnreadCounters._format(fields))
+                for user_id, fields in zip(user_ids, pipe.execute(), strict=True)
+                if fields
+            ]
+            if not events:
+                return
+            channel_layer = get_channel_layer()
+
+            async def send_all():
+                await asyncio.gather(
+                    *(
+                        channel_layer.group_send(
+                            f"notifications_{user_id}", {"type": "badge_counts", "counts": counts}
+                        )
+                        for user_id, counts in events
+                    )
+                )
+
+            async_to_sync(send_all)()
+        except Exception as e:
+            logger.warning("Failed to push badge counts: %s", e)
+
+    @staticmethod
+    def _increment(changes: list) -> None:
+        client = get_redis_client()
+        if client is None or not changes:
+            return
+        try:
+            pipe = client.pipeline(transaction=False)
+            for user_id, field, delta in changes:
+                drop_at_zero = int(field.startswith(CHAT_FIELD_PREFIX))
+                pipe.eval(_INCREMENT_SCRIPT, 1, _key(user_id), field, delta, drop_at_zero)
+            pipe.execute()
+        except Exception as e:
+            logger.warning("Failed to update %d unread counter(s): %s", len(changes), e)
+
+    @staticmethod
+    def _count_in_database(user_id) -> dict:
+        from apps.messaging.models import InboxEntry
+
+        from .models import Notification
+
+        fields = {
+            READY_FIELD: 1,
+            NOTIFICATIONS_FIELD: Notification.objects.filter(
+                user_id=user_id, is_read=False
+            ).count(),
+        }
+        rooms = InboxEntry.objects.filter(user_id=user_id, is_active=True, unread_count__gt=0)
+        for room_id, count in rooms.values_list("room_id", "unread_count"):
+            fields[_chat_field(room_id)] = count
+        return fields
+
+    @staticmethod
+    def _format(fields: dict) -> dict:
+        chat = {
+            field[len(CHAT_FIELD_PREFIX) :]: int(count)
+            for field, count in fields.items()
+            if field.startswith(CHAT_FIELD_PREFIX) and int(count) > 0
+        }
+        return {
+            "notifications": int(fields.get(NOTIFICATIONS_FIELD, 0)),
+            "chat": chat,
+            "chat_total": sum(chat.values()),
+        }
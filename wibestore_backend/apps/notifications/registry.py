@@ -0,0 +1,48 @@
+"""
+WibeStore Backend - Notification Type Registry
+Process-local cache of NotificationType rows, keyed by code.
+
+The table is tiny and rarely written, so the whole of it is loaded with one
+query on first use and kept in memory. Saves and deletes in this process clear
+it (see signals.py); other processes pick changes up after
+NOTIFICATION_TYPE_CACHE_TTL seconds.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+
+
+class NotificationTypeRegistry:
+    """Thread-safe ``code -> NotificationType`` mapping."""
+
+    def __init__(self):
+        self._types = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, code: str | None):
+        """The NotificationType for ``code``, or None (no query once loaded)."""
+        if not code:
+            return None
+        return self._get_types().get(code)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._types = None
+
+    def _get_types(self) -> dict:
+        types = self._types
+        ttl = getattr(settings, "NOTIFICATION_TYPE_CACHE_TTL", 300)
+        if types is not None and time.monotonic() - self._loaded_at < ttl:
+            return types
+        from .models import NotificationType
+
+        with self._lock:
+            self._types = {nt.code: nt for nt in NotificationType.objects.all()}
+            self._loaded_at = time.monotonic()
+            return self._types
+
+
+notification_types = NotificationTypeRegistry()
@@ -3,10 +3,14 @@ WibeStore Backend - Notifications Services
 """
 
 import logging
+import time
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 
-from .models import Notification, NotificationType
+from .counters import UnreadCounters
+from .models import Notification
+from .registry import notification_types
 
 logger = logging.getLogger("apps.notifications")
 User = get_user_model()
@@ -25,19 +29,16 @@ class NotificationService:
         link: str = "",
     ) -> Notification:
         """Create a notification for a user."""
-        notification_type = None
-        if type_code:
-            notification_type = NotificationType.objects.filter(code=type_code).first()
-
         notification = Notification.objects.create(
             user=user,
-            type=notification_type,
+            type=notification_types.get(type_code),
             title=title,
             message=message,
             data=data or {},
             link=link,
         )
 
+        UnreadCounters.add_notifications([user.id])
         # Send via WebSocket
         NotificationService._send_ws_notification(user, notification)
 
@@ -47,47 +48,122 @@ class NotificationService:
     @staticmethod
     def notify_admins(title: str, message: str, data: dict | None = None) -> int:
         """Send notification to all admin users."""
-        admins = User.objects.filter(is_staff=True, is_active=True)
-        count = 0
-        for admin in admins:
-            NotificationService.create_notification(
-                user=admin,
-                title=title,
-                message=message,
-                type_code="admin",
-                data=data,
+        admin_ids = User.objects.filter(is_staff=True, is_active=True).values_list("id", flat=True)
+        stats = NotificationService.send_bulk(
+            list(admin_ids), title=title, message=message, type_code="admin", data=data
+        )
+        return stats["sent"]
+
+    @staticmethod
+    def send_bulk(
+        user_ids,
+        title: str,
+        message: str,
+        type_code: str | None = None,
+        data: dict | None = None,
+        link: str = "",
+        chunk_size: int | None = None,
+    ) -> dict:
+        """
+        Create the same notification for many users.
+
+        The type comes from the registry; each chunk costs one user lookup, one bulk
+        INSERT and one batched WebSocket dispatch. Inactive or unknown users are
+        skipped. Returns run statistics.
+        """
+        started = time.perf_counter()
+        chunk_size = chunk_size or settings.NOTIFICATION_BULK_CHUNK_SIZE
+        notification_type = notification_types.get(type_code)
+        user_ids = list(user_ids)
+        sent = 0
+        for start in range(0, len(user_ids), chunk_size):
+            active_ids = User.objects.filter(
+                id__in=user_ids[start : start + chunk_size], is_active=True
+            ).values_list("id", flat=True)
+            notifications = Notification.objects.bulk_create(
+                [
+                    Notification(
+                        user_id=user_id,
+                        type=notification_type,
+                        title=title,
+                        message=message,
+                        data=data or {},
+                        link=link,
+                    )
+                    for user_id in active_ids
+                ]
             )
-            count += 1
-        return count
+            UnreadCounters.add_notifications([n.user_id for n in notifications])
+            NotificationService._send_ws_notifications(notifications)
+            sent += len(notifications)
+
+        stats = {
+            "requested": len(user_ids),
+            "sent": sent,
+            "skipped": len(user_ids) - sent,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+        logger.info("Bulk notification '%s': %s", title, stats)
+        return stats
+
+    @staticmethod
+    def mark_read(notification: Notification) -> None:
+        """Mark one notification as read."""
+        if notification.is_read:
+            return
+        notification.mark_as_read()
+        UnreadCounters.add_notifications([notification.user_id], delta=-1)
+        UnreadCounters.push([notification.user_id])
 
     @staticmethod
     def mark_all_read(user) -> int:
         """Mark all notifications as read for a user."""
         from django.utils import timezone
-        return Notification.objects.filter(user=user, is_read=False).update(
+
+        count = Notification.objects.filter(user=user, is_read=False).update(
             is_read=True, read_at=timezone.now()
         )
+        UnreadCounters.reset_notifications(user.id)
+        return count
 
     @staticmethod
     def _send_ws_notification(user, notification: Notification) -> None:
         """Send notification via WebSocket."""
+        NotificationService._send_ws_notifications([notification])
+
+    @staticmethod
+    def _send_ws_notifications(notifications: list[Notification]) -> None:
+        """Send notifications via WebSocket, all group sends in one event loop pass."""
+        if not notifications:
+            return
         try:
-            from channels.layers import get_channel_layer
+            import asyncio
+
             from asgiref.sync import async_to_sync
+            from channels.layers import get_channel_layer
 
             channel_layer = get_channel_layer()
-            async_to_sync(channel_layer.group_send)(
-                f"notifications_{user.id}",
-                {
-                    "type": "notification_message",
-                    "notification": {
-                        "id": str(notification.id),
-                        "title": notification.title,
-                        "message": notification.message,
-                        "data": notification.data,
-                        "created_at": notification.created_at.isoformat(),
-                    },
-                },
-            )
+
+            async def send_all():
+                await asyncio.gather(
+                    *(
+                        channel_layer.group_send(
+                            f"notifications_{notification.user_id}",
+                            {
+                                "type": "notification_message",
+                                "notification": {
+                                    "id": str(notification.id),
+                                    "title": notification.title,
+                                    "message": notification.message,
+                                    "data": notification.data,
+                                    "created_at": notification.created_at.isoformat(),
+                                },
+                            },
+                        )
+                        for notification in notifications
+                    )
+                )
+
+            async_to_sync(send_all)()
         except Exception as e:
-            logger.warning("Failed to send WS notification: %s", e)
+            logger.warning("Failed to send WS notifications: %s", e)
@@ -0,0 +1,18 @@
+"""
+WibeStore Backend - Notifications Signals
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import NotificationType
+from .registry import notification_types
+
+
+@receiver([post_save, post_delete], sender=NotificationType)
+def notification_type_clear_registry(sender, **kwargs):
+    """Reload the type registry on next use (again after commit)."""
+    notification_types.clear()
+    # Another thread may reload the uncommitted state before this transaction ends
+    transaction.on_commit(notification_types.clear)
@@ -3,9 +3,12 @@ WibeStore Backend - Notifications Celery Tasks
 """
 
 import logging
+import time
+import uuid
 from datetime import timedelta
 
-from celery import shared_task
+from celery import chord, shared_task
+from django.conf import settings
 from django.utils import timezone
 
 logger = logging.getLogger("apps.notifications")
@@ -36,27 +39,98 @@ def send_bulk_notification(
     message: str,
     type_code: str | None = None,
     data: dict | None = None,
-) -> int:
-    """Send a notification to multiple users."""
+    link: str = "",
+) -> dict:
+    """Send a notification to multiple users (one chunk of a campaign, or a small list)."""
     from .services import NotificationService
 
-    count = 0
-    for user_id in user_ids:
-        try:
-            from django.contrib.auth import get_user_model
-
-            User = get_user_model()
-            user = User.objects.get(id=user_id, is_active=True)
-            NotificationService.create_notification(
-                user=user,
-                title=title,
-                message=message,
-                type_code=type_code,
-                data=data,
+    return NotificationService.send_bulk(
+        user_ids, title=title, message=message, type_code=type_code, data=data, link=link
+    )
+
+
+@shared_task(name="apps.notifications.tasks.send_campaign_notification")
+def send_campaign_notification(
+    title: str,
+    message: str,
+    type_code: str | None = None,
+    data: dict | None = None,
+    link: str = "",
+    audience: dict | None = None,
+) -> str:
+    """
+    Notify every active user matching ``audience`` (User field lookups).
+
+    Recipients are paged by primary key and each page becomes one
+    send_bulk_notification task; report_bulk_notification_run logs the totals
+    once all chunks are done. Returns the run id.
+    """
+    from django.contrib.auth import get_user_model
+
+    User = get_user_model()
+    run_id = uuid.uuid4().hex
+    chunk_size = settings.NOTIFICATION_BULK_CHUNK_SIZE
+    recipients = User.objects.filter(is_active=True, **(audience or {})).order_by("pk")
+
+    chunks = []
+    last_pk = None
+    while True:
+        page = recipients if last_pk is None else recipients.filter(pk__gt=last_pk)
+        ids = list(page.values_list("pk", flat=True)[:chunk_size])
+        if not ids:
+            break
+        chunks.append(
+            send_bulk_notification.s(
+                [str(pk) for pk in ids], title, message, type_code, data, link
             )
-            count += 1
-        except Exception as e:
-            logger.error("Failed to notify user %s: %s", user_id, e)
+        )
+        last_pk = ids[-1]
+
+    report = report_bulk_notification_run.s(run_id=run_id, started_at=time.time())
+    if chunks:
+        chord(chunks)(report)
+    else:
+        report.delay([])
+    logger.info("Campaign %s dispatched: %d chunks", run_id, len(chunks))
+    return run_id
+
+
+@shared_task(name="apps.notifications.tasks.report_bulk_notification_run")
+def report_bulk_notification_run(results: list[dict], run_id: str, started_at: float) -> dict:
+    """Aggregate chunk statistics of a campaign run and log its throughput."""
+    elapsed = max(time.time() - started_at, 0.001)
+    summary = {
+        "run_id": run_id,
+        "chunks": len(results),
+        "requested": sum(result["requested"] for result in results),
+        "sent": sum(result["sent"] for result in results),
+        "skipped": sum(result["skipped"] for result in results),
+        "chunk_seconds": round(sum(result["seconds"] for result in results), 3),
+        "elapsed_seconds": round(elapsed, 3),
+    }
+    summary["per_second"] = round(summary["sent"] / elapsed, 1)
+    logger.info("Campaign %s finished: %s", run_id, summary)
+    return summary
+
+
+@shared_task(name="apps.notifications.tasks.rebuild_unread_counters")
+def rebuild_unread_counters() -> int:
+    """
+    Recount every cached badge hash from the database, correcting drift.
+    Runs hourly via Celery Beat; users without a hash are rebuilt on their next read.
+    """
+    from core.redis import get_redis_client
+
+    from .counters import KEY_PREFIX, UnreadCounters
+
+    client = get_redis_client()
+    if client is None:
+        return 0
+
+    rebuilt = 0
+    for key in client.scan_iter(match=f"{KEY_PREFIX}:*", count=1000):
+        UnreadCounters.rebuild(key.rsplit(":", 1)[1])
+        rebuilt += 1
 
-    logger.info("Sent %d bulk notifications", count)
-    return count
+    logger.info("Rebuilt unread counters for %d users", rebuilt)
+    return rebuilt
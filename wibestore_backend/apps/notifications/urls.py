@@ -13,4 +13,5 @@ urlpatterns = [
     path("<uuid:pk>/read/", views.NotificationMarkReadView.as_view(), name="mark-read"),
     path("read-all/", views.NotificationMarkAllReadView.as_view(), name="mark-all-read"),
     path("unread-count/", views.UnreadCountView.as_view(), name="unread-count"),
+    path("badges/", views.BadgeCountsView.as_view(), name="badges"),
 ]
@@ -7,6 +7,7 @@ from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from .counters import UnreadCounters
 from .models import Notification
 from .serializers import NotificationSerializer
 from .services import NotificationService
@@ -32,7 +33,7 @@ class NotificationMarkReadView(APIView):
     def post(self, request, pk):
         try:
             notification = Notification.objects.get(pk=pk, user=request.user)
-            notification.mark_as_read()
+            NotificationService.mark_read(notification)
             return Response({"success": True})
         except Notification.DoesNotExist:
             return Response(
@@ -59,5 +60,15 @@ class UnreadCountView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        count = Notification.objects.filter(user=request.user, is_read=False).count()
+        count = UnreadCounters.get(request.user.id)["notifications"]
         return Response({"unread_count": count})
+
+
+@extend_schema(tags=["Notifications"])
+class BadgeCountsView(APIView):
+    """GET /api/v1/notifications/badges/ — All unread badge counts (notifications, chat)."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return Response({"success": True, "data": UnreadCounters.get(request.user.id)})
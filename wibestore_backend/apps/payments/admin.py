@@ -4,7 +4,7 @@ WibeStore Backend - Payments Admin
 
 from django.contrib import admin
 
-from .models import EscrowTransaction, PaymentMethod, Transaction
+from .models import BalanceEntry, EscrowTransaction, PaymentMethod, Transaction, WebhookEvent
 
 
 @admin.register(PaymentMethod)
@@ -62,3 +62,46 @@ class EscrowTransactionAdmin(admin.ModelAdmin):
     ]
     raw_id_fields = ["listing", "buyer", "seller", "dispute_resolved_by"]
     date_hierarchy = "created_at"
+
+
+@admin.register(BalanceEntry)
+class BalanceEntryAdmin(admin.ModelAdmin):
+    """Read-only: the ledger is append-only and written by BalanceLedger."""
+
+    list_display = ["id", "user", "kind", "amount", "balance_after", "created_at"]
+    list_filter = ["kind", "created_at"]
+    search_fields = ["user__email", "description"]
+    raw_id_fields = ["user", "transaction", "escrow"]
+    date_hierarchy = "created_at"
+
+    def has_add_permission(self, request) -> bool:
+        return False
+
+    def has_change_permission(self, request, obj=None) -> bool:
+        return False
+
+    def has_delete_permission(self, request, obj=None) -> bool:
+        return False
+
+
+@admin.register(WebhookEvent)
+class WebhookEventAdmin(admin.ModelAdmin):
+    """Read-only; use ``manage.py replay_webhook_events`` to reprocess events."""
+
+    list_display = [
+        "event_id",
+        "provider",
+        "transaction_ref",
+        "status",
+        "attempts",
+        "created_at",
+    ]
+    list_filter = ["provider", "status", "created_at"]
+    search_fields = ["event_id", "transaction_ref"]
+    date_hierarchy = "created_at"
+
+    def has_add_permission(self, request) -> bool:
+        return False
+
+    def has_change_permission(self, request, obj=None) -> bool:
+        return False
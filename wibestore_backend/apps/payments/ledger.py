@@ -0,0 +1,91 @@
+"""
+WibeStore Backend - Balance Ledger
+The only code path that changes ``User.balance``.
+
+Every change is a BalanceEntry row (append-only) plus an ``F()`` update of the
+cached running balance on the user row, in one transaction. Lock ordering keeps
+parallel payment traffic deadlock-free:
+
+1. the business document being changed (Transaction / EscrowTransaction), by
+   the caller, with ``select_for_update`` - at most one per operation;
+2. then the affected user rows, always in primary-key order, here.
+"""
+
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import transaction as db_transaction
+from django.db.models import F
+
+from core.exceptions import InsufficientFundsError
+
+from .models import BalanceEntry
+
+User = get_user_model()
+
+
+@dataclass
+class Posting:
+    """A signed balance change for ``user`` (a User instance, updated in place)."""
+
+    user: object
+    amount: Decimal
+    kind: str
+    description: str = ""
+    refs: dict = field(default_factory=dict)  # transaction= / escrow=
+
+
+class BalanceLedger:
+    """Posts balance changes to the ledger and the users' running balances."""
+
+    @staticmethod
+    def credit(user, amount: Decimal, kind: str, description: str = "", **refs) -> BalanceEntry:
+        return BalanceLedger.post([Posting(user, Decimal(amount), kind, description, refs)])[0]
+
+    @staticmethod
+    def debit(
+        user, amount: Decimal, kind: str, description: str = "", message: str | None = None, **refs
+    ) -> BalanceEntry:
+        postings = [Posting(user, -Decimal(amount), kind, description, refs)]
+        return BalanceLedger.post(postings, message=message)[0]
+
+    @staticmethod
+    @db_transaction.atomic
+    def post(postings: list[Posting], message: str | None = None) -> list[BalanceEntry]:
+        """
+        Apply ``postings`` atomically; raises InsufficientFundsError (and applies
+        nothing) if any user's balance would go negative.
+        """
+        user_ids = sorted({posting.user.pk for posting in postings})
+        balances = dict(
+            User.objects.select_for_update()
+            .filter(pk__in=user_ids)
+            .order_by("pk")
+            .values_list("pk", "balance")
+        )
+
+        entries, deltas = [], {}
+        for posting in postings:
+            balances[posting.user.pk] += posting.amount
+            if balances[posting.user.pk] < 0:
+                raise InsufficientFundsError(message)
+            deltas[posting.user.pk] = deltas.get(posting.user.pk, Decimal(0)) + posting.amount
+            entries.append(
+                BalanceEntry(
+                    user_id=posting.user.pk,
+                    amount=posting.amount,
+                    balance_after=balances[posting.user.pk],
+                    kind=posting.kind,
+                    description=posting.description[:255],
+                    **posting.refs,
+                )
+            )
+
+        for user_id in user_ids:
+            if deltas[user_id]:
+                User.objects.filter(pk=user_id).update(balance=F("balance") + deltas[user_id])
+        BalanceEntry.objects.bulk_create(entries)
+        for posting in postings:
+            posting.user.balance = balances[posting.user.pk]
+        return entries
@@ -0,0 +1 @@
+# Payments management package
@@ -0,0 +1,114 @@
+"""
+WibeStore Backend - Replay Webhook Events
+Reprocess stored payment webhook events, or backfill callbacks from a file.
+
+Selected events are reopened and processed in arrival order per transaction,
+exactly like live deliveries. Handlers skip deposits that are already
+completed, so replaying processed events is safe.
+
+Usage:
+    python manage.py replay_webhook_events --status dead
+    python manage.py replay_webhook_events --provider payme --since 2026-01-01 --dry-run
+    python manage.py replay_webhook_events --file click.jsonl --provider click
+"""
+
+import json
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from apps.payments.models import WebhookEvent
+from apps.payments.webhook_inbox import process_pending, requeue, store
+from apps.payments.webhooks import PROVIDERS
+
+
+class Command(BaseCommand):
+    help = "Replay stored payment webhook events or backfill them from a JSONL file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--provider", choices=PROVIDERS)
+        parser.add_argument(
+            "--status",
+            action="append",
+            dest="statuses",
+            help="Only events in this status (repeatable, default: dead)",
+        )
+        parser.add_argument("--since", help="Only events received at or after (ISO datetime)")
+        parser.add_argument("--until", help="Only events received before (ISO datetime)")
+        parser.add_argument(
+            "--id",
+            action="append",
+            dest="event_ids",
+            help="Only this provider event id (repeatable)",
+        )
+        parser.add_argument(
+            "--file", help="JSONL file of raw payloads to ingest (needs --provider)"
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Only report what would be replayed"
+        )
+
+    def handle(self, *args, **options):
+        provider = options["provider"]
+        if options["file"]:
+            if not provider:
+                raise CommandError("--file needs --provider.")
+            refs = self.ingest(options["file"], provider, options["dry_run"])
+        else:
+            events = self.select(options)
+            refs = sorted(set(events.values_list("provider", "transaction_ref")))
+            self.stdout.write(f"{events.count()} event(s) in {len(refs)} transaction(s) selected.")
+            if not options["dry_run"]:
+                requeue(events)
+
+        if options["dry_run"]:
+            self.stdout.write("Dry run, nothing replayed.")
+            return
+
+        attempted = sum(process_pending(provider, ref) for provider, ref in refs)
+        failed = WebhookEvent.objects.filter(status__in=("failed", "dead"))
+        self.stdout.write(self.style.SUCCESS(f"Replayed {attempted} event(s)."))
+        for provider, ref in refs:
+            for event in failed.filter(provider=provider, transaction_ref=ref):
+                self.stdout.write(self.style.WARNING(f"  {event}: {event.last_error}"))
+
+    def select(self, options):
+        events = WebhookEvent.objects.filter(status__in=options["statuses"] or ["dead"])
+        if options["provider"]:
+            events = events.filter(provider=options["provider"])
+        if options["event_ids"]:
+            events = events.filter(event_id__in=options["event_ids"])
+        for option, lookup in (("since", "created_at__gte"), ("until", "created_at__lt")):
+            if options[option]:
+                events = events.filter(**{lookup: self.parse_moment(option, options[option])})
+        return events
+
+    def parse_moment(self, option: str, value: str):
+        moment = parse_datetime(value)
+        if moment is None and (day := parse_date(value)):
+            moment = datetime.combine(day, time.min)
+        if moment is None:
+            raise CommandError(f"--{option}: invalid date {value!r}.")
+        return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
+    def ingest(self, path: str, provider: str, dry_run: bool) -> list[tuple[str, str]]:
+        """Store the payloads in ``path`` (one JSON object per line), skipping known events."""
+        refs, created_count, lines = set(), 0, 0
+        with open(path, encoding="utf-8") as file:
+            for number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    payload = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise CommandError(f"{path}:{number}: {e}") from e
+                lines += 1
+                if dry_run:
+                    continue
+                event, created = store(provider, payload)
+                created_count += created
+                refs.add((provider, event.transaction_ref))
+        self.stdout.write(f"{lines} payload(s) read, {created_count} new event(s) stored.")
+        return sorted(refs)
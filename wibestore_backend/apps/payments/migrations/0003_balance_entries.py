@@ -0,0 +1,105 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:24
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+def open_balances(apps, schema_editor):
+    """An "opening" entry per user with a balance, so entries sum to User.balance."""
+    BalanceEntry = apps.get_model("payments", "BalanceEntry")
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+
+    entries = []
+    for user_id, balance in (
+        User.objects.exclude(balance=0).values_list("id", "balance").iterator()
+    ):
+        entries.append(
+            BalanceEntry(user_id=user_id, amount=balance, balance_after=balance, kind="opening")
+        )
+        if len(entries) >= 1000:
+            BalanceEntry.objects.bulk_create(entries)
+            entries = []
+    BalanceEntry.objects.bulk_create(entries)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0002_payment_method_choices"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BalanceEntry",
+            fields=[
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                ("amount", models.DecimalField(decimal_places=2, max_digits=15)),
+                ("balance_after", models.DecimalField(decimal_places=2, max_digits=15)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("opening", "Opening Balance"),
+                            ("deposit", "Deposit"),
+                            ("withdrawal", "Withdrawal"),
+                            ("purchase", "Purchase"),
+                            ("sale", "Sale"),
+                            ("refund", "Refund"),
+                            ("subscription", "Subscription"),
+                            ("adjustment", "Adjustment"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("description", models.CharField(blank=True, default="", max_length=255)),
+                (
+                    "escrow",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="balance_entries",
+                        to="payments.escrowtransaction",
+                    ),
+                ),
+                (
+                    "transaction",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="balance_entries",
+                        to="payments.transaction",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="balance_entries",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Balance Entry",
+                "verbose_name_plural": "Balance Entries",
+                "db_table": "balance_entries",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(fields=["user", "created_at"], name="balance_entries_user_idx")
+                ],
+            },
+        ),
+        migrations.RunPython(open_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:28
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def schedule_open_escrows(apps, schema_editor):
+    """Open escrows get the due time their countdown task would have fired at."""
+    EscrowTransaction = apps.get_model("payments", "EscrowTransaction")
+    EscrowTransaction.objects.filter(
+        status__in=("paid", "delivered"), release_due_at__isnull=True
+    ).update(release_due_at=F("created_at") + timedelta(hours=settings.ESCROW_AUTO_RELEASE_HOURS))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("marketplace", "0006_listing_feed_indexes"),
+        ("payments", "0003_balance_entries"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="escrowtransaction",
+            name="release_due_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="escrowtransaction",
+            index=models.Index(fields=["status", "release_due_at"], name="escrow_release_due_idx"),
+        ),
+        migrations.RunPython(schedule_open_escrows, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:33
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0004_escrow_release_due"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WebhookEvent",
+            fields=[
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                ("provider", models.CharField(max_length=20)),
+                ("event_id", models.CharField(max_length=255)),
+                ("transaction_ref", models.CharField(blank=True, default="", max_length=255)),
+                ("payload", models.JSONField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("received", "Received"),
+                            ("processed", "Processed"),
+                            ("failed", "Failed (will retry)"),
+                            ("dead", "Dead (retries exhausted)"),
+                        ],
+                        default="received",
+                        max_length=20,
+                    ),
+                ),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("next_attempt_at", models.DateTimeField(blank=True, null=True)),
+                ("processed_at", models.DateTimeField(blank=True, null=True)),
+                ("result", models.JSONField(blank=True, null=True)),
+                ("last_error", models.TextField(blank=True, default="")),
+            ],
+            options={
+                "verbose_name": "Webhook Event",
+                "verbose_name_plural": "Webhook Events",
+                "db_table": "payment_webhook_events",
+                "ordering": ["created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["provider", "transaction_ref", "created_at"],
+                        name="webhook_events_ref_idx",
+                    ),
+                    models.Index(
+                        fields=["status", "next_attempt_at"], name="webhook_events_due_idx"
+                    ),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("provider", "event_id"), name="webhook_events_provider_event_uniq"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -1,16 +1,18 @@
 """
 WibeStore Backend - Payments Models
-PaymentMethod, Transaction, EscrowTransaction models.
+PaymentMethod, Transaction, EscrowTransaction, BalanceEntry, WebhookEvent models.
 """
 
 from django.conf import settings
 from django.db import models
 
 from core.constants import (
+    BALANCE_ENTRY_KIND_CHOICES,
     ESCROW_STATUS_CHOICES,
     PAYMENT_METHOD_CHOICES,
     TRANSACTION_STATUS_CHOICES,
     TRANSACTION_TYPE_CHOICES,
+    WEBHOOK_EVENT_STATUS_CHOICES,
 )
 from core.models import BaseModel
 
@@ -103,6 +105,8 @@ class EscrowTransaction(BaseModel):
     status = models.CharField(
         max_length=20, choices=ESCROW_STATUS_CHOICES, default="pending_payment", db_index=True
     )
+    # When the release sweeper pays the seller if nobody has acted (see tasks.py)
+    release_due_at = models.DateTimeField(null=True, blank=True)
     buyer_confirmed_at = models.DateTimeField(null=True, blank=True)
     seller_paid_at = models.DateTimeField(null=True, blank=True)
     admin_released_at = models.DateTimeField(null=True, blank=True)
@@ -121,6 +125,97 @@ class EscrowTransaction(BaseModel):
         ordering = ["-created_at"]
         verbose_name = "Escrow Transaction"
         verbose_name_plural = "Escrow Transactions"
+        indexes = [
+            models.Index(fields=["status", "release_due_at"], name="escrow_release_due_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"Escrow: {self.listing.title} ({self.status})"
+
+
+class BalanceEntry(BaseModel):
+    """
+    One change of a user's balance (append-only ledger).
+
+    ``User.balance`` is the running total of a user's entries; both are written
+    together by apps.payments.ledger.BalanceLedger, never separately.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="balance_entries",
+    )
+    amount = models.DecimalField(max_digits=15, decimal_places=2)  # signed
+    balance_after = models.DecimalField(max_digits=15, decimal_places=2)
+    kind = models.CharField(max_length=20, choices=BALANCE_ENTRY_KIND_CHOICES)
+    transaction = models.ForeignKey(
+        Transaction,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="balance_entries",
+    )
+    escrow = models.ForeignKey(
+        EscrowTransaction,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="balance_entries",
+    )
+    description = models.CharField(max_length=255, blank=True, default="")
+
+    class Meta:
+        db_table = "balance_entries"
+        ordering = ["-created_at"]
+        verbose_name = "Balance Entry"
+        verbose_name_plural = "Balance Entries"
+        indexes = [
+            models.Index(fields=["user", "created_at"], name="balance_entries_user_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.kind} {self.amount:+} -> {self.balance_after}"
+
+
+class WebhookEvent(BaseModel):
+    """
+    A payment provider callback as received (webhook inbox).
+
+    Stored before the provider is acknowledged and processed asynchronously by
+    apps.payments.webhook_inbox, once, in arrival order per transaction.
+    """
+
+    provider = models.CharField(max_length=20)
+    event_id = models.CharField(max_length=255)
+    transaction_ref = models.CharField(max_length=255, blank=True, default="")
+    payload = models.JSONField()
+    status = models.CharField(
+        max_length=20, choices=WEBHOOK_EVENT_STATUS_CHOICES, default="received"
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+
+    class Meta:
+        db_table = "payment_webhook_events"
+        ordering = ["created_at"]
+        verbose_name = "Webhook Event"
+        verbose_name_plural = "Webhook Events"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["provider", "event_id"], name="webhook_events_provider_event_uniq"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["provider", "transaction_ref", "created_at"],
+                name="webhook_events_ref_idx",
+            ),
+            models.Index(fields=["status", "next_attempt_at"], name="webhook_events_due_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.provider}:{self.event_id} ({self.status})"
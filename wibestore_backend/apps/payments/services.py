@@ -3,15 +3,20 @@ WibeStore Backend - Payments Services
 """
 
 import logging
+from datetime import timedelta
 from decimal import Decimal
 
 from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.db import transaction as db_transaction
+from django.db.models import F
 from django.utils import timezone
 
+from apps.subscriptions.plans import seller_plans
 from core.exceptions import BusinessLogicError, InsufficientFundsError
-from core.utils import calculate_commission, calculate_seller_earnings
+from core.utils import calculate_commission
 
+from .ledger import BalanceLedger
 from .models import EscrowTransaction, PaymentMethod, Transaction
 
 logger = logging.getLogger("apps.payments")
@@ -44,6 +49,7 @@ class PaymentService:
     @db_transaction.atomic
     def create_withdrawal(user, amount: Decimal, payment_method_code: str) -> Transaction:
         """Create a withdrawal transaction."""
+        # Fast rejection; the ledger re-checks under the row lock
         if user.balance < amount:
             raise InsufficientFundsError("Insufficient balance for withdrawal.")
 
@@ -60,9 +66,14 @@ class PaymentService:
             description=f"Withdrawal via {payment_method_code}",
         )
 
-        # Deduct from balance
-        user.balance -= amount
-        user.save(update_fields=["balance"])
+        BalanceLedger.debit(
+            user,
+            amount,
+            "withdrawal",
+            txn.description,
+            message="Insufficient balance for withdrawal.",
+            transaction=txn,
+        )
 
         logger.info("Withdrawal created: %s for user %s, amount: %s", txn.id, user.email, amount)
         return txn
@@ -71,17 +82,22 @@ class PaymentService:
     @db_transaction.atomic
     def complete_deposit(transaction: Transaction) -> Transaction:
         """Complete a deposit (called by webhook)."""
-        if transaction.status != "pending":
+        # Lock first: duplicate webhook deliveries must not credit twice
+        locked = Transaction.objects.select_for_update().get(pk=transaction.pk)
+        if locked.status != "pending":
             raise BusinessLogicError("Transaction is not in pending state.")
 
         transaction.status = "completed"
         transaction.processed_at = timezone.now()
         transaction.save(update_fields=["status", "processed_at"])
 
-        # Add to user balance
-        user = transaction.user
-        user.balance += transaction.amount
-        user.save(update_fields=["balance"])
+        BalanceLedger.credit(
+            transaction.user,
+            transaction.amount,
+            "deposit",
+            transaction.description,
+            transaction=transaction,
+        )
 
         logger.info("Deposit completed: %s", transaction.id)
         return transaction
@@ -100,17 +116,14 @@ class EscrowService:
         if buyer == listing.seller:
             raise BusinessLogicError("You cannot buy your own listing.")
 
+        # Fast rejection; the ledger re-checks under the row lock
         if buyer.balance < listing.price:
             raise InsufficientFundsError("Insufficient balance.")
 
-        # Get seller subscription plan
-        plan_type = EscrowService._get_seller_plan(listing.seller)
-        commission = calculate_commission(listing.price, plan_type)
-        earnings = calculate_seller_earnings(listing.price, plan_type)
-
-        # Deduct from buyer balance
-        buyer.balance -= listing.price
-        buyer.save(update_fields=["balance"])
+        # Seller's plan terms come from the plan cache (no subscription queries)
+        terms = seller_plans.get(listing.seller_id)
+        commission = calculate_commission(listing.price, rate=terms.commission_rate)
+        earnings = listing.price - commission
 
         escrow = EscrowTransaction.objects.create(
             listing=listing,
@@ -120,24 +133,28 @@ class EscrowService:
             commission_amount=commission,
             seller_earnings=earnings,
             status="paid",
+            release_due_at=timezone.now() + timedelta(hours=settings.ESCROW_AUTO_RELEASE_HOURS),
         )
 
-        # Increment buyer purchases count
+        BalanceLedger.debit(
+            buyer,
+            listing.price,
+            "purchase",
+            f"Purchase of {listing.title}",
+            message="Insufficient balance.",
+            escrow=escrow,
+        )
+        get_user_model().objects.filter(pk=buyer.pk).update(
+            total_purchases=F("total_purchases") + 1
+        )
         buyer.total_purchases += 1
-        buyer.save(update_fields=["total_purchases"])
 
         logger.info(
             "Escrow created: %s (buyer: %s, seller: %s, amount: %s)",
             escrow.id, buyer.email, listing.seller.email, listing.price,
         )
 
-        # Schedule auto-release
-        from .tasks import release_escrow_payment
-        release_escrow_payment.apply_async(
-            args=[str(escrow.id)],
-            countdown=settings.ESCROW_AUTO_RELEASE_HOURS * 3600,
-        )
-
+        # Auto-release is picked up by the release_due_escrows sweeper at release_due_at
         return escrow
 
     @staticmethod
@@ -146,7 +163,9 @@ class EscrowService:
         """Buyer confirms receiving the account."""
         if escrow.buyer != buyer:
             raise BusinessLogicError("Only the buyer can confirm delivery.")
-        if escrow.status != "paid":
+        # Lock and re-check: the release sweeper may have paid the seller meanwhile
+        locked = EscrowTransaction.objects.select_for_update().get(pk=escrow.pk)
+        if locked.status != "paid":
             raise BusinessLogicError("Escrow is not in paid status.")
 
         escrow.status = "delivered"
@@ -164,13 +183,20 @@ class EscrowService:
         Note: seller.total_sales is incremented solely via
         ListingService.mark_as_sold() to avoid double-counting.
         """
-        if escrow.status not in ("paid", "delivered"):
+        # Lock first: the auto-release task and an admin must not both pay out
+        locked = EscrowTransaction.objects.select_for_update().get(pk=escrow.pk)
+        if locked.status not in ("paid", "delivered"):
             raise BusinessLogicError("Escrow cannot be released.")
 
         # Transfer earnings to seller
         seller = escrow.seller
-        seller.balance += escrow.seller_earnings
-        seller.save(update_fields=["balance"])
+        BalanceLedger.credit(
+            seller,
+            escrow.seller_earnings,
+            "sale",
+            f"Sale of {escrow.listing.title}",
+            escrow=escrow,
+        )
 
         escrow.status = "confirmed"
         escrow.seller_paid_at = timezone.now()
@@ -193,13 +219,42 @@ class EscrowService:
         logger.info("Escrow payment released: %s, seller earned: %s", escrow.id, escrow.seller_earnings)
         return escrow
 
+    @staticmethod
+    def release_due_chunk(limit: int) -> int:
+        """
+        Release up to ``limit`` escrows whose release_due_at has passed.
+
+        Due rows are claimed with ``FOR UPDATE SKIP LOCKED``, so parallel sweeps
+        take disjoint chunks, and released in seller order, so sellers' balance
+        rows are locked in primary-key order across the chunk. Returns the number
+        of escrows claimed (0 when nothing is due).
+        """
+        with db_transaction.atomic():
+            due = list(
+                EscrowTransaction.objects.select_for_update(skip_locked=True, of=("self",))
+                .filter(status__in=("paid", "delivered"), release_due_at__lte=timezone.now())
+                .select_related("listing", "seller")
+                .order_by("release_due_at")[:limit]
+            )
+            retry_at = timezone.now() + timedelta(minutes=settings.ESCROW_RELEASE_RETRY_MINUTES)
+            for escrow in sorted(due, key=lambda escrow: escrow.seller_id):
+                try:
+                    EscrowService.release_payment(escrow)
+                except Exception as e:
+                    # Back off so one broken escrow doesn't come back in every chunk
+                    logger.error("Failed to auto-release escrow %s: %s", escrow.id, e)
+                    EscrowTransaction.objects.filter(pk=escrow.pk).update(release_due_at=retry_at)
+        return len(due)
+
     @staticmethod
     @db_transaction.atomic
     def open_dispute(escrow: EscrowTransaction, buyer, reason: str) -> EscrowTransaction:
         """Open a dispute for an escrow transaction."""
         if escrow.buyer != buyer:
             raise BusinessLogicError("Only the buyer can open a dispute.")
-        if escrow.status not in ("paid", "delivered"):
+        # Lock and re-check: a dispute must never follow a release to the seller
+        locked = EscrowTransaction.objects.select_for_update().get(pk=escrow.pk)
+        if locked.status not in ("paid", "delivered"):
             raise BusinessLogicError("Cannot dispute this transaction.")
 
         escrow.status = "disputed"
@@ -213,13 +268,18 @@ class EscrowService:
     @db_transaction.atomic
     def refund_escrow(escrow: EscrowTransaction, admin_user, resolution: str) -> EscrowTransaction:
         """Refund buyer and close dispute."""
-        if escrow.status != "disputed":
+        locked = EscrowTransaction.objects.select_for_update().get(pk=escrow.pk)
+        if locked.status != "disputed":
             raise BusinessLogicError("Only disputed transactions can be refunded.")
 
         # Refund buyer
-        buyer = escrow.buyer
-        buyer.balance += escrow.amount
-        buyer.save(update_fields=["balance"])
+        BalanceLedger.credit(
+            escrow.buyer,
+            escrow.amount,
+            "refund",
+            f"Refund for {escrow.listing.title}",
+            escrow=escrow,
+        )
 
         escrow.status = "refunded"
         escrow.dispute_resolved_by = admin_user
@@ -233,20 +293,3 @@ class EscrowService:
 
         logger.info("Escrow refunded: %s by admin %s", escrow.id, admin_user.email)
         return escrow
-
-    @staticmethod
-    def _get_seller_plan(seller) -> str:
-        """Get seller's subscription plan type."""
-        from apps.subscriptions.models import UserSubscription
-
-        active_sub = UserSubscription.objects.filter(
-            user=seller, status="active"
-        ).select_related("plan").first()
-
-        if not active_sub:
-            return "free"
-        if active_sub.plan.is_pro:
-            return "pro"
-        if active_sub.plan.is_premium:
-            return "premium"
-        return "free"
@@ -38,9 +38,53 @@ def process_withdrawal(transaction_id: str) -> None:
         logger.error("Failed to process withdrawal %s: %s", transaction_id, e)
 
 
+@shared_task(name="apps.payments.tasks.release_due_escrows")
+def release_due_escrows() -> int:
+    """
+    Beat sweeper: start up to ESCROW_RELEASE_CONCURRENCY release workers when
+    escrows are due. Nothing waits in the broker between sweeps.
+    """
+    from django.conf import settings
+
+    from .models import EscrowTransaction
+
+    due = EscrowTransaction.objects.filter(
+        status__in=("paid", "delivered"), release_due_at__lte=timezone.now()
+    ).count()
+    if not due:
+        return 0
+    chunks = -(-due // settings.ESCROW_RELEASE_CHUNK_SIZE)
+    for _ in range(min(chunks, settings.ESCROW_RELEASE_CONCURRENCY)):
+        release_escrow_chunks.delay()
+    return due
+
+
+@shared_task(name="apps.payments.tasks.release_escrow_chunks")
+def release_escrow_chunks() -> int:
+    """Release due escrows chunk by chunk until none are left (or the per-run cap is hit)."""
+    from django.conf import settings
+
+    from .services import EscrowService
+
+    released = 0
+    for _ in range(settings.ESCROW_RELEASE_MAX_CHUNKS):
+        claimed = EscrowService.release_due_chunk(settings.ESCROW_RELEASE_CHUNK_SIZE)
+        released += claimed
+        if claimed < settings.ESCROW_RELEASE_CHUNK_SIZE:
+            break
+    if released:
+        logger.info("Escrow sweeper processed %d due escrow(s)", released)
+    return released
+
+
 @shared_task(name="apps.payments.tasks.release_escrow_payment")
 def release_escrow_payment(escrow_id: str) -> None:
-    """Automatically release escrow payment after 24 hours if no disputes."""
+    """
+    Release one escrow payment if no disputes.
+
+    New escrows are released by release_due_escrows; this task only drains
+    countdown messages queued before the sweeper existed.
+    """
     from .models import EscrowTransaction
     from .services import EscrowService
 
@@ -53,6 +97,27 @@ def release_escrow_payment(escrow_id: str) -> None:
         logger.error("Failed to release escrow %s: %s", escrow_id, e)
 
 
+@shared_task(name="apps.payments.tasks.process_webhook_events")
+def process_webhook_events(provider: str, ref: str) -> int:
+    """Process the stored webhook events of one transaction, in arrival order."""
+    from .webhook_inbox import process_pending
+
+    return process_pending(provider, ref)
+
+
+@shared_task(name="apps.payments.tasks.retry_webhook_events")
+def retry_webhook_events() -> int:
+    """Beat sweeper: dispatch transactions whose webhook events are due for (re)processing."""
+    from django.conf import settings
+
+    from .webhook_inbox import due_refs
+
+    refs = due_refs(settings.WEBHOOK_RETRY_BATCH)
+    for provider, ref in refs:
+        process_webhook_events.delay(provider, ref)
+    return len(refs)
+
+
 @shared_task(name="apps.payments.tasks.send_transaction_email")
 def send_transaction_email(transaction_id: str, template: str) -> None:
     """Send email notification about a transaction."""
@@ -9,6 +9,8 @@ from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from core.pagination import EstimatedCountPagination
+
 from .models import EscrowTransaction, Transaction
 from .serializers import (
     DepositSerializer,
@@ -82,6 +84,7 @@ class TransactionListView(generics.ListAPIView):
 
     serializer_class = TransactionSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = EstimatedCountPagination
 
     def get_queryset(self):
         return Transaction.objects.filter(user=self.request.user).select_related(
@@ -148,10 +151,11 @@ class WebhookView(APIView):
     permission_classes = [permissions.AllowAny]
 
     def post(self, request, provider):
-        from .webhooks import process_webhook
+        from .webhook_inbox import receive
 
         try:
-            result = process_webhook(provider, request.data)
+            # Stored and acknowledged here; processed by the webhook inbox worker
+            result = receive(provider, request.data)
             return Response(result, status=status.HTTP_200_OK)
         except Exception as e:
             logger.error("Webhook error for %s: %s", provider, e)
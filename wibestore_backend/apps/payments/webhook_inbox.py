@@ -0,0 +1,167 @@
+"""
+WibeStore Backend - Webhook Inbox
+Durable, exactly-once processing of payment provider callbacks.
+
+``receive()`` answers callbacks about unknown or cancelled transactions with
+the provider's error code (``webhooks.rejection``). Any other callback is stored
+as a WebhookEvent keyed by ``(provider, provider event id)`` and acknowledged
+straight away; a redelivered callback hits the unique key and is not stored
+(or processed) again. ``process_pending()`` then runs the events of one transaction in arrival
+order: the oldest open event is locked, its handler runs in a savepoint and the
+event is marked processed in the same database transaction, so the handler's
+effects and the "processed" mark commit (or roll back) together.
+
+A failing event is retried with exponential backoff (WEBHOOK_RETRY_BASE_SECONDS
+doubling up to WEBHOOK_RETRY_MAX_SECONDS) and marked dead after
+WEBHOOK_MAX_ATTEMPTS; later events of the same transaction wait behind it until
+then. Dead events are replayed with ``manage.py replay_webhook_events``.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction as db_transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .models import WebhookEvent
+from .webhooks import (
+    PROVIDERS,
+    acknowledgement,
+    describe_event,
+    is_query,
+    process_webhook,
+    rejection,
+)
+
+logger = logging.getLogger("apps.payments")
+
+OPEN_STATUSES = ("received", "failed")
+
+
+def receive(provider: str, data: dict) -> dict:
+    """Accept a provider callback and return the response for the provider."""
+    if provider not in PROVIDERS:
+        raise ValueError(f"Unknown payment provider: {provider}")
+    if is_query(provider, data):
+        return process_webhook(provider, data)
+    error = rejection(provider, data)
+    if error is not None:
+        logger.warning("Rejected %s webhook: %s", provider, error)
+        return error
+
+    event, created = store(provider, data)
+    if created:
+        schedule(provider, event.transaction_ref)
+    else:
+        logger.info("Duplicate %s webhook ignored: %s", provider, event.event_id)
+    return acknowledgement(provider, data)
+
+
+def store(provider: str, data: dict) -> tuple[WebhookEvent, bool]:
+    """Persist a callback once per provider event id; returns ``(event, created)``."""
+    event_id, ref = describe_event(provider, data)
+    return WebhookEvent.objects.get_or_create(
+        provider=provider,
+        event_id=event_id,
+        defaults={"transaction_ref": ref, "payload": data, "next_attempt_at": timezone.now()},
+    )
+
+
+def schedule(provider: str, ref: str) -> None:
+    """Process the transaction's open events in a worker once the caller commits."""
+    from .tasks import process_webhook_events
+
+    db_transaction.on_commit(lambda: process_webhook_events.delay(provider, ref))
+
+
+def retry_delay(attempts: int) -> timedelta:
+    seconds = settings.WEBHOOK_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(seconds, settings.WEBHOOK_RETRY_MAX_SECONDS))
+
+
+def process_pending(provider: str, ref: str) -> int:
+    """
+    Process the open events of one transaction, oldest first, stopping at the
+    first one that is not due yet. Returns the number of events attempted.
+    """
+    attempted = 0
+    while True:
+        with db_transaction.atomic():
+            event = (
+                WebhookEvent.objects.select_for_update()
+                .filter(provider=provider, transaction_ref=ref, status__in=OPEN_STATUSES)
+                .order_by("created_at")
+                .first()
+            )
+            if event is None or (event.next_attempt_at and event.next_attempt_at > timezone.now()):
+                return attempted
+            _apply(event)
+        attempted += 1
+        if event.status == "failed":
+            # Keep arrival order: later events wait until this one succeeds or dies
+            return attempted
+
+
+def _apply(event: WebhookEvent) -> None:
+    """Run the handler for a locked event and record the outcome on it."""
+    event.attempts += 1
+    try:
+        with db_transaction.atomic():
+            event.result = process_webhook(event.provider, event.payload)
+    except Exception as e:
+        event.last_error = f"{type(e).__name__}: {e}"
+        if event.attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+            event.status = "dead"
+            event.next_attempt_at = None
+            logger.error(
+                "Webhook event %s is dead after %d attempts: %s", event.id, event.attempts, e
+            )
+        else:
+            event.status = "failed"
+            event.next_attempt_at = timezone.now() + retry_delay(event.attempts)
+            logger.warning("Webhook event %s failed (attempt %d): %s", event.id, event.attempts, e)
+        event.save(update_fields=["status", "attempts", "next_attempt_at", "last_error"])
+        return
+
+    event.status = "processed"
+    event.processed_at = timezone.now()
+    event.next_attempt_at = None
+    event.last_error = ""
+    event.save(
+        update_fields=[
+            "status",
+            "attempts",
+            "processed_at",
+            "next_attempt_at",
+            "result",
+            "last_error",
+        ]
+    )
+
+
+def due_refs(limit: int) -> list[tuple[str, str]]:
+    """
+    ``(provider, transaction ref)`` pairs with an open event that is due and
+    not stuck behind an earlier event that is still backing off.
+    """
+    now = timezone.now()
+    backing_off = WebhookEvent.objects.filter(
+        provider=OuterRef("provider"),
+        transaction_ref=OuterRef("transaction_ref"),
+        status="failed",
+        next_attempt_at__gt=now,
+    )
+    return list(
+        WebhookEvent.objects.filter(status__in=OPEN_STATUSES, next_attempt_at__lte=now)
+        .exclude(Exists(backing_off))
+        .order_by()
+        .values_list("provider", "transaction_ref")
+        .distinct()[:limit]
+    )
+
+
+def requeue(events) -> int:
+    """Reopen ``events`` (any status) for processing now; returns the number reopened."""
+    return events.update(status="received", attempts=0, next_attempt_at=timezone.now())
@@ -1,13 +1,23 @@
 """
 WibeStore Backend - Payment Webhooks
 Process incoming webhooks from payment providers (Google Pay, Visa, Mastercard, Apple Pay, legacy).
+
+Read-only queries (Payme CheckPerformTransaction, Click prepare) are answered
+inline. Everything else goes through the webhook inbox (webhook_inbox.py): the
+view answers ``rejection()`` for callbacks about unknown or cancelled
+transactions, otherwise stores the event and returns ``acknowledgement()``, and
+the handlers below run later, exactly once per event. Handlers must therefore
+be safe to run for a deposit that is already completed, and raise (so the event
+is retried and eventually marked dead) when its transaction is missing.
 """
 
 import hashlib
-import hmac
+import json
 import logging
 
-from django.conf import settings
+from django.core.exceptions import ValidationError
+
+from core.exceptions import BusinessLogicError
 
 from .models import Transaction
 from .services import PaymentService
@@ -15,6 +25,135 @@ from .services import PaymentService
 logger = logging.getLogger("apps.payments")
 
 CARD_PROVIDERS = ("google_pay", "visa", "mastercard", "apple_pay")
+PROVIDERS = (*CARD_PROVIDERS, "payme", "click", "paynet")
+CLOSED_STATUSES = ("cancelled", "failed")
+
+
+class TransactionNotFoundError(Exception):
+    """A stored callback refers to a transaction that does not exist."""
+
+
+def is_query(provider: str, data: dict) -> bool:
+    """Whether the callback only asks a question (answered inline, never stored)."""
+    if provider == "payme":
+        return data.get("method") == "CheckPerformTransaction"
+    if provider == "click":
+        return str(data.get("action")) == "0"
+    return False
+
+
+def describe_event(provider: str, data: dict) -> tuple[str, str]:
+    """
+    ``(event id, transaction ref)`` of a callback.
+
+    The event id identifies provider retries of the same callback; the ref
+    groups events of one payment so they are processed in arrival order.
+    Providers without an explicit id fall back to a hash of the payload.
+    """
+    if provider in CARD_PROVIDERS:
+        ref = data.get("transaction_id") or data.get("order_id") or data.get("id") or ""
+        event_id = data.get("event_id") or data.get("provider_transaction_id")
+        if event_id:
+            event_id = f"{event_id}:{data.get('status', '')}"
+    elif provider == "payme":
+        params = data.get("params", {})
+        ref = params.get("id") or params.get("account", {}).get("transaction_id") or ""
+        event_id = f"{data.get('method')}:{ref}" if ref else None
+    elif provider == "click":
+        ref = data.get("merchant_trans_id") or ""
+        click_id = data.get("click_trans_id")
+        event_id = f"{data.get('action')}:{click_id}" if click_id else None
+    else:
+        ref = data.get("transaction_id") or ""
+        event_id = data.get("event_id") or (
+            f"{data.get('event')}:{ref}" if ref and data.get("event") else None
+        )
+    if not event_id:
+        canonical = json.dumps(data, sort_keys=True, default=str)
+        event_id = "sha256:" + hashlib.sha256(canonical.encode()).hexdigest()
+    return str(event_id)[:255], str(ref)[:255]
+
+
+def rejection(provider: str, data: dict) -> dict | None:
+    """
+    The provider's error response for a callback that must not be acknowledged:
+    its transaction does not exist or, for a completion, was cancelled. None
+    when the callback can be stored. One primary-key lookup at most.
+    """
+    if provider == "payme":
+        method, params = data.get("method"), data.get("params", {})
+        if method == "PerformTransaction":
+            txn_status = _transaction_status(id=params.get("account", {}).get("transaction_id"))
+            if txn_status is None:
+                return {"error": {"code": -31050, "message": "Transaction not found"}}
+            if txn_status in CLOSED_STATUSES:
+                return {"error": {"code": -31008, "message": f"Transaction {txn_status}"}}
+        elif method == "CancelTransaction":
+            if _transaction_status(provider_transaction_id=params.get("id")) is None:
+                return {"error": {"code": -31050, "message": "Transaction not found"}}
+        return None
+
+    if provider == "click":
+        if str(data.get("action")) == "1":
+            txn_status = _transaction_status(id=data.get("merchant_trans_id"))
+            if txn_status is None:
+                return {"error": -5, "error_note": "Transaction not found"}
+            if txn_status in CLOSED_STATUSES:
+                return {"error": -9, "error_note": f"Transaction {txn_status}"}
+        return None
+
+    if provider == "paynet" and data.get("event") != "payment.completed":
+        return None
+    _, ref = describe_event(provider, data)
+    if ref and _transaction_status(id=ref) is None:
+        return {"status": "error", "message": "Transaction not found"}
+    return None
+
+
+def acknowledgement(provider: str, data: dict) -> dict:
+    """The success response a provider expects once its callback is accepted."""
+    if provider == "payme":
+        params = data.get("params", {})
+        state = -2 if data.get("method") == "CancelTransaction" else 2
+        transaction = params.get("id") or params.get("account", {}).get("transaction_id")
+        return {"result": {"transaction": str(transaction or ""), "state": state}}
+    if provider == "click":
+        return {"error": 0, "error_note": "Success"}
+    return {"status": "ok"}
+
+
+def _get_transaction(**lookup) -> Transaction | None:
+    try:
+        return Transaction.objects.get(**lookup)
+    except (Transaction.DoesNotExist, ValidationError, ValueError):
+        return None
+
+
+def _transaction_status(**lookup) -> str | None:
+    if not all(lookup.values()):
+        return None
+    try:
+        return Transaction.objects.filter(**lookup).values_list("status", flat=True).first()
+    except (ValidationError, ValueError):
+        return None
+
+
+def _require_transaction(**lookup) -> Transaction:
+    txn = _get_transaction(**lookup)
+    if txn is None:
+        raise TransactionNotFoundError(f"Transaction not found: {lookup}")
+    return txn
+
+
+def _complete(txn: Transaction) -> bool:
+    """Complete a pending deposit; False if it was already completed or is not pending."""
+    if txn.status != "pending":
+        return False
+    try:
+        PaymentService.complete_deposit(txn)
+    except BusinessLogicError:
+        return False
+    return True
 
 
 def process_webhook(provider: str, data: dict) -> dict:
@@ -37,14 +176,12 @@ def _handle_card_webhook(provider: str, data: dict) -> dict:
     logger.info("%s webhook received: %s", provider, data)
     transaction_id = data.get("transaction_id") or data.get("order_id") or data.get("id")
     if transaction_id:
-        try:
-            txn = Transaction.objects.get(id=transaction_id, status="pending")
-            PaymentService.complete_deposit(txn)
-            txn.provider_transaction_id = str(data.get("provider_transaction_id", ""))
-            txn.save(update_fields=["provider_transaction_id"])
-            return {"status": "ok", "message": "Payment completed"}
-        except Transaction.DoesNotExist:
-            return {"status": "error", "message": "Transaction not found"}
+        txn = _require_transaction(id=transaction_id)
+        if not _complete(txn):
+            return {"status": "ok", "message": f"Transaction already {txn.status}"}
+        txn.provider_transaction_id = str(data.get("provider_transaction_id", ""))
+        txn.save(update_fields=["provider_transaction_id"])
+        return {"status": "ok", "message": "Payment completed"}
     return {"status": "ok"}
 
 
@@ -58,35 +195,28 @@ def _handle_payme_webhook(data: dict) -> dict:
     if method == "CheckPerformTransaction":
         # Validate transaction
         transaction_id = params.get("account", {}).get("transaction_id")
-        try:
-            txn = Transaction.objects.get(id=transaction_id, status="pending")
-            return {
-                "result": {
-                    "allow": True,
-                    "additional": {"transaction_id": str(txn.id)},
-                }
-            }
-        except Transaction.DoesNotExist:
+        txn = _get_transaction(id=transaction_id, status="pending")
+        if txn is None:
             return {"error": {"code": -31050, "message": "Transaction not found"}}
+        return {
+            "result": {
+                "allow": True,
+                "additional": {"transaction_id": str(txn.id)},
+            }
+        }
 
     elif method == "PerformTransaction":
         transaction_id = params.get("account", {}).get("transaction_id")
-        try:
-            txn = Transaction.objects.get(id=transaction_id)
-            PaymentService.complete_deposit(txn)
-            return {"result": {"transaction": str(txn.id), "state": 2}}
-        except Transaction.DoesNotExist:
-            return {"error": {"code": -31050, "message": "Transaction not found"}}
+        txn = _require_transaction(id=transaction_id)
+        _complete(txn)
+        return {"result": {"transaction": str(txn.id), "state": 2}}
 
     elif method == "CancelTransaction":
-        transaction_id = params.get("id")
-        try:
-            txn = Transaction.objects.get(provider_transaction_id=transaction_id)
+        txn = _require_transaction(provider_transaction_id=params.get("id"))
+        if txn.status == "pending":
             txn.status = "cancelled"
             txn.save(update_fields=["status"])
-            return {"result": {"transaction": str(txn.id), "state": -2}}
-        except Transaction.DoesNotExist:
-            return {"error": {"code": -31050, "message": "Transaction not found"}}
+        return {"result": {"transaction": str(txn.id), "state": -2}}
 
     return {"result": {}}
 
@@ -98,22 +228,17 @@ def _handle_click_webhook(data: dict) -> dict:
     action = data.get("action")
     merchant_trans_id = data.get("merchant_trans_id")
 
-    if action == 0:  # Prepare
-        try:
-            txn = Transaction.objects.get(id=merchant_trans_id, status="pending")
-            return {"error": 0, "error_note": "Success", "click_trans_id": data.get("click_trans_id")}
-        except Transaction.DoesNotExist:
+    if str(action) == "0":  # Prepare
+        if _get_transaction(id=merchant_trans_id, status="pending") is None:
             return {"error": -5, "error_note": "Transaction not found"}
+        return {"error": 0, "error_note": "Success", "click_trans_id": data.get("click_trans_id")}
 
-    elif action == 1:  # Complete
-        try:
-            txn = Transaction.objects.get(id=merchant_trans_id)
-            txn.provider_transaction_id = str(data.get("click_trans_id", ""))
-            txn.save(update_fields=["provider_transaction_id"])
-            PaymentService.complete_deposit(txn)
-            return {"error": 0, "error_note": "Success"}
-        except Transaction.DoesNotExist:
-            return {"error": -5, "error_note": "Transaction not found"}
+    elif str(action) == "1":  # Complete
+        txn = _require_transaction(id=merchant_trans_id)
+        txn.provider_transaction_id = str(data.get("click_trans_id", ""))
+        txn.save(update_fields=["provider_transaction_id"])
+        _complete(txn)
+        return {"error": 0, "error_note": "Success"}
 
     return {"error": -3, "error_note": "Unknown action"}
 
@@ -126,11 +251,7 @@ def _handle_paynet_webhook(data: dict) -> dict:
     event_type = data.get("event")
 
     if event_type == "payment.completed":
-        try:
-            txn = Transaction.objects.get(id=transaction_id)
-            PaymentService.complete_deposit(txn)
-            return {"status": "ok"}
-        except Transaction.DoesNotExist:
-            return {"status": "error", "message": "Transaction not found"}
+        _complete(_require_transaction(id=transaction_id))
+        return {"status": "ok"}
 
     return {"status": "ok"}
@@ -5,3 +5,6 @@ class SubscriptionsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.subscriptions"
     verbose_name = "Subscriptions"
+
+    def ready(self):
+        import apps.subscriptions.signals  # noqa: F401
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:05
+
+from django.db import migrations
+
+
+def percentages_to_fractions(apps, schema_editor):
+    """Seeded plans stored percentages (10.0); commission_rate is a fraction (0.10)."""
+    SubscriptionPlan = apps.get_model("subscriptions", "SubscriptionPlan")
+    for plan in SubscriptionPlan.objects.filter(commission_rate__gt=1):
+        plan.commission_rate = plan.commission_rate / 100
+        plan.save(update_fields=["commission_rate"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("subscriptions", "0002_subscription_due_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(percentages_to_fractions, migrations.RunPython.noop),
+    ]
@@ -61,6 +61,10 @@ class UserSubscription(BaseModel):
         ordering = ["-created_at"]
         verbose_name = "User Subscription"
         verbose_name_plural = "User Subscriptions"
+        indexes = [
+            # Hourly expiry/renewal sweep (status="active", end_date <= now)
+            models.Index(fields=["status", "end_date"], name="user_subscriptions_due_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.user.email} - {self.plan.name} ({self.status})"
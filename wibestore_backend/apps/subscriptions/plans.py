@@ -0,0 +1,138 @@
+"""
+WibeStore Backend - Seller Plan Cache
+Plan tier and commission rate of a seller, without subscription queries.
+
+Two layers:
+
+- ``plan_table``: every SubscriptionPlan as ``plan id -> PlanTerms`` (tier and
+  commission rate), loaded with one query and kept in memory. Plan saves and
+  deletes in this process clear it (see signals.py); other processes pick
+  changes up after SUBSCRIPTION_PLAN_TABLE_TTL seconds.
+- ``seller_plans``: ``user id -> active plan id`` in the Django cache, shared
+  by all processes. An entry never outlives the subscription's end_date and
+  is dropped whenever one of the user's UserSubscription rows is saved,
+  deleted, or renewed or expired by the hourly sweep. Sellers without a
+  subscription are cached too, for SELLER_PLAN_CACHE_TTL seconds.
+
+``SubscriptionPlan.commission_rate`` is a fraction (0.10 for 10%). Sellers on
+the free tier use settings.COMMISSION_RATES["free"].
+"""
+
+import threading
+import time
+from decimal import Decimal
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from core.utils import commission_rates
+
+KEY_PREFIX = "wibestore:seller_plan"
+
+
+class PlanTerms(NamedTuple):
+    plan_id: str | None
+    tier: str  # "free" / "premium" / "pro"
+    commission_rate: Decimal
+
+
+def _tier(plan) -> str:
+    if plan.is_pro:
+        return "pro"
+    if plan.is_premium:
+        return "premium"
+    return "free"
+
+
+class PlanTable:
+    """Thread-safe ``plan id -> PlanTerms`` mapping."""
+
+    def __init__(self):
+        self._plans = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, plan_id) -> PlanTerms:
+        """Terms of ``plan_id``; the free tier for None or an unknown plan."""
+        if not plan_id:
+            return self.free()
+        terms = self._get_plans().get(str(plan_id))
+        if terms is None:
+            # Created in another process since the table was loaded
+            self.clear()
+            terms = self._get_plans().get(str(plan_id))
+        return terms or self.free()
+
+    @staticmethod
+    def free() -> PlanTerms:
+        return PlanTerms(None, "free", commission_rates()["free"])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._plans = None
+
+    def _get_plans(self) -> dict:
+        plans = self._plans
+        ttl = settings.SUBSCRIPTION_PLAN_TABLE_TTL
+        if plans is not None and time.monotonic() - self._loaded_at < ttl:
+            return plans
+        from .models import SubscriptionPlan
+
+        with self._lock:
+            self._plans = {
+                str(plan.id): PlanTerms(str(plan.id), _tier(plan), plan.commission_rate)
+                for plan in SubscriptionPlan.objects.all()
+            }
+            self._loaded_at = time.monotonic()
+            return self._plans
+
+
+class SellerPlanCache:
+    """``user id -> PlanTerms`` of the user's active subscription."""
+
+    def get(self, user_id) -> PlanTerms:
+        entry = cache.get(self._key(user_id))
+        now = time.time()
+        if entry is None or (entry["until"] is not None and entry["until"] <= now):
+            entry = self._load(user_id)
+            timeout = settings.SELLER_PLAN_CACHE_TTL
+            if entry["until"] is not None:
+                timeout = min(timeout, entry["until"] - now)
+            if timeout > 0:
+                cache.set(self._key(user_id), entry, timeout)
+        return plan_table.get(entry["plan_id"])
+
+    def invalidate(self, user_id) -> None:
+        cache.delete(self._key(user_id))
+
+    def invalidate_many(self, user_ids) -> None:
+        if user_ids:
+            cache.delete_many([self._key(user_id) for user_id in user_ids])
+
+    @staticmethod
+    def _key(user_id) -> str:
+        return f"{KEY_PREFIX}:{user_id}"
+
+    @staticmethod
+    def _load(user_id) -> dict:
+        from .models import UserSubscription
+
+        subscription = (
+            UserSubscription.objects.filter(
+                user_id=user_id, status="active", end_date__gt=timezone.now()
+            )
+            .values("plan_id", "end_date")
+            .first()
+        )
+        if subscription is None:
+            return {"plan_id": None, "until": None}
+        return {
+            "plan_id": str(subscription["plan_id"]),
+            "until": subscription["end_date"].timestamp(),
+        }
+
+
+plan_table = PlanTable()
+seller_plans = SellerPlanCache()
@@ -3,15 +3,19 @@ WibeStore Backend - Subscriptions Services
 """
 
 import logging
+import time
 from datetime import timedelta
 from decimal import Decimal
 
+from django.contrib.auth import get_user_model
 from django.db import transaction
 from django.utils import timezone
 
+from apps.payments.ledger import BalanceLedger, Posting
 from core.exceptions import BusinessLogicError, InsufficientFundsError
 
 from .models import SubscriptionPlan, UserSubscription
+from .plans import seller_plans
 
 logger = logging.getLogger("apps.subscriptions")
 
@@ -41,9 +45,14 @@ class SubscriptionService:
             status="cancelled", cancelled_at=timezone.now()
         )
 
-        # Deduct balance
-        user.balance -= price
-        user.save(update_fields=["balance"])
+        if price:
+            BalanceLedger.debit(
+                user,
+                price,
+                "subscription",
+                f"{plan.name} subscription ({billing_period})",
+                message="Insufficient balance for subscription.",
+            )
 
         # Create subscription
         now = timezone.now()
@@ -89,17 +98,92 @@ class SubscriptionService:
         logger.info("Subscription cancelled for: %s", user.email)
         return subscription
 
+    @staticmethod
+    @transaction.atomic
+    def expire_lapsed(now=None) -> int:
+        """Expire every lapsed subscription that does not auto-renew, in one UPDATE."""
+        lapsed = UserSubscription.objects.filter(
+            status="active", auto_renew=False, end_date__lte=now or timezone.now()
+        )
+        # Lock the rows so exactly these owners get their cached plan dropped
+        user_ids = set(lapsed.select_for_update().values_list("user_id", flat=True))
+        expired = lapsed.update(status="expired")
+        transaction.on_commit(lambda: seller_plans.invalidate_many(user_ids))
+        return expired
+
+    @staticmethod
+    @transaction.atomic
+    def renew_chunk(subscription_ids, billing_period: str = "monthly") -> dict:
+        """
+        Renew lapsed auto-renewing subscriptions in place, one transaction per chunk.
+
+        Rows another run is holding are skipped. Users are locked in primary-key
+        order and charged with a single ledger posting; subscriptions whose owner
+        cannot pay (or whose plan was retired) are expired with one UPDATE, and
+        the renewed ones are written back with one bulk UPDATE.
+        """
+        started = time.perf_counter()
+        now = timezone.now()
+        subscriptions = list(
+            UserSubscription.objects.select_for_update(skip_locked=True, of=("self",))
+            .filter(id__in=subscription_ids, status="active", auto_renew=True, end_date__lte=now)
+            .select_related("user", "plan")
+            .order_by("user_id")
+        )
+        balances = dict(
+            get_user_model()
+            .objects.select_for_update()
+            .filter(pk__in={sub.user_id for sub in subscriptions})
+            .order_by("pk")
+            .values_list("pk", "balance")
+        )
+
+        duration = timedelta(days=30) if billing_period == "monthly" else timedelta(days=365)
+        renewed, expired_ids, postings = [], [], []
+        for sub in subscriptions:
+            plan = sub.plan
+            price = plan.price_monthly if billing_period == "monthly" else plan.price_yearly
+            if not plan.is_active or balances[sub.user_id] < price:
+                expired_ids.append(sub.id)
+                continue
+            balances[sub.user_id] -= price
+            if price:
+                postings.append(
+                    Posting(
+                        sub.user,
+                        -price,
+                        "subscription",
+                        f"{plan.name} subscription renewal ({billing_period})",
+                    )
+                )
+            sub.end_date = now + duration
+            sub.payment_history = [
+                *sub.payment_history,
+                {"amount": str(price), "date": now.isoformat(), "period": billing_period},
+            ]
+            renewed.append(sub)
+
+        if postings:
+            BalanceLedger.post(postings)
+        UserSubscription.objects.bulk_update(renewed, ["end_date", "payment_history"])
+        if expired_ids:
+            UserSubscription.objects.filter(id__in=expired_ids).update(status="expired")
+        # bulk_update and update() send no signals; drop the owners' cached plans
+        user_ids = {sub.user_id for sub in subscriptions}
+        transaction.on_commit(lambda: seller_plans.invalidate_many(user_ids))
+
+        stats = {
+            "requested": len(subscription_ids),
+            "renewed": len(renewed),
+            "expired": len(expired_ids),
+            "skipped": len(subscription_ids) - len(subscriptions),
+            "charged": str(sum((-posting.amount for posting in postings), Decimal(0))),
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+        logger.info("Subscription renewal chunk: %s", stats)
+        return stats
+
     @staticmethod
     def get_user_plan(user) -> str:
         """Get user's current plan type."""
-        subscription = UserSubscription.objects.filter(
-            user=user, status="active"
-        ).select_related("plan").first()
-
-        if not subscription or subscription.is_expired:
-            return "free"
-        if subscription.plan.is_pro:
-            return "pro"
-        if subscription.plan.is_premium:
-            return "premium"
-        return "free"
+        return seller_plans.get(user.pk).tier
@@ -0,0 +1,22 @@
+"""
+WibeStore Backend - Subscriptions Signals
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import SubscriptionPlan, UserSubscription
+from .plans import plan_table, seller_plans
+
+
+@receiver([post_save, post_delete], sender=UserSubscription)
+def user_subscription_invalidate_plan(sender, instance, **kwargs):
+    """Drop the cached plan of the subscription's owner (again after commit)."""
+    seller_plans.invalidate(instance.user_id)
+    transaction.on_commit(lambda: seller_plans.invalidate(instance.user_id))
+
+
+@receiver([post_save, post_delete], sender=SubscriptionPlan)
+def subscription_plan_clear_table(sender, instance, **kwargs):
+    plan_table.clear()
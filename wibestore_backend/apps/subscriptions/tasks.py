@@ -3,51 +3,110 @@ WibeStore Backend - Subscriptions Celery Tasks
 """
 
 import logging
+import time
+import uuid
 from datetime import timedelta
+from decimal import Decimal
 
-from celery import shared_task
+from celery import chord, shared_task
+from django.conf import settings
 from django.utils import timezone
 
 logger = logging.getLogger("apps.subscriptions")
 
 
 @shared_task(name="apps.subscriptions.tasks.check_subscription_expirations")
-def check_subscription_expirations() -> int:
-    """Check and expire subscriptions. Runs every hour."""
+def check_subscription_expirations() -> str:
+    """
+    Expire and renew lapsed subscriptions. Runs every hour.
+
+    Subscriptions that do not auto-renew are expired with one UPDATE. Due
+    renewals are paged by primary key and each page becomes one
+    renew_subscription_chunk task, run in parallel; report_subscription_run logs
+    the totals and per-stage timings once all chunks are done. Returns the run id.
+    """
     from .models import UserSubscription
+    from .services import SubscriptionService
 
-    expired = UserSubscription.objects.filter(
-        status="active",
-        end_date__lte=timezone.now(),
+    run_id = uuid.uuid4().hex
+    started_at = time.time()
+    now = timezone.now()
+
+    stage_started = time.perf_counter()
+    expired = SubscriptionService.expire_lapsed(now)
+    expire_seconds = time.perf_counter() - stage_started
+
+    stage_started = time.perf_counter()
+    chunk_size = settings.SUBSCRIPTION_RENEWAL_CHUNK_SIZE
+    due = UserSubscription.objects.filter(
+        status="active", auto_renew=True, end_date__lte=now
+    ).order_by("pk")
+    chunks = []
+    last_pk = None
+    while True:
+        page = due if last_pk is None else due.filter(pk__gt=last_pk)
+        ids = list(page.values_list("pk", flat=True)[:chunk_size])
+        if not ids:
+            break
+        chunks.append(renew_subscription_chunk.s([str(pk) for pk in ids]))
+        last_pk = ids[-1]
+    dispatch_seconds = time.perf_counter() - stage_started
+
+    report = report_subscription_run.s(
+        run_id=run_id,
+        started_at=started_at,
+        expired=expired,
+        stages={
+            "expire_seconds": round(expire_seconds, 3),
+            "dispatch_seconds": round(dispatch_seconds, 3),
+        },
+    )
+    if chunks:
+        chord(chunks)(report)
+    else:
+        report.delay([])
+    logger.info(
+        "Subscription run %s: expired %d, dispatched %d renewal chunks",
+        run_id,
+        expired,
+        len(chunks),
     )
+    return run_id
 
-    count = 0
-    for sub in expired:
-        if sub.auto_renew:
-            # Try auto-renew
-            try:
-                from .services import SubscriptionService
-                SubscriptionService.purchase_subscription(
-                    sub.user, sub.plan.slug, "monthly"
-                )
-                logger.info("Auto-renewed subscription for: %s", sub.user.email)
-            except Exception:
-                sub.status = "expired"
-                sub.save(update_fields=["status"])
-                count += 1
-        else:
-            sub.status = "expired"
-            sub.save(update_fields=["status"])
-            count += 1
-
-    logger.info("Expired %d subscriptions", count)
-    return count
+
+@shared_task(name="apps.subscriptions.tasks.renew_subscription_chunk")
+def renew_subscription_chunk(subscription_ids: list[str]) -> dict:
+    """Renew one chunk of lapsed auto-renewing subscriptions."""
+    from .services import SubscriptionService
+
+    return SubscriptionService.renew_chunk(subscription_ids)
+
+
+@shared_task(name="apps.subscriptions.tasks.report_subscription_run")
+def report_subscription_run(
+    results: list[dict], run_id: str, started_at: float, expired: int, stages: dict
+) -> dict:
+    """Aggregate the chunk statistics of an expiry/renewal run and log the summary."""
+    summary = {
+        "run_id": run_id,
+        "expired": expired,
+        "chunks": len(results),
+        "renewal_due": sum(result["requested"] for result in results),
+        "renewed": sum(result["renewed"] for result in results),
+        "renewal_failed": sum(result["expired"] for result in results),
+        "skipped": sum(result["skipped"] for result in results),
+        "charged": str(sum((Decimal(result["charged"]) for result in results), Decimal(0))),
+        **stages,
+        "renew_seconds": round(sum(result["seconds"] for result in results), 3),
+        "elapsed_seconds": round(max(time.time() - started_at, 0.0), 3),
+    }
+    logger.info("Subscription run %s finished: %s", run_id, summary)
+    return summary
 
 
 @shared_task(name="apps.subscriptions.tasks.send_subscription_expiring_soon_notifications")
 def send_subscription_expiring_soon_notifications() -> int:
     """Notify users whose subscription expires in 3 days."""
-    from django.conf import settings
     from .models import UserSubscription
     from apps.accounts.tasks import send_notification_email
 
@@ -32,6 +32,11 @@ app.conf.beat_schedule = {
         "task": "apps.notifications.tasks.cleanup_old_notifications",
         "schedule": crontab(hour=3, minute=0),
     },
+    # Recount Redis unread badge counters from the database (hourly)
+    "rebuild-unread-counters": {
+        "task": "apps.notifications.tasks.rebuild_unread_counters",
+        "schedule": crontab(minute=20),
+    },
     # Cleanup unverified users (daily at 4:00 AM)
     "cleanup-unverified-users": {
         "task": "apps.accounts.tasks.cleanup_unverified_users",
@@ -42,9 +47,29 @@ app.conf.beat_schedule = {
         "task": "apps.marketplace.tasks.archive_old_listings",
         "schedule": crontab(hour=5, minute=0),
     },
-    # Calculate daily statistics (daily at midnight)
+    # Flush buffered listing views into the database (every minute)
+    "flush-listing-views": {
+        "task": "apps.marketplace.tasks.flush_listing_views",
+        "schedule": crontab(),
+    },
+    # Reconcile listing favorites counters (daily at 5:30 AM)
+    "reconcile-favorites-counts": {
+        "task": "apps.marketplace.tasks.reconcile_favorites_counts",
+        "schedule": crontab(hour=5, minute=30),
+    },
+    # Release escrows whose auto-release time has passed (every minute)
+    "release-due-escrows": {
+        "task": "apps.payments.tasks.release_due_escrows",
+        "schedule": crontab(),
+    },
+    # Retry payment webhook events that failed or were never dispatched (every minute)
+    "retry-webhook-events": {
+        "task": "apps.payments.tasks.retry_webhook_events",
+        "schedule": crontab(),
+    },
+    # Refresh daily statistics for the admin dashboard (every 15 minutes)
     "calculate-daily-statistics": {
         "task": "apps.admin_panel.tasks.calculate_daily_statistics",
-        "schedule": crontab(hour=0, minute=0),
+        "schedule": crontab(minute="*/15"),
     },
 }
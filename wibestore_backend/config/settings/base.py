@@ -97,6 +97,7 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "axes.middleware.AxesMiddleware",
     "core.middleware.RequestLoggingMiddleware",
+    "core.middleware.RequestProfilingMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -219,10 +220,11 @@ REST_FRAMEWORK = {
         "anon": "30/minute",
         "user": "100/minute",
         "auth": "10/minute",
+        "suggest": "120/minute",
     },
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
+        "core.profiling.TimedJSONRenderer",
     ],
     "EXCEPTION_HANDLER": "core.exceptions.custom_exception_handler",
     "DEFAULT_VERSIONING_CLASS": "rest_framework.versioning.URLPathVersioning",
@@ -325,6 +327,9 @@ CACHES = {
     }
 }
 
+# Direct Redis access for counters and buffers (core.redis); empty disables them
+STATE_REDIS_URL = env("STATE_REDIS_URL", default="")
+
 # ============================================================
 # EMAIL
 # ============================================================
@@ -485,16 +490,102 @@ COMMISSION_RATES = {
     "pro": 0.05,
 }
 
+# ============================================================
+# PAGINATION COUNTS (core.pagination.EstimatedCountPagination)
+# ============================================================
+# Above this planner estimate, list totals are estimated instead of counted
+PAGINATION_ESTIMATE_THRESHOLD = env.int("PAGINATION_ESTIMATE_THRESHOLD", default=10_000)
+# Smaller tables (by pg_class.reltuples, cached this long) are always counted exactly
+PAGINATION_TABLE_ROWS_TTL = 300  # seconds
+# Exact counts of at least this many rows are cached per query
+PAGINATION_COUNT_CACHE_MIN = 1_000
+PAGINATION_COUNT_CACHE_TTL = 60  # seconds
+
+# ============================================================
+# RESPONSE CACHE (core.response_cache; public catalog reads)
+# ============================================================
+RESPONSE_CACHE_ENABLED = env.bool("RESPONSE_CACHE_ENABLED", default=True)
+RESPONSE_CACHE_TIMEOUT = 60  # seconds an entry is served as fresh
+# Afterwards (or after an invalidation) it is served stale while one request rebuilds it
+RESPONSE_CACHE_STALE_TTL = 300  # seconds
+
+# ============================================================
+# REQUEST PROFILING (core.profiling; stats at /health/profile/)
+# Serializer time is measured in views using core.profiling.SerializerTimingMixin
+# ============================================================
+REQUEST_PROFILING_ENABLED = env.bool("REQUEST_PROFILING_ENABLED", default=False)
+# Max queries per request, keyed by URL name; views may also set `query_budget`
+QUERY_BUDGET_DEFAULT = env.int("QUERY_BUDGET_DEFAULT", default=50)
+QUERY_BUDGETS = {
+    "marketplace:listing-list-create": 10,
+    "marketplace:listing-detail": 10,
+    "games:game-listings": 10,
+    "profile:my-listings": 10,
+    "profile:my-favorites": 10,
+}
+QUERY_BUDGET_RAISE = False
+
+# ============================================================
+# LISTING SEARCH
+# ============================================================
+# PostgreSQL text search configuration for listing search vectors
+LISTING_SEARCH_CONFIG = env("LISTING_SEARCH_CONFIG", default="simple")
+
 # ============================================================
 # ESCROW SETTINGS
 # ============================================================
 ESCROW_AUTO_RELEASE_HOURS = 24
 ESCROW_DISPUTE_WINDOW_HOURS = 48
+# Release sweeper (apps.payments.tasks.release_due_escrows, every minute):
+# escrows per transaction, parallel workers per sweep, chunks per worker run
+ESCROW_RELEASE_CHUNK_SIZE = 25
+ESCROW_RELEASE_CONCURRENCY = 4
+ESCROW_RELEASE_MAX_CHUNKS = 40
+ESCROW_RELEASE_RETRY_MINUTES = 15  # delay before retrying a failed auto-release
+
+# ============================================================
+# PAYMENT WEBHOOK INBOX
+# ============================================================
+# Failed events are retried after 30s, 60s, 120s, ... (capped), then marked dead
+WEBHOOK_MAX_ATTEMPTS = env.int("WEBHOOK_MAX_ATTEMPTS", default=8)
+WEBHOOK_RETRY_BASE_SECONDS = 30
+WEBHOOK_RETRY_MAX_SECONDS = 3600
+WEBHOOK_RETRY_BATCH = 200  # transactions dispatched per retry sweep
 
 # ============================================================
 # SUBSCRIPTION SETTINGS
 # ============================================================
 SUBSCRIPTION_EXPIRY_WARNING_DAYS = 3
+# Lapsed auto-renewing subscriptions per renewal task (one transaction each)
+SUBSCRIPTION_RENEWAL_CHUNK_SIZE = 200
+# Seller plan lookups (apps.subscriptions.plans): plan table reload interval per
+# process, and the cache TTL of sellers without a subscription (subscribed
+# sellers are cached until their end_date)
+SUBSCRIPTION_PLAN_TABLE_TTL = 300  # seconds
+SELLER_PLAN_CACHE_TTL = 3600  # seconds
+
+# ============================================================
+# CHAT (apps.messaging.persistence)
+# ============================================================
+# Chat messages are stored in batches of at most this size, at least this often
+CHAT_PERSIST_BATCH_SIZE = 200
+CHAT_PERSIST_FLUSH_INTERVAL = 0.05  # seconds
+# Room participant sets (apps.messaging.participants): Redis TTL, in-process LRU TTL/size
+CHAT_PARTICIPANT_CACHE_TTL = 3600  # seconds
+CHAT_PARTICIPANT_LOCAL_TTL = 5  # seconds; bounds staleness across processes
+CHAT_PARTICIPANT_LOCAL_SIZE = 10_000
+# Presence (Redis): a connection counts as online for this long after its last frame
+CHAT_PRESENCE_TTL = 60  # seconds; clients send {"type": "ping"} more often than this
+CHAT_PRESENCE_LAST_SEEN_TTL = 30 * 24 * 60 * 60  # seconds
+CHAT_TYPING_INTERVAL = 3  # seconds; at most one typing broadcast per user and room
+
+# ============================================================
+# NOTIFICATIONS
+# ============================================================
+# Recipients per bulk INSERT / WebSocket batch, and per Celery task for campaigns
+NOTIFICATION_BULK_CHUNK_SIZE = env.int("NOTIFICATION_BULK_CHUNK_SIZE", default=1000)
+# Seconds before a process reloads NotificationType rows changed by another process
+NOTIFICATION_TYPE_CACHE_TTL = 300
 
 # ============================================================
 # TELEGRAM OTP SETTINGS
@@ -76,6 +76,7 @@ CACHES = {
         "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
     }
 }
+STATE_REDIS_URL = None
 
 # Axes: use database handler in dev (LocMemCache is not recommended for axes)
 AXES_HANDLER = "axes.handlers.database.AxesDatabaseHandler"
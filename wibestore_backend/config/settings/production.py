@@ -133,6 +133,7 @@ if _use_redis_cache():
     }
     CELERY_BROKER_URL = REDIS_URL  # noqa: F811
     CELERY_RESULT_BACKEND = REDIS_URL  # noqa: F811
+    STATE_REDIS_URL = REDIS_URL  # noqa: F811
 else:
     # No Redis — use local memory cache and disable Redis-dependent features
     CACHES = {  # noqa: F811
@@ -145,11 +146,17 @@ else:
             "BACKEND": "channels.layers.InMemoryChannelLayer",
         }
     }
+    STATE_REDIS_URL = None  # noqa: F811
     # Axes: use database handler instead of cache when Redis unavailable
     AXES_HANDLER = "axes.handlers.database.AxesDatabaseHandler"  # noqa: F811
     # Remove Redis health check
     INSTALLED_APPS = [app for app in INSTALLED_APPS if app != "health_check.contrib.redis"]  # noqa: F811
 
+# ============================================================
+# REQUEST PROFILING (per-worker N+1 and slow-endpoint stats at /health/profile/)
+# ============================================================
+REQUEST_PROFILING_ENABLED = env.bool("REQUEST_PROFILING_ENABLED", default=True)  # noqa: F405
+
 # ============================================================
 # SENTRY (optional — only if SENTRY_DSN is configured)
 # ============================================================
@@ -37,6 +37,12 @@ EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 CELERY_TASK_ALWAYS_EAGER = True
 CELERY_TASK_EAGER_PROPAGATES = True
 
+# ============================================================
+# REQUEST PROFILING (query budgets fail the test)
+# ============================================================
+REQUEST_PROFILING_ENABLED = True
+QUERY_BUDGET_RAISE = True
+
 # ============================================================
 # CACHE (dummy for tests)
 # ============================================================
@@ -45,6 +51,7 @@ CACHES = {
         "BACKEND": "django.core.cache.backends.dummy.DummyCache",
     }
 }
+STATE_REDIS_URL = None
 
 # ============================================================
 # CHANNEL LAYERS (in-memory for tests)
@@ -59,7 +66,8 @@ CHANNEL_LAYERS = {
 # REST FRAMEWORK (disable throttling in tests)
 # ============================================================
 REST_FRAMEWORK["DEFAULT_THROTTLE_CLASSES"] = []  # noqa: F405
-REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"] = {}  # noqa: F405
+# Views with explicit throttle_classes still look up their scope; None means unlimited
+REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"] = {"suggest": None}  # noqa: F405
 
 # ============================================================
 # AXES (disable in tests)
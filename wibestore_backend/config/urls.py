@@ -7,7 +7,12 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.http import JsonResponse
 from django.urls import include, path
+from drf_spectacular.utils import extend_schema
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from core.permissions import IsAdminUser
 
 
 def health_check(request):
@@ -57,6 +62,30 @@ def health_check_detailed(request):
     return JsonResponse({"status": "ok" if status_code == 200 else "degraded", "checks": checks}, status=status_code)
 
 
+@extend_schema(tags=["Health"])
+@api_view(["GET", "DELETE"])
+@permission_classes([IsAdminUser])
+def health_check_profile(request):
+    """Per-endpoint request profile of this worker process (admin only); DELETE resets it."""
+    import os
+
+    from core.profiling import WINDOW_SIZE, registry
+
+    if request.method == "DELETE":
+        registry.reset()
+        return Response({"success": True, "message": "Profile reset."})
+    return Response(
+        {
+            "success": True,
+            "data": {
+                "pid": os.getpid(),
+                "window_size": WINDOW_SIZE,
+                "endpoints": registry.snapshot(),
+            },
+        }
+    )
+
+
 urlpatterns = [
     # Django Admin
     path("admin/", admin.site.urls),
@@ -79,6 +108,7 @@ urlpatterns = [
     # Health Checks
     path("health/", health_check, name="health-check"),
     path("health/detailed/", health_check_detailed, name="health-check-detailed"),
+    path("health/profile/", health_check_profile, name="health-check-profile"),
 ]
 
 # Include social auth URLs if available
@@ -6,6 +6,22 @@ import pytest
 from rest_framework.test import APIClient
 
 
+@pytest.fixture(autouse=True)
+def clear_notification_types():
+    """Process-local registry rows would outlive the test's rolled-back transaction."""
+    from apps.notifications.registry import notification_types
+
+    notification_types.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_participant_cache():
+    """Same for the in-process chat participant LRU."""
+    from apps.messaging.participants import participant_cache
+
+    participant_cache.clear_local()
+
+
 @pytest.fixture
 def api_client():
     """Return an unauthenticated DRF API client."""
@@ -104,3 +120,17 @@ def payment_method(db):
     from tests.factories import PaymentMethodFactory
 
     return PaymentMethodFactory()
+
+
+@pytest.fixture
+def down_redis():
+    """A Redis client whose every command fails, as during an outage."""
+
+    class DownRedis:
+        def __getattr__(self, name):
+            def fail(*args, **kwargs):
+                raise ConnectionError("redis down")
+
+            return fail
+
+    return DownRedis()
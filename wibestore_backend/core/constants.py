@@ -50,6 +50,24 @@ TRANSACTION_STATUS_CHOICES = [
     ("cancelled", "Cancelled"),
 ]
 
+BALANCE_ENTRY_KIND_CHOICES = [
+    ("opening", "Opening Balance"),
+    ("deposit", "Deposit"),
+    ("withdrawal", "Withdrawal"),
+    ("purchase", "Purchase"),
+    ("sale", "Sale"),
+    ("refund", "Refund"),
+    ("subscription", "Subscription"),
+    ("adjustment", "Adjustment"),
+]
+
+WEBHOOK_EVENT_STATUS_CHOICES = [
+    ("received", "Received"),
+    ("processed", "Processed"),
+    ("failed", "Failed (will retry)"),
+    ("dead", "Dead (retries exhausted)"),
+]
+
 # ============================================================
 # ESCROW
 # ============================================================
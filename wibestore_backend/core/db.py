@@ -0,0 +1,51 @@
+"""
+WibeStore Backend - Database Helpers
+"""
+
+from django.db import connections, router
+from django.db.models import F
+
+
+def bulk_increment(model, field_name: str, deltas: dict) -> int:
+    """
+    Add per-row deltas to an integer column: ``{pk: delta}``.
+
+    PostgreSQL gets a single ``UPDATE ... FROM (VALUES ...)`` statement; other
+    databases fall back to one ``F()`` update per row.
+    """
+    deltas = {pk: delta for pk, delta in deltas.items() if delta}
+    if not deltas:
+        return 0
+
+    using = router.db_for_write(model)
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        updated = 0
+        for pk, delta in deltas.items():
+            updated += (
+                model._base_manager.using(using)
+                .filter(pk=pk)
+                .update(**{field_name: F(field_name) + delta})
+            )
+        return updated
+
+    meta = model._meta
+    qn = connection.ops.quote_name
+    table = qn(meta.db_table)
+    pk_column = qn(meta.pk.column)
+    column = qn(meta.get_field(field_name).column)
+    pk_type = meta.pk.db_type(connection)
+
+    placeholders = ", ".join([f"(%s::{pk_type}, %s::integer)"] * len(deltas))
+    params = []
+    for pk, delta in deltas.items():
+        params.extend([str(pk), delta])
+
+    sql = (
+        f"UPDATE {table} AS t SET {column} = GREATEST(t.{column} + v.delta, 0) "
+        f"FROM (VALUES {placeholders}) AS v(pk, delta) "
+        f"WHERE t.{pk_column} = v.pk"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
@@ -4,9 +4,14 @@ WibeStore Backend - Custom Middleware
 
 import logging
 import time
+from contextlib import ExitStack
 
+from django.conf import settings
+from django.db import connections
 from django.http import HttpRequest, HttpResponse
 
+from core import profiling
+
 logger = logging.getLogger("apps")
 
 
@@ -46,3 +51,74 @@ class ContentSecurityPolicyMiddleware:
         response["X-XSS-Protection"] = "1; mode=block"
         response["Referrer-Policy"] = "strict-origin-when-cross-origin"
         return response
+
+
+class RequestProfilingMiddleware:
+    """
+    Record query count, SQL time, slowest statements, serializer and render time and
+    response size per resolved URL name (see core.profiling), and enforce query budgets.
+
+    Budgets come from the view's ``query_budget`` attribute, then
+    ``QUERY_BUDGETS[url_name]``, then ``QUERY_BUDGET_DEFAULT``. Exceeding one logs a
+    warning, or raises QueryBudgetExceededError when ``QUERY_BUDGET_RAISE`` is set (tests).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, "REQUEST_PROFILING_ENABLED", False)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if not self.enabled:
+            return self.get_response(request)
+
+        profile, token = profiling.start_request_profile()
+        start_time = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profiling.query_timer))
+                response = self.get_response(request)
+        finally:
+            profiling.end_request_profile(token)
+        duration = time.perf_counter() - start_time
+
+        match = request.resolver_match
+        if match is None or not match.view_name:
+            return response
+
+        budget = self.get_query_budget(match)
+        over_budget = budget is not None and profile.queries > budget
+        profiling.registry.record(
+            match.view_name,
+            {
+                "duration_ms": duration * 1000,
+                "queries": profile.queries,
+                "sql_ms": profile.sql_time * 1000,
+                "serializer_ms": profile.serializer_time * 1000,
+                "render_ms": profile.render_time * 1000,
+                "response_bytes": 0 if response.streaming else len(response.content),
+            },
+            profile.slowest,
+            over_budget,
+        )
+
+        if over_budget:
+            message = (
+                f"{match.view_name} ran {profile.queries} queries "
+                f"(budget {budget}): {request.method} {request.path}"
+            )
+            if getattr(settings, "QUERY_BUDGET_RAISE", False):
+                raise profiling.QueryBudgetExceededError(message)
+            logger.warning("Query budget exceeded: %s", message)
+
+        return response
+
+    @staticmethod
+    def get_query_budget(match) -> int | None:
+        view_class = getattr(match.func, "view_class", None) or getattr(match.func, "cls", None)
+        budget = getattr(view_class, "query_budget", None)
+        if budget is None:
+            budget = getattr(settings, "QUERY_BUDGETS", {}).get(match.view_name)
+        if budget is None:
+            budget = getattr(settings, "QUERY_BUDGET_DEFAULT", None)
+        return budget
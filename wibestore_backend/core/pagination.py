@@ -2,7 +2,22 @@
 WibeStore Backend - Custom Pagination Classes
 """
 
-from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+import base64
+import hashlib
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.db import connections
+from django.db.models import BooleanField, F, Func, Q, Value
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class StandardResultsSetPagination(LimitOffsetPagination):
@@ -14,9 +29,452 @@ class StandardResultsSetPagination(LimitOffsetPagination):
     offset_query_param = "offset"
 
 
+class EstimatedCountPagination(StandardResultsSetPagination):
+    """
+    Limit/offset pagination that avoids exact COUNT(*) on large result sets.
+
+    - ``?count=false`` skips the total entirely (``count`` is null).
+    - On PostgreSQL the planner's row estimate (``pg_class.reltuples`` for
+      unfiltered tables, ``EXPLAIN`` otherwise) is returned when it exceeds
+      ``PAGINATION_ESTIMATE_THRESHOLD``; ``count_is_estimate`` is then true.
+      Queries on tables below the threshold (by the cached ``reltuples``) are
+      counted exactly without running EXPLAIN.
+    - Exact counts of at least ``PAGINATION_COUNT_CACHE_MIN`` rows are cached per
+      query for ``PAGINATION_COUNT_CACHE_TTL`` seconds.
+
+    ``next`` is decided by fetching one extra row, so it stays correct whatever
+    the count.
+    """
+
+    count_query_param = "count"
+    template = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.offset = self.get_offset(request)
+        self.count_is_estimate = False
+        if self.wants_count(request):
+            self.count, self.count_is_estimate = self.get_count_info(queryset)
+        else:
+            self.count = None
+
+        rows = list(queryset[self.offset : self.offset + self.limit + 1])
+        self.has_next = len(rows) > self.limit
+        return rows[: self.limit]
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "count": self.count,
+                "count_is_estimate": self.count_is_estimate,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["required"] = ["results"]
+        response_schema["properties"]["count"]["nullable"] = True
+        response_schema["properties"]["count_is_estimate"] = {"type": "boolean"}
+        return response_schema
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            *super().get_schema_operation_parameters(view),
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Pass `false` to skip computing the total count.",
+                "schema": {"type": "boolean"},
+            },
+        ]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = replace_query_param(
+            self.request.build_absolute_uri(), self.limit_query_param, self.limit
+        )
+        return replace_query_param(url, self.offset_query_param, self.offset + self.limit)
+
+    def wants_count(self, request) -> bool:
+        value = request.query_params.get(self.count_query_param, "")
+        return value.lower() not in ("false", "0", "no", "none")
+
+    def get_count_info(self, queryset) -> tuple[int, bool]:
+        """(count, is_estimate) for the queryset."""
+        cache_key = self.get_count_cache_key(queryset)
+        cached = cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            return cached, False
+
+        threshold = getattr(settings, "PAGINATION_ESTIMATE_THRESHOLD", 10_000)
+        estimate = estimate_count(queryset)
+        if estimate is not None and estimate >= threshold:
+            return estimate, True
+
+        count = queryset.count()
+        if cache_key and count >= getattr(settings, "PAGINATION_COUNT_CACHE_MIN", 1_000):
+            cache.set(cache_key, count, getattr(settings, "PAGINATION_COUNT_CACHE_TTL", 60))
+        return count, False
+
+    @staticmethod
+    def get_count_cache_key(queryset) -> str | None:
+        try:
+            sql, params = queryset.order_by().query.sql_with_params()
+        except EmptyResultSet:
+            return None
+        digest = hashlib.md5(repr((sql, params)).encode(), usedforsecurity=False).hexdigest()
+        return f"pagination:count:{digest}"
+
+
+def estimate_count(queryset) -> int | None:
+    """
+    Planner row estimate for ``queryset`` on PostgreSQL; None elsewhere, if
+    unknown, or if the base table is too small for an estimate to pay off (a
+    filtered query never returns more rows than its base table).
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    table_rows = estimate_table_rows(queryset.model, queryset.db)
+    threshold = getattr(settings, "PAGINATION_ESTIMATE_THRESHOLD", 10_000)
+    if table_rows is None or table_rows < threshold:
+        return None
+    if not queryset.query.where:
+        return table_rows
+
+    try:
+        sql, params = queryset.order_by().query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def estimate_table_rows(model, using: str) -> int | None:
+    """``pg_class.reltuples`` of the model's table, cached for PAGINATION_TABLE_ROWS_TTL."""
+    table = model._meta.db_table
+    cache_key = f"pagination:reltuples:{using}:{table}"
+    rows = cache.get(cache_key)
+    if rows is None:
+        connection = connections[using]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)",
+                [connection.ops.quote_name(table)],
+            )
+            row = cursor.fetchone()
+        # reltuples is -1 until the table has been vacuumed/analyzed
+        rows = row[0] if row and row[0] >= 0 else -1
+        cache.set(cache_key, rows, getattr(settings, "PAGINATION_TABLE_ROWS_TTL", 300))
+    return rows if rows >= 0 else None
+
+
 class LargeResultsSetPagination(CursorPagination):
     """Cursor-based pagination for large data sets (messages, notifications)."""
 
     page_size = 50
     ordering = "-created_at"
     cursor_query_param = "cursor"
+
+
+class KeysetPagination(BasePagination):
+    """
+    Forward-only keyset ("seek") pagination for infinite scroll.
+
+    Pages continue from the last row's values of the queryset ordering, so every
+    page costs the same however deep the client scrolls, and rows inserted
+    meanwhile neither repeat nor get skipped. The primary key is appended as a
+    tie-breaker (in the direction of the last ordering key); ordering keys must be
+    non-nullable fields or annotations. Requests that pass ``offset`` fall back to
+    limit/offset pagination.
+    """
+
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = "limit"
+    cursor_query_param = "cursor"
+    fallback_class = EstimatedCountPagination
+    invalid_cursor_message = "Invalid cursor."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.fallback = None
+        ordering = self.get_ordering(queryset)
+        if ordering is None or LimitOffsetPagination.offset_query_param in request.query_params:
+            self.fallback = self.fallback_class()
+            return self.fallback.paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.ordering = ordering
+        self.page_size = self.get_page_size(request)
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded:
+            values = self.decode_cursor(encoded, queryset)
+            queryset = queryset.filter(self.seek_condition(values))
+
+        rows = list(queryset.order_by(*ordering)[: self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[: self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response(data)
+        return Response({"next": self.get_next_link(), "previous": None, "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Cursor from the previous page's `next` link.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+    def get_page_size(self, request) -> int:
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    @staticmethod
+    def get_ordering(queryset) -> list[str] | None:
+        """Queryset ordering plus a primary-key tie-breaker; None if not seekable."""
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if not ordering or not all(isinstance(key, str) for key in ordering):
+            return None
+        names = [key.lstrip("-") for key in ordering]
+        if any("__" in name or name == "?" for name in names):
+            return None
+        pk_name = queryset.model._meta.pk.name
+        if "pk" not in names and pk_name not in names:
+            descending = ordering[-1].startswith("-")
+            ordering.append(f"-{pk_name}" if descending else pk_name)
+        return ordering
+
+    def seek_condition(self, values: list, ordering: list[str] | None = None):
+        """Rows strictly after ``values`` in ``ordering`` (default: the current ordering)."""
+        ordering = ordering or self.ordering
+        keys = [key.lstrip("-") for key in ordering]
+        descending = [key.startswith("-") for key in ordering]
+
+        if all(descending) or not any(descending):
+            # Uniform direction: a single row-value comparison the index can seek on
+            operator = "<" if descending[0] else ">"
+            return _RowCompare(
+                _RowValue(*[F(key) for key in keys]),
+                _RowValue(*[Value(value) for value in values]),
+                arg_joiner=f" {operator} ",
+            )
+
+        condition = Q()
+        for i, key in enumerate(keys):
+            step = Q(**{f"{key}__{'lt' if descending[i] else 'gt'}": values[i]})
+            for previous, value in zip(keys[:i], values[:i], strict=True):
+                step &= Q(**{previous: value})
+            condition |= step
+        return condition
+
+    def get_next_link(self) -> str | None:
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        values = [getattr(last, key.lstrip("-")) for key in self.ordering]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(values))
+
+    def encode_cursor(self, values: list) -> str:
+        payload = {"o": self.ordering, "v": [_encode_value(value) for value in values]}
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+    def decode_cursor(self, encoded: str, queryset) -> list:
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded))
+            if payload["o"] != self.ordering or len(payload["v"]) != len(self.ordering):
+                raise ValueError("cursor ordering mismatch")
+            return [
+                self._decode_value(queryset, key.lstrip("-"), value)
+                for key, value in zip(self.ordering, payload["v"], strict=True)
+            ]
+        except (TypeError, ValueError, KeyError, ValidationError) as exc:
+            raise NotFound(self.invalid_cursor_message) from exc
+
+    @staticmethod
+    def _decode_value(queryset, name: str, value):
+        if name in queryset.query.annotations:
+            return value
+        field = queryset.model._meta.pk if name == "pk" else queryset.model._meta.get_field(name)
+        return field.to_python(value)
+
+
+class AnchoredKeysetPagination(KeysetPagination):
+    """
+    Keyset pagination in both directions around an anchor, for chat-style history.
+
+    Rows are always returned in the queryset ordering (oldest first for
+    messages). Without an anchor the page is the *last* ``limit`` rows; ``before``
+    loads the rows preceding the anchor and ``after`` the rows following it.
+    An anchor is either a cursor from a ``previous``/``next`` link or the primary
+    key of a row in the queryset (one extra indexed lookup), so clients can also
+    page from ids they received over a WebSocket.
+    """
+
+    before_query_param = "before"
+    after_query_param = "after"
+    page_size = 50
+    invalid_cursor_message = "Invalid anchor."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.fallback = None
+        ordering = self.get_ordering(queryset)
+        if ordering is None or LimitOffsetPagination.offset_query_param in request.query_params:
+            self.fallback = self.fallback_class()
+            return self.fallback.paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.ordering = ordering
+        self.page_size = self.get_page_size(request)
+        reverse = [key[1:] if key.startswith("-") else f"-{key}" for key in ordering]
+
+        after = request.query_params.get(self.after_query_param)
+        before = request.query_params.get(self.before_query_param)
+        if after:
+            values = self.resolve_anchor(after, queryset)
+            rows = list(
+                queryset.filter(self.seek_condition(values)).order_by(*ordering)[
+                    : self.page_size + 1
+                ]
+            )
+            self.has_next = len(rows) > self.page_size
+            self.has_previous = True
+            self.page = rows[: self.page_size]
+            return self.page
+
+        if before:
+            values = self.resolve_anchor(before, queryset)
+            queryset = queryset.filter(self.seek_condition(values, reverse))
+        # Seek backwards from the anchor (or the end) and flip the page into order
+        rows = list(queryset.order_by(*reverse)[: self.page_size + 1])
+        self.has_previous = len(rows) > self.page_size
+        self.has_next = bool(before)
+        self.page = rows[: self.page_size][::-1]
+        return self.page
+
+    def get_paginated_response(self, data):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response(data)
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.before_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Load rows before this anchor (cursor or id).",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.after_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Load rows after this anchor (cursor or id).",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+    def resolve_anchor(self, raw: str, queryset) -> list:
+        """Ordering values of the anchor row, from a cursor or a primary key."""
+        pk_field = queryset.model._meta.pk
+        try:
+            pk = pk_field.to_python(raw)
+        except ValidationError:
+            pk = None
+        if pk is not None:
+            keys = [key.lstrip("-") for key in self.ordering]
+            values = queryset.filter(pk=pk).values_list(*keys).first()
+            if values is None:
+                raise NotFound(self.invalid_cursor_message)
+            return list(values)
+        return self.decode_cursor(raw, queryset)
+
+    def get_next_link(self) -> str | None:
+        if not self.has_next or not self.page:
+            return None
+        return self._anchor_link(self.after_query_param, self.before_query_param, self.page[-1])
+
+    def get_previous_link(self) -> str | None:
+        if not self.has_previous or not self.page:
+            return None
+        return self._anchor_link(self.before_query_param, self.after_query_param, self.page[0])
+
+    def _anchor_link(self, param: str, other_param: str, row) -> str:
+        values = [getattr(row, key.lstrip("-")) for key in self.ordering]
+        url = remove_query_param(self.request.build_absolute_uri(), other_param)
+        return replace_query_param(url, param, self.encode_cursor(values))
+
+
+class _RowValue(Func):
+    template = "(%(expressions)s)"
+    arg_joiner = ", "
+
+
+class _RowCompare(Func):
+    template = "%(expressions)s"
+    output_field = BooleanField()
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    return value
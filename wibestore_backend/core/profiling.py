@@ -0,0 +1,192 @@
+"""
+WibeStore Backend - Request Profiling
+Per-endpoint SQL, serialization and rendering statistics, collected by
+``core.middleware.RequestProfilingMiddleware``.
+
+Serializer time (``serializer.data``, where to_representation and lazily loaded
+relations run) is measured only in views using ``SerializerTimingMixin``; other
+endpoints report 0. JSON encoding time is measured by ``TimedJSONRenderer``.
+
+Statistics are kept per process over a rolling window of recent requests, keyed
+by the resolved URL name (``namespace:name``).
+"""
+
+import contextvars
+import heapq
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+WINDOW_SIZE = 1000  # recent requests kept per endpoint
+SLOWEST_QUERIES = 5
+MAX_SQL_LENGTH = 500
+PERCENTILES = (50, 90, 99)
+
+_current_profile: contextvars.ContextVar = contextvars.ContextVar("request_profile", default=None)
+
+
+class QueryBudgetExceededError(Exception):
+    """A view ran more queries than its budget allows (raised only when configured)."""
+
+
+@dataclass
+class RequestProfile:
+    """Measurements for a single request."""
+
+    queries: int = 0
+    sql_time: float = 0.0
+    serializer_time: float = 0.0
+    render_time: float = 0.0
+    slowest: list = field(default_factory=list)  # min-heap of (seconds, sql)
+
+    def record_query(self, sql: str, duration: float) -> None:
+        self.queries += 1
+        self.sql_time += duration
+        entry = (duration, sql[:MAX_SQL_LENGTH])
+        if len(self.slowest) < SLOWEST_QUERIES:
+            heapq.heappush(self.slowest, entry)
+        elif duration > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+
+
+class EndpointStats:
+    """Rolling samples and slowest statements for one URL name."""
+
+    METRICS = ("duration_ms", "queries", "sql_ms", "serializer_ms", "render_ms", "response_bytes")
+
+    def __init__(self):
+        self.requests = 0
+        self.budget_exceeded = 0
+        self.samples = {metric: deque(maxlen=WINDOW_SIZE) for metric in self.METRICS}
+        self.slowest: list = []
+
+    def add(self, sample: dict, slowest: list, over_budget: bool) -> None:
+        self.requests += 1
+        self.budget_exceeded += int(over_budget)
+        for metric in self.METRICS:
+            self.samples[metric].append(sample[metric])
+        for entry in slowest:
+            if len(self.slowest) < SLOWEST_QUERIES:
+                heapq.heappush(self.slowest, entry)
+            elif entry[0] > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, entry)
+
+    def summary(self) -> dict:
+        data = {"requests": self.requests, "budget_exceeded": self.budget_exceeded}
+        for metric, values in self.samples.items():
+            data[metric] = _percentiles(values)
+        data["slowest_queries"] = [
+            {"ms": round(seconds * 1000, 2), "sql": sql}
+            for seconds, sql in sorted(self.slowest, reverse=True)
+        ]
+        return data
+
+
+class ProfileRegistry:
+    """Thread-safe, process-local store of EndpointStats."""
+
+    def __init__(self):
+        self._endpoints: dict[str, EndpointStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, sample: dict, slowest: list, over_budget: bool) -> None:
+        with self._lock:
+            stats = self._endpoints.get(name)
+            if stats is None:
+                stats = self._endpoints[name] = EndpointStats()
+            stats.add(sample, slowest, over_budget)
+
+    def snapshot(self) -> dict:
+        """Summaries per endpoint, slowest (p90 duration) first."""
+        with self._lock:
+            summaries = {name: stats.summary() for name, stats in self._endpoints.items()}
+        return dict(
+            sorted(summaries.items(), key=lambda item: item[1]["duration_ms"]["p90"], reverse=True)
+        )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+
+
+registry = ProfileRegistry()
+
+
+def _percentiles(values) -> dict:
+    ordered = sorted(values)
+    if not ordered:
+        return {f"p{p}": 0 for p in PERCENTILES} | {"max": 0}
+    result = {}
+    for p in PERCENTILES:
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        result[f"p{p}"] = round(ordered[index], 2)
+    result["max"] = round(ordered[-1], 2)
+    return result
+
+
+def start_request_profile() -> tuple[RequestProfile, contextvars.Token]:
+    profile = RequestProfile()
+    return profile, _current_profile.set(profile)
+
+
+def end_request_profile(token: contextvars.Token) -> None:
+    _current_profile.reset(token)
+
+
+def query_timer(execute, sql, params, many, context):
+    """``connection.execute_wrapper`` hook feeding the current RequestProfile."""
+    profile = _current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.record_query(sql, time.perf_counter() - started)
+
+
+def timed_data(serializer):
+    """``serializer.data``, adding its evaluation time to the current RequestProfile."""
+    profile = _current_profile.get()
+    if profile is None:
+        return serializer.data
+    started = time.perf_counter()
+    try:
+        return serializer.data
+    finally:
+        profile.serializer_time += time.perf_counter() - started
+
+
+class SerializerTimingMixin:
+    """Time response serialization of generic ``list`` and ``retrieve`` views."""
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(timed_data(serializer))
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(timed_data(serializer))
+
+    def retrieve(self, request, *args, **kwargs):
+        serializer = self.get_serializer(self.get_object())
+        return Response(timed_data(serializer))
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """JSONRenderer that adds its rendering time to the current RequestProfile."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        profile = _current_profile.get()
+        if profile is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        started = time.perf_counter()
+        try:
+            return super().render(data, accepted_media_type, renderer_context)
+        finally:
+            profile.render_time += time.perf_counter() - started
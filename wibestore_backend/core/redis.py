@@ -0,0 +1,26 @@
+"""
+WibeStore Backend - Shared Redis Client
+Direct Redis access for counters, buffers and other hot shared state.
+
+``STATE_REDIS_URL`` is unset in development/testing (and in production without
+Redis); callers must then fall back to the database path.
+"""
+
+from functools import cache
+
+from django.conf import settings
+
+
+def get_redis_client():
+    """Return the shared Redis client, or None when Redis state is disabled."""
+    url = getattr(settings, "STATE_REDIS_URL", None)
+    if not url:
+        return None
+    return _client_for_url(url)
+
+
+@cache
+def _client_for_url(url: str):
+    import redis
+
+    return redis.Redis.from_url(url, decode_responses=True, health_check_interval=30)
@@ -0,0 +1,192 @@
+"""
+WibeStore Backend - Versioned Response Cache
+Shared cache for public, read-mostly API responses.
+
+Each cached view belongs to one or more namespaces (e.g. "games", "listings").
+A namespace has a generation, the millisecond timestamp of its last change;
+model signals bump it (``bump_generation``) and every entry cached under an
+older generation becomes stale at once. Stale entries are still served while a
+single request (holding a short lock) rebuilds them; when an entry is missing
+the other requests wait up to MISS_WAIT_SECONDS for that one to fill it. Either
+way cache refills do not pile up on the database. Responses carry
+ETag/Last-Modified and answer conditional requests with 304.
+"""
+
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+KEY_PREFIX = "respcache"
+REFRESH_LOCK_TTL = 30  # seconds
+MISS_WAIT_SECONDS = 2.0  # how long a request waits for another one filling a missing entry
+MISS_POLL_INTERVAL = 0.05  # seconds
+# Query parameters that never change the response (cache busters, analytics)
+IGNORED_PARAMS = frozenset({"_", "utm_source", "utm_medium", "utm_campaign", "fbclid"})
+
+
+def _generation_key(namespace: str) -> str:
+    return f"{KEY_PREFIX}:gen:{namespace}"
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def get_generations(namespaces) -> tuple:
+    """Current generation of each namespace (initialized on first use)."""
+    keys = [_generation_key(namespace) for namespace in namespaces]
+    found = cache.get_many(keys)
+    generations = []
+    for key in keys:
+        generation = found.get(key)
+        if generation is None:
+            cache.add(key, _now_ms(), timeout=None)
+            generation = cache.get(key) or _now_ms()
+        generations.append(generation)
+    return tuple(generations)
+
+
+def bump_generation(*namespaces: str) -> None:
+    """Invalidate every response cached under ``namespaces``."""
+    keys = [_generation_key(namespace) for namespace in namespaces]
+    current = cache.get_many(keys)
+    now = _now_ms()
+    # Always move forward, even for two writes within the same millisecond
+    cache.set_many({key: max(now, current.get(key, 0) + 1) for key in keys}, timeout=None)
+
+
+def normalize_query_params(query_params) -> list:
+    """Sorted (name, values) pairs without empty values or ignored parameters."""
+    normalized = []
+    for name in sorted(query_params.keys()):
+        if name in IGNORED_PARAMS or name.startswith("utm_"):
+            continue
+        values = sorted(value.strip() for value in query_params.getlist(name) if value.strip())
+        if values:
+            normalized.append((name, values))
+    return normalized
+
+
+class CachedResponseMixin:
+    """
+    Serve GET responses of a DRF view from the versioned response cache.
+
+    Set ``response_cache_namespaces`` to the namespaces whose changes affect the
+    response. With ``response_cache_anonymous_only`` authenticated requests
+    bypass the cache (for responses that may differ per user).
+    """
+
+    response_cache_namespaces: tuple = ()
+    response_cache_anonymous_only = False
+    response_cache_timeout = None  # seconds fresh; defaults to RESPONSE_CACHE_TIMEOUT
+    response_cache_stale_ttl = None  # seconds served stale; RESPONSE_CACHE_STALE_TTL
+
+    def get(self, request, *args, **kwargs):
+        if not self.use_response_cache(request):
+            return super().get(request, *args, **kwargs)
+
+        timeout = self.response_cache_timeout or getattr(settings, "RESPONSE_CACHE_TIMEOUT", 60)
+        stale_ttl = self.response_cache_stale_ttl or getattr(
+            settings, "RESPONSE_CACHE_STALE_TTL", 300
+        )
+        generations = get_generations(self.response_cache_namespaces)
+        key = self.get_response_cache_key(request)
+        entry = cache.get(key)
+
+        lock_key, locked = f"{key}:lock", False
+        state = "HIT"
+        if entry is None:
+            # Missing: one request builds it, the others wait for its result
+            locked = cache.add(lock_key, 1, REFRESH_LOCK_TTL)
+            if not locked:
+                entry = self.wait_for_response_cache_entry(key)
+            state = "MISS" if entry is None else "WAIT"
+        elif entry["generations"] != generations or entry["fresh_until"] < time.time():
+            # Stale: one request rebuilds it, the others keep serving the old copy
+            locked = cache.add(lock_key, 1, REFRESH_LOCK_TTL)
+            state = "REFRESH" if locked else "STALE"
+
+        if state in ("MISS", "REFRESH"):
+            try:
+                response = super().get(request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                entry = self.build_response_cache_entry(response.data, generations, timeout)
+                cache.set(key, entry, timeout + stale_ttl)
+            finally:
+                if locked:
+                    cache.delete(lock_key)
+
+        return self.cached_response(request, entry, state)
+
+    @staticmethod
+    def wait_for_response_cache_entry(key: str) -> dict | None:
+        """Poll for the entry another request is building; None if it doesn't show up in time."""
+        deadline = time.monotonic() + MISS_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            time.sleep(MISS_POLL_INTERVAL)
+            entry = cache.get(key)
+            if entry is not None:
+                return entry
+            if cache.get(f"{key}:lock") is None:
+                # The builder gave up (error or non-200 response)
+                return None
+        return None
+
+    def use_response_cache(self, request) -> bool:
+        if not getattr(settings, "RESPONSE_CACHE_ENABLED", True):
+            return False
+        return not (self.response_cache_anonymous_only and request.user.is_authenticated)
+
+    def get_response_cache_key(self, request) -> str:
+        renderer = getattr(request, "accepted_renderer", None)
+        raw = json.dumps(
+            [
+                request.get_host(),
+                request.path,
+                normalize_query_params(request.query_params),
+                renderer.format if renderer else "",
+            ]
+        )
+        digest = hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+        return f"{KEY_PREFIX}:{type(self).__name__}:{digest}"
+
+    @staticmethod
+    def build_response_cache_entry(data, generations: tuple, timeout: int) -> dict:
+        body = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+        return {
+            "data": data,
+            "etag": f'"{hashlib.md5(body.encode(), usedforsecurity=False).hexdigest()}"',
+            "last_modified": max(generations) // 1000 if generations else int(time.time()),
+            "generations": generations,
+            "fresh_until": time.time() + timeout,
+        }
+
+    def cached_response(self, request, entry: dict, state: str) -> Response:
+        if_none_match = request.headers.get("If-None-Match")
+        if_modified_since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+        not_modified = (
+            if_none_match == entry["etag"]
+            if if_none_match
+            else if_modified_since is not None and entry["last_modified"] <= if_modified_since
+        )
+        if not_modified:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(entry["data"])
+
+        response["ETag"] = entry["etag"]
+        response["Last-Modified"] = http_date(entry["last_modified"])
+        response["X-Cache"] = state
+        patch_cache_control(response, no_cache=True)
+        if self.response_cache_anonymous_only:
+            patch_vary_headers(response, ("Authorization",))
+        return response
@@ -2,12 +2,17 @@
 WibeStore Backend - Utility Functions
 """
 
+import functools
 import secrets
 import string
 from decimal import Decimal
 
 from cryptography.fernet import Fernet
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+CENT = Decimal("0.01")
 
 
 def generate_otp(length: int = 6) -> str:
@@ -36,16 +41,33 @@ def decrypt_sensitive_data(encrypted_data: str) -> str:
     return fernet.decrypt(encrypted_data.encode()).decode()
 
 
-def calculate_commission(amount: Decimal, plan_type: str = "free") -> Decimal:
-    """Calculate commission based on subscription plan."""
-    rates = settings.COMMISSION_RATES
-    rate = Decimal(str(rates.get(plan_type, rates["free"])))
-    return (amount * rate).quantize(Decimal("0.01"))
+@functools.cache
+def commission_rates() -> dict[str, Decimal]:
+    """settings.COMMISSION_RATES as Decimals, built once per process."""
+    return {plan: Decimal(str(rate)) for plan, rate in settings.COMMISSION_RATES.items()}
+
+
+@receiver(setting_changed)
+def _reset_commission_rates(setting, **kwargs):
+    if setting == "COMMISSION_RATES":
+        commission_rates.cache_clear()
+
+
+def calculate_commission(
+    amount: Decimal, plan_type: str = "free", rate: Decimal | None = None
+) -> Decimal:
+    """Calculate commission based on subscription plan (or an explicit ``rate``)."""
+    if rate is None:
+        rates = commission_rates()
+        rate = rates.get(plan_type, rates["free"])
+    return (amount * rate).quantize(CENT)
 
 
-def calculate_seller_earnings(amount: Decimal, plan_type: str = "free") -> Decimal:
+def calculate_seller_earnings(
+    amount: Decimal, plan_type: str = "free", rate: Decimal | None = None
+) -> Decimal:
     """Calculate seller earnings after commission."""
-    commission = calculate_commission(amount, plan_type)
+    commission = calculate_commission(amount, plan_type, rate)
     return amount - commission
 
 
@@ -149,7 +149,7 @@ def seed_subscription_plans():
             "slug": "free",
             "price_monthly": Decimal("0"),
             "price_yearly": Decimal("0"),
-            "commission_rate": Decimal("10.0"),
+            "commission_rate": Decimal("0.10"),
             "features": {
                 "listing_limit": 5,
                 "priority_support": False,
@@ -165,7 +165,7 @@ def seed_subscription_plans():
             "slug": "premium",
             "price_monthly": Decimal("49000"),
             "price_yearly": Decimal("399000"),
-            "commission_rate": Decimal("8.0"),
+            "commission_rate": Decimal("0.08"),
             "features": {
                 "listing_limit": 20,
                 "priority_support": True,
@@ -182,7 +182,7 @@ def seed_subscription_plans():
             "slug": "pro",
             "price_monthly": Decimal("99000"),
             "price_yearly": Decimal("799000"),
-            "commission_rate": Decimal("5.0"),
+            "commission_rate": Decimal("0.05"),
             "features": {
                 "listing_limit": -1,
                 "priority_support": True,
@@ -124,7 +124,7 @@ class SubscriptionPlanFactory(DjangoModelFactory):
     slug = factory.Sequence(lambda n: f"plan-{n}")
     price_monthly = 0
     price_yearly = 0
-    commission_rate = 10.0
+    commission_rate = 0.10
     is_premium = False
     is_pro = False
     is_active = True
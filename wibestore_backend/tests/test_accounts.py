@@ -119,6 +119,23 @@ class TestMe:
         response = auth_client.patch(url, data, format="json")
         assert response.status_code == status.HTTP_200_OK
 
+    def test_profile_updates_keep_ledger_balance(self, auth_client, verified_user):
+        from decimal import Decimal
+
+        from apps.accounts.models import User
+        from apps.accounts.services import UserService
+        from apps.payments.ledger import BalanceLedger
+
+        # verified_user is the request user's stale in-memory copy
+        BalanceLedger.credit(User.objects.get(pk=verified_user.pk), Decimal("25.00"), "deposit")
+        response = auth_client.patch(reverse("accounts:me"), {"full_name": "New"}, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        UserService.update_profile(verified_user, language="ru", balance=Decimal("999"))
+
+        fresh = User.objects.get(pk=verified_user.pk)
+        assert (fresh.full_name, fresh.language) == ("New", "ru")
+        assert fresh.balance == Decimal("25.00")
+
 
 @pytest.mark.django_db
 class TestChangePassword:
@@ -0,0 +1,201 @@
+"""
+WibeStore Backend - Core Tests
+"""
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from core.profiling import QueryBudgetExceededError, registry
+
+
+@pytest.fixture(autouse=True)
+def reset_profile():
+    registry.reset()
+
+
+@pytest.mark.django_db
+class TestRequestProfiling:
+    """Tests for the request profiling middleware and its endpoint."""
+
+    def test_records_endpoint_stats(self, api_client, admin_client, listing):
+        api_client.get(reverse("marketplace:listing-list-create"))
+        response = admin_client.get(reverse("health-check-profile"))
+        assert response.status_code == status.HTTP_200_OK
+        stats = response.data["data"]["endpoints"]["marketplace:listing-list-create"]
+        assert stats["requests"] == 1
+        assert stats["queries"]["max"] > 0
+        assert stats["response_bytes"]["max"] > 0
+        assert stats["serializer_ms"]["max"] > 0
+        assert stats["render_ms"]["max"] > 0
+        assert stats["slowest_queries"]
+
+    def test_profile_requires_admin(self, auth_client):
+        response = auth_client.get(reverse("health-check-profile"))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_query_budget_raises_in_tests(self, api_client, listing, settings):
+        settings.QUERY_BUDGETS = {"marketplace:listing-list-create": 1}
+        with pytest.raises(QueryBudgetExceededError):
+            api_client.get(reverse("marketplace:listing-list-create"))
+
+    def test_query_budget_warns(self, api_client, admin_client, listing, settings):
+        settings.QUERY_BUDGETS = {"marketplace:listing-list-create": 1}
+        settings.QUERY_BUDGET_RAISE = False
+        response = api_client.get(reverse("marketplace:listing-list-create"))
+        assert response.status_code == status.HTTP_200_OK
+        stats = admin_client.get(reverse("health-check-profile")).data["data"]["endpoints"]
+        assert stats["marketplace:listing-list-create"]["budget_exceeded"] == 1
+
+
+@pytest.mark.django_db
+class TestEstimatedCountPagination:
+    """Tests for list pagination with optional and estimated totals."""
+
+    def test_exact_count_and_next(self, auth_client, verified_user):
+        from tests.factories import TransactionFactory
+
+        TransactionFactory.create_batch(3, user=verified_user)
+        url = reverse("payments:transaction-list")
+        response = auth_client.get(url, {"limit": 2})
+        assert response.data["count"] == 3
+        assert response.data["count_is_estimate"] is False
+        assert response.data["next"]
+        response = auth_client.get(response.data["next"])
+        assert len(response.data["results"]) == 1
+        assert response.data["next"] is None
+
+    def test_count_opt_out(self, auth_client, verified_user):
+        from tests.factories import TransactionFactory
+
+        TransactionFactory.create_batch(3, user=verified_user)
+        url = reverse("payments:transaction-list")
+        response = auth_client.get(url, {"limit": 2, "count": "false"})
+        assert response.data["count"] is None
+        assert len(response.data["results"]) == 2
+        assert response.data["next"]
+
+    def test_small_tables_are_counted_without_explain(self, monkeypatch, settings):
+        from django.db import connection
+
+        from apps.accounts.models import User
+        from core import pagination
+
+        settings.PAGINATION_ESTIMATE_THRESHOLD = 100
+        monkeypatch.setattr(connection, "vendor", "postgresql")
+        monkeypatch.setattr(pagination, "estimate_table_rows", lambda model, using: 50)
+        # On SQLite an EXPLAIN (FORMAT JSON) would fail, so reaching it fails the test
+        assert pagination.estimate_count(User.objects.filter(is_active=True)) is None
+
+    def test_estimate_above_threshold(self, admin_client, monkeypatch, settings):
+        settings.PAGINATION_ESTIMATE_THRESHOLD = 100
+        monkeypatch.setattr("core.pagination.estimate_count", lambda queryset: 250_000)
+        response = admin_client.get(reverse("admin_panel:users"))
+        assert response.data["count"] == 250_000
+        assert response.data["count_is_estimate"] is True
+
+    def test_exact_count_cached(self, admin_client, settings):
+        from django.core.cache import cache
+
+        from tests.factories import UserFactory
+
+        settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        settings.PAGINATION_COUNT_CACHE_MIN = 1
+        cache.clear()
+        url = reverse("admin_panel:users")
+        first = admin_client.get(url)
+        UserFactory()
+        second = admin_client.get(url)
+        assert first.data["count"] == second.data["count"] == 1
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+    """Tests for the versioned response cache on public catalog reads."""
+
+    @pytest.fixture(autouse=True)
+    def locmem_cache(self, settings):
+        from django.core.cache import cache
+
+        settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        cache.clear()
+
+    @staticmethod
+    def game_list_cache_key(url) -> str:
+        """The response cache key GameListView uses for an anonymous GET of ``url``."""
+        from rest_framework.test import APIRequestFactory
+
+        from apps.games.views import GameListView
+
+        view = GameListView(format_kwarg=None)
+        request = view.initialize_request(APIRequestFactory().get(url))
+        request.accepted_renderer, _ = view.perform_content_negotiation(request)
+        return view.get_response_cache_key(request)
+
+    def test_hit_on_repeat_with_normalized_params(self, api_client, game):
+        url = reverse("games:game-list")
+        first = api_client.get(url, {"utm_source": "ad"})
+        second = api_client.get(url, {"_": "123"})
+        assert first["X-Cache"] == "MISS"
+        assert second["X-Cache"] == "HIT"
+        assert second.data == first.data
+        assert second["ETag"] == first["ETag"]
+
+    def test_listing_save_invalidates(self, api_client, listing):
+        url = reverse("marketplace:listing-list-create")
+        api_client.get(url)
+        listing.title = "Renamed listing"
+        listing.save()
+        response = api_client.get(url)
+        assert response["X-Cache"] == "REFRESH"
+        assert response.data["results"][0]["title"] == "Renamed listing"
+        assert api_client.get(url)["X-Cache"] == "HIT"
+
+    def test_stale_served_while_refresh_locked(self, api_client, game):
+        from django.core.cache import cache
+
+        url = reverse("games:game-list")
+        api_client.get(url)
+        game.name = "Renamed game"
+        game.save()
+
+        # Hold the refresh lock of the entry the request below will read
+        key = self.game_list_cache_key(url)
+        assert cache.get(key) is not None
+        assert cache.add(f"{key}:lock", 1)
+        response = api_client.get(url)
+        assert response["X-Cache"] == "STALE"
+        assert response.data["results"][0]["name"] != "Renamed game"
+
+    def test_miss_waits_for_the_request_filling_it(self, monkeypatch, api_client, game):
+        from django.core.cache import cache
+
+        from core import response_cache
+
+        url = reverse("games:game-list")
+        lock_key = f"{self.game_list_cache_key(url)}:lock"
+        cache.add(lock_key, 1)
+        builders = []
+
+        def other_request_finishes(seconds):
+            # The lock holder completes while this request is waiting
+            if not builders:
+                cache.delete(lock_key)
+                builders.append(api_client.get(url)["X-Cache"])
+
+        monkeypatch.setattr(response_cache.time, "sleep", other_request_finishes)
+        response = api_client.get(url)
+        assert builders == ["MISS"]
+        assert response["X-Cache"] == "WAIT"
+        assert response.data["results"][0]["name"] == game.name
+
+    def test_conditional_request_not_modified(self, api_client, game):
+        url = reverse("games:game-detail", kwargs={"slug": game.slug})
+        etag = api_client.get(url)["ETag"]
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_authenticated_listing_feed_bypasses_cache(self, auth_client, listing):
+        url = reverse("marketplace:listing-list-create")
+        auth_client.get(url)
+        assert "X-Cache" not in auth_client.get(url)
@@ -81,3 +81,356 @@ class TestFavorite:
         # Remove favorite
         response = auth_client.post(url)
         assert response.status_code == status.HTTP_200_OK
+
+    def test_favorites_count_updates(self, auth_client, listing):
+        url = reverse("marketplace:listing-favorite", kwargs={"pk": listing.pk})
+        auth_client.post(url)
+        auth_client.post(url)
+        listing.refresh_from_db()
+        assert listing.favorites_count == 1
+        auth_client.delete(url)
+        auth_client.delete(url)
+        listing.refresh_from_db()
+        assert listing.favorites_count == 0
+
+    def test_reconcile_favorites_counts(self, user, listing, django_assert_num_queries):
+        from apps.marketplace.models import Favorite, Listing
+        from apps.marketplace.services import FavoriteService
+        from tests.factories import ListingFactory
+
+        drifted = ListingFactory(favorites_count=7)
+        Favorite.objects.create(user=user, listing=listing)
+        Listing.all_objects.filter(pk=listing.pk).update(favorites_count=0)
+
+        # Per batch: read the primary keys, then one UPDATE with the count subquery
+        with django_assert_num_queries(2 * 2 + 1):
+            assert FavoriteService.reconcile_favorites_counts(batch_size=1) == 2
+        listing.refresh_from_db()
+        drifted.refresh_from_db()
+        assert listing.favorites_count == 1
+        assert drifted.favorites_count == 0
+
+    def test_favorited_listing_ids(self, user, listing, django_assert_num_queries):
+        from apps.marketplace.models import Favorite
+        from apps.marketplace.selectors import get_favorited_listing_ids
+        from tests.factories import ListingFactory
+
+        other = ListingFactory()
+        Favorite.objects.create(user=user, listing=listing)
+        with django_assert_num_queries(1):
+            ids = get_favorited_listing_ids(user, [listing.pk, other.pk])
+        assert ids == {listing.pk}
+
+
+@pytest.mark.django_db
+class TestListingSearch:
+    """Tests for listing search (icontains fallback on SQLite)."""
+
+    def test_search_by_title(self, api_client):
+        from tests.factories import ListingFactory
+
+        match = ListingFactory(title="Conqueror PUBG account")
+        ListingFactory(title="Mythic Mobile Legends account")
+        url = reverse("marketplace:listing-list-create")
+        response = api_client.get(url, {"search": "conqueror"})
+        assert response.status_code == status.HTTP_200_OK
+        ids = [item["id"] for item in response.data["results"]]
+        assert ids == [str(match.id)]
+
+    def test_search_by_game_name(self, api_client):
+        from tests.factories import GameFactory, ListingFactory
+
+        game = GameFactory(name="Standoff 2")
+        match = ListingFactory(game=game)
+        ListingFactory()
+        url = reverse("marketplace:listing-list-create")
+        response = api_client.get(url, {"search": "standoff"})
+        ids = [item["id"] for item in response.data["results"]]
+        assert ids == [str(match.id)]
+
+    def test_search_selector(self):
+        from apps.marketplace.selectors import search_listings
+        from tests.factories import ListingFactory
+
+        match = ListingFactory(description="Rare glacier skins")
+        ListingFactory(status="pending", description="Rare glacier skins")
+        assert list(search_listings("glacier")) == [match]
+
+
+@pytest.mark.django_db
+class TestListingSuggest:
+    """Tests for the autocomplete endpoint."""
+
+    @pytest.fixture(autouse=True)
+    def clear_suggest_cache(self):
+        from apps.marketplace.search import _suggest_cache
+
+        _suggest_cache.clear()
+
+    def test_suggest_games_titles_and_ranks(self, api_client):
+        from tests.factories import GameFactory, ListingFactory
+
+        game = GameFactory(name="PUBG Mobile")
+        ListingFactory(game=game, title="PUBG conqueror account", rank="Conqueror")
+        ListingFactory(game=game, title="pubg conqueror account", rank="Ace")
+        url = reverse("marketplace:listing-suggest")
+        response = api_client.get(url, {"q": "pubg"})
+        assert response.status_code == status.HTTP_200_OK
+        texts = [item["text"].lower() for item in response.data["data"]]
+        assert texts == ["pubg mobile", "pubg conqueror account"]
+        assert response.data["data"][0]["slug"] == game.slug
+
+    def test_suggest_is_capped(self, api_client):
+        from tests.factories import ListingFactory
+
+        ListingFactory.create_batch(5, rank="Diamond")
+        url = reverse("marketplace:listing-suggest")
+        response = api_client.get(url, {"q": "test listing", "limit": 3})
+        assert len(response.data["data"]) == 3
+
+    def test_suggest_short_prefix(self, api_client):
+        url = reverse("marketplace:listing-suggest")
+        response = api_client.get(url, {"q": "p"})
+        assert response.data["data"] == []
+
+    def test_suggest_served_from_prefix_cache(self, api_client, django_assert_num_queries):
+        from tests.factories import ListingFactory
+
+        ListingFactory(title="Mythic skins")
+        url = reverse("marketplace:listing-suggest")
+        api_client.get(url, {"q": "Mythic"})
+        with django_assert_num_queries(0):
+            response = api_client.get(url, {"q": "  mythic "})
+        assert response.data["data"][0]["text"] == "Mythic skins"
+
+
+@pytest.mark.django_db
+class TestListingViewCounter:
+    """Tests for listing view counting."""
+
+    def test_view_counted_once_per_day(self, auth_client, listing):
+        url = reverse("marketplace:listing-view", kwargs={"pk": listing.pk})
+        first = auth_client.post(url)
+        second = auth_client.post(url)
+        assert first.data["views_count"] == 1
+        assert second.data["views_count"] == 1
+        listing.refresh_from_db()
+        assert listing.views_count == 1
+
+    def test_redis_failure_counts_view_directly(self, monkeypatch, auth_client, listing):
+        from apps.marketplace import counters
+
+        class DownRedis:
+            def eval(self, *args, **kwargs):
+                raise ConnectionError("redis down")
+
+        monkeypatch.setattr(counters, "get_redis_client", lambda: DownRedis())
+        url = reverse("marketplace:listing-view", kwargs={"pk": listing.pk})
+        response = auth_client.post(url)
+        assert response.status_code == 200
+        assert response.data["views_count"] == 1
+        listing.refresh_from_db()
+        assert listing.views_count == 1
+
+    def test_flush_without_redis_is_noop(self):
+        from apps.marketplace.counters import ListingViewCounter
+
+        assert ListingViewCounter.flush() == 0
+
+    def test_flush_drains_backlog_in_batches(self, monkeypatch, listing):
+        import json
+
+        from django.utils import timezone
+
+        from apps.marketplace import counters
+        from apps.marketplace.counters import ListingViewCounter
+
+        class BufferRedis:
+            """Just enough Redis for flush(): lists, one hash and the flush scripts."""
+
+            def __init__(self, entries):
+                self.lists = {counters.PENDING_KEY: entries}
+                self.pending_counts = {str(listing.pk): len(entries)}
+                self.reads = []
+
+            def set(self, key, value, nx=False, ex=None):
+                return True
+
+            def exists(self, key):
+                return bool(self.lists.get(key))
+
+            def rename(self, src, dst):
+                self.lists[dst] = self.lists.pop(src)
+
+            def lrange(self, key, start, stop):
+                batch = self.lists.get(key, [])[start : stop + 1]
+                self.reads.append(len(batch))
+                return batch
+
+            def eval(self, script, numkeys, *args):
+                if script == counters._SETTLE_SCRIPT:
+                    key, _, written, *pairs = args
+                    del self.lists[key][:written]
+                    for listing_id, count in zip(pairs[::2], pairs[1::2], strict=True):
+                        self.pending_counts[listing_id] -= count
+                        if self.pending_counts[listing_id] <= 0:
+                            del self.pending_counts[listing_id]
+                return 1
+
+        at = timezone.now().isoformat()
+        entries = [
+            json.dumps({"listing": str(listing.pk), "user": None, "ip": f"10.0.0.{i}", "at": at})
+            for i in range(5)
+        ]
+        client = BufferRedis(entries)
+        monkeypatch.setattr(counters, "get_redis_client", lambda: client)
+        monkeypatch.setattr(counters, "FLUSH_BATCH_SIZE", 2)
+
+        assert ListingViewCounter.flush() == 5
+        assert client.reads == [2, 2, 1, 0]
+        assert client.pending_counts == {}
+        listing.refresh_from_db()
+        assert listing.views_count == 5
+
+    def test_write_batch(self, listing, user):
+        from django.utils import timezone
+
+        from apps.marketplace.counters import ListingViewCounter
+        from apps.marketplace.models import ListingView
+
+        at = timezone.now().isoformat()
+        entries = [
+            {"listing": str(listing.pk), "user": str(user.pk), "ip": None, "at": at},
+            {"listing": str(listing.pk), "user": None, "ip": "10.0.0.1", "at": at},
+        ]
+        counts = ListingViewCounter._write_batch(entries)
+        assert counts[str(listing.pk)] == 2
+        listing.refresh_from_db()
+        assert listing.views_count == 2
+        assert ListingView.objects.filter(listing=listing).count() == 2
+
+
+def _count_queries(client, url) -> int:
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    return len(ctx.captured_queries)
+
+
+def _create_listings(count, **kwargs):
+    from apps.marketplace.models import ListingImage
+    from tests.factories import ListingFactory
+
+    listings = ListingFactory.create_batch(count, **kwargs)
+    for listing in listings:
+        ListingImage.objects.create(listing=listing, image="listings/test.jpg", is_primary=True)
+    return listings
+
+
+@pytest.mark.django_db
+class TestListingQueryCounts:
+    """Listing pages must cost the same number of queries regardless of page size."""
+
+    def assert_constant(self, client, url, create):
+        create(2)
+        small = _count_queries(client, url)
+        create(4)
+        assert _count_queries(client, url) == small
+
+    def test_listing_list(self, auth_client):
+        url = reverse("marketplace:listing-list-create")
+        self.assert_constant(auth_client, url, _create_listings)
+
+    def test_game_listings(self, auth_client, verified_user, game):
+        from apps.marketplace.models import Favorite
+
+        def create(count):
+            for listing in _create_listings(count, game=game):
+                Favorite.objects.create(user=verified_user, listing=listing)
+
+        url = reverse("games:game-listings", kwargs={"slug": game.slug})
+        self.assert_constant(auth_client, url, create)
+        response = auth_client.get(url)
+        assert all(item["is_favorited"] for item in response.data["results"])
+
+    def test_my_listings(self, auth_client, verified_user):
+        url = reverse("profile:my-listings")
+        self.assert_constant(
+            auth_client, url, lambda count: _create_listings(count, seller=verified_user)
+        )
+
+    def test_my_favorites(self, auth_client, verified_user):
+        from apps.marketplace.models import Favorite
+
+        def create(count):
+            for listing in _create_listings(count):
+                Favorite.objects.create(user=verified_user, listing=listing)
+
+        self.assert_constant(auth_client, reverse("profile:my-favorites"), create)
+
+    def test_admin_pending_listings(self, admin_client):
+        url = reverse("admin_panel:pending-listings")
+        self.assert_constant(
+            admin_client, url, lambda count: _create_listings(count, status="pending")
+        )
+
+    def test_listing_detail_is_favorited(self, auth_client, verified_user, listing):
+        from apps.marketplace.models import Favorite
+
+        Favorite.objects.create(user=verified_user, listing=listing)
+        url = reverse("marketplace:listing-detail", kwargs={"pk": listing.pk})
+        assert auth_client.get(url).data["is_favorited"] is True
+
+
+@pytest.mark.django_db
+class TestListingKeysetPagination:
+    """Tests for keyset pagination of the listing feed."""
+
+    def walk(self, client, params):
+        url = reverse("marketplace:listing-list-create")
+        response = client.get(url, params)
+        ids = []
+        while True:
+            assert response.status_code == status.HTTP_200_OK
+            ids += [item["id"] for item in response.data["results"]]
+            if not response.data["next"]:
+                return ids
+            response = client.get(response.data["next"])
+
+    def test_default_ordering(self, api_client):
+        from apps.marketplace.models import Listing
+        from tests.factories import ListingFactory
+
+        ListingFactory.create_batch(3)
+        ListingFactory.create_batch(2, is_premium=True)
+        expected = [
+            str(pk)
+            for pk in Listing.objects.order_by("-is_premium", "-created_at", "-id").values_list(
+                "id", flat=True
+            )
+        ]
+        assert self.walk(api_client, {"limit": 2}) == expected
+
+    def test_ordering_with_ties(self, api_client):
+        from apps.marketplace.models import Listing
+        from tests.factories import ListingFactory
+
+        for price in (300, 100, 100, 100, 200):
+            ListingFactory(price=price)
+        expected = [
+            str(pk) for pk in Listing.objects.order_by("price", "id").values_list("id", flat=True)
+        ]
+        assert self.walk(api_client, {"limit": 2, "ordering": "price"}) == expected
+
+    def test_invalid_cursor(self, api_client):
+        url = reverse("marketplace:listing-list-create")
+        response = api_client.get(url, {"cursor": "bogus"})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_offset_falls_back_to_limit_offset(self, api_client, listing):
+        url = reverse("marketplace:listing-list-create")
+        response = api_client.get(url, {"offset": 0})
+        assert response.data["count"] == 1
@@ -0,0 +1,404 @@
+"""
+WibeStore Backend - Messaging Tests
+"""
+
+import asyncio
+
+import pytest
+from channels.db import database_sync_to_async
+from django.urls import reverse
+from rest_framework import status
+
+from tests.factories import ChatRoomFactory, UserFactory
+
+
+@pytest.mark.django_db
+class TestWriteMessages:
+    """Tests for the batched message writer."""
+
+    def test_bulk_insert_updates_each_room_once(self, django_assert_num_queries):
+        from apps.messaging.models import Message
+        from apps.messaging.persistence import write_messages
+
+        sender = UserFactory()
+        room_a, room_b = ChatRoomFactory(), ChatRoomFactory()
+        messages = [
+            Message(room=room_a, sender=sender, content="a1"),
+            Message(room=room_b, sender=sender, content="b1"),
+            Message(room=room_a, sender=sender, content="a2"),
+        ]
+        # savepoint + INSERT + room and inbox UPDATE per room + release
+        with django_assert_num_queries(7):
+            write_messages(messages)
+
+        room_a.refresh_from_db()
+        assert room_a.last_message == "a2"
+        assert list(room_a.messages.values_list("content", flat=True)) == ["a1", "a2"]
+        assert Message.objects.filter(room=room_b).count() == 1
+
+
+@pytest.mark.django_db
+class TestParticipantCache:
+    """Tests for the cached room membership checks."""
+
+    def test_cached_after_first_lookup(self, django_assert_num_queries):
+        from apps.messaging.participants import participant_cache
+
+        member, outsider = UserFactory(), UserFactory()
+        room = ChatRoomFactory(participants=[member])
+        assert participant_cache.is_participant(room.id, member.id)
+        with django_assert_num_queries(0):
+            assert participant_cache.is_participant(room.id, member.id)
+            assert not participant_cache.is_participant(room.id, outsider.id)
+
+    def test_membership_changes_invalidate(self):
+        from apps.messaging.participants import participant_cache
+
+        member, newcomer = UserFactory(), UserFactory()
+        room = ChatRoomFactory(participants=[member])
+        assert not participant_cache.is_participant(room.id, newcomer.id)
+        room.participants.add(newcomer)
+        assert participant_cache.is_participant(room.id, newcomer.id)
+        newcomer.chat_rooms.clear()
+        assert not participant_cache.is_participant(room.id, newcomer.id)
+        room.is_active = False
+        room.save()
+        assert not participant_cache.is_participant(room.id, member.id, require_active=True)
+
+    def test_views_use_membership(self, auth_client, verified_user):
+        member_room = ChatRoomFactory(participants=[verified_user])
+        other_room = ChatRoomFactory(participants=[UserFactory()])
+
+        url = reverse("messaging:send-message", kwargs={"room_id": member_room.id})
+        assert auth_client.post(url, {"content": "hi"}).status_code == status.HTTP_201_CREATED
+        url = reverse("messaging:send-message", kwargs={"room_id": other_room.id})
+        assert auth_client.post(url, {"content": "hi"}).status_code == status.HTTP_404_NOT_FOUND
+        url = reverse("messaging:room-messages", kwargs={"room_id": other_room.id})
+        assert auth_client.get(url).data["results"] == []
+
+
+@pytest.mark.django_db
+class TestDirectRoomLookup:
+    """Tests for pair_key based room deduplication."""
+
+    def test_create_reuses_room_for_pair(self, auth_client, verified_user, listing):
+        from apps.messaging.models import ChatRoom
+        from apps.messaging.services import get_or_create_direct_room
+
+        other = UserFactory()
+        url = reverse("messaging:room-create")
+        first = auth_client.post(url, {"participant_id": str(other.id)}, format="json")
+        second = auth_client.post(url, {"participant_id": str(other.id)}, format="json")
+        assert first.data["data"]["id"] == second.data["data"]["id"]
+
+        room, created = get_or_create_direct_room(other, verified_user)
+        assert not created
+        assert str(room.id) == first.data["data"]["id"]
+        about_listing, created = get_or_create_direct_room(verified_user, other, listing.id)
+        assert created
+        assert set(about_listing.participants.all()) == {verified_user, other}
+        assert ChatRoom.objects.count() == 2
+
+    def test_existing_room_is_one_query(self, django_assert_num_queries):
+        from apps.messaging.services import get_or_create_direct_room
+
+        user, other = UserFactory(), UserFactory()
+        get_or_create_direct_room(user, other)
+        # savepoint, indexed SELECT, release
+        with django_assert_num_queries(3):
+            get_or_create_direct_room(other, user)
+
+
+@pytest.mark.django_db
+class TestInbox:
+    """Tests for the denormalized per-user inbox."""
+
+    def test_entries_follow_membership_and_messages(self, auth_client, verified_user):
+        from apps.messaging.models import InboxEntry
+
+        other, admin = UserFactory(), UserFactory(is_staff=True)
+        room = ChatRoomFactory(participants=[verified_user, other, admin])
+        entry = InboxEntry.objects.get(room=room, user=verified_user)
+        assert entry.counterpart == other
+
+        url = reverse("messaging:send-message", kwargs={"room_id": room.id})
+        auth_client.post(url, {"content": "hello"})
+        received = InboxEntry.objects.get(room=room, user=other)
+        assert received.unread_count == 1
+        assert received.last_message == "hello"
+        assert InboxEntry.objects.get(room=room, user=verified_user).unread_count == 0
+
+        room.participants.remove(admin)
+        assert not InboxEntry.objects.filter(room=room, user=admin).exists()
+        room.is_active = False
+        room.save(update_fields=["is_active"])
+        assert not InboxEntry.objects.get(room=room, user=other).is_active
+
+    def test_redis_outage_serves_inbox_offline(
+        self, monkeypatch, down_redis, auth_client, verified_user
+    ):
+        from apps.messaging import participants, presence
+        from apps.messaging.participants import participant_cache
+
+        monkeypatch.setattr(presence, "get_redis_client", lambda: down_redis)
+        monkeypatch.setattr(participants, "get_redis_client", lambda: down_redis)
+        counterpart = UserFactory()
+        room = ChatRoomFactory(participants=[verified_user, counterpart])
+
+        response = auth_client.get(reverse("messaging:room-list"))
+        assert response.status_code == 200
+        assert response.data["results"][0]["counterpart_presence"]["online"] is False
+        presence.heartbeat(counterpart.id, "conn-1")
+        presence.leave(counterpart.id, "conn-1")
+        assert participant_cache.is_participant(room.id, counterpart.id)
+        participant_cache.invalidate(room.id)
+
+    def test_inbox_keyset_pages(self, auth_client, verified_user, django_assert_max_num_queries):
+        for _ in range(3):
+            ChatRoomFactory(participants=[verified_user, UserFactory()])
+        url = reverse("messaging:room-list")
+        # auth + page query (counterparts joined, no per-room queries)
+        with django_assert_max_num_queries(3):
+            first = auth_client.get(url, {"limit": 2})
+        assert len(first.data["results"]) == 2
+        assert first.data["results"][0]["counterpart"]["id"]
+        second = auth_client.get(first.data["next"])
+        assert len(second.data["results"]) == 1
+        assert second.data["next"] is None
+
+
+@pytest.mark.django_db
+class TestReadWatermark:
+    """Tests for "read up to message X" receipts and unread counts."""
+
+    def _room_with_messages(self, reader, count=3):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        from apps.messaging.models import Message
+        from apps.messaging.services import record_new_messages
+        from tests.factories import MessageFactory
+
+        other = UserFactory()
+        room = ChatRoomFactory(participants=[reader, other])
+        messages = [MessageFactory(room=room, sender=other) for _ in range(count)]
+        base = timezone.now() - timedelta(minutes=10)
+        for i, message in enumerate(messages):
+            Message.objects.filter(pk=message.pk).update(created_at=base + timedelta(minutes=i))
+        MessageFactory(room=room, sender=reader)
+        record_new_messages(list(room.messages.order_by("created_at")))
+        return room, messages
+
+    def test_watermark_moves_forward_only(self, django_assert_num_queries):
+        from apps.messaging.selectors import get_unread_messages
+        from apps.messaging.services import mark_room_read
+
+        reader = UserFactory()
+        room, messages = self._room_with_messages(reader)
+        assert get_unread_messages(room.id, reader).count() == 3
+
+        assert mark_room_read(room.id, reader, messages[1].id)
+        assert get_unread_messages(room.id, reader).count() == 1
+        # existing watermark: one UPDATE, the is_read flags and the inbox recount
+        with django_assert_num_queries(3):
+            assert mark_room_read(room.id, reader, messages[2].id)
+        assert not mark_room_read(room.id, reader, messages[0].id)
+        assert get_unread_messages(room.id, reader).count() == 0
+        assert not room.messages.exclude(sender=reader).filter(is_read=False).exists()
+
+    def test_unknown_message_is_ignored(self):
+        import uuid
+
+        from apps.messaging.models import ChatReadState
+        from apps.messaging.services import mark_room_read
+
+        reader = UserFactory()
+        room, _ = self._room_with_messages(reader)
+        assert not mark_room_read(room.id, reader, uuid.uuid4())
+        assert not ChatReadState.objects.exists()
+
+    def test_room_list_annotates_unread_counts(self, auth_client, verified_user):
+        from apps.messaging.services import mark_room_read
+
+        room, messages = self._room_with_messages(verified_user)
+        self._room_with_messages(verified_user, count=2)
+        mark_room_read(room.id, verified_user, messages[0].id)
+
+        response = auth_client.get(reverse("messaging:room-list"))
+        counts = {row["id"]: row["unread_count"] for row in response.data["results"]}
+        assert counts[str(room.id)] == 2
+        assert sorted(counts.values()) == [2, 2]
+
+
+@pytest.mark.django_db
+class TestMessageHistory:
+    """Tests for anchored keyset paging of room history."""
+
+    def _history(self, user, count=5):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        from apps.messaging.models import Message
+        from tests.factories import MessageFactory
+
+        other = UserFactory()
+        room = ChatRoomFactory(participants=[user, other])
+        base = timezone.now() - timedelta(hours=1)
+        messages = []
+        for i in range(count):
+            message = MessageFactory(room=room, sender=other if i % 2 else user)
+            Message.objects.filter(pk=message.pk).update(created_at=base + timedelta(minutes=i))
+            messages.append(message)
+        url = reverse("messaging:room-messages", kwargs={"room_id": room.id})
+        return url, [str(message.id) for message in messages], other
+
+    def test_pages_backwards_from_latest(self, auth_client, verified_user):
+        url, ids, other = self._history(verified_user)
+
+        latest = auth_client.get(url, {"limit": 2})
+        assert [row["id"] for row in latest.data["results"]] == ids[3:]
+        assert latest.data["next"] is None
+        assert set(latest.data["senders"]) == {str(verified_user.id), str(other.id)}
+        assert latest.data["results"][0]["sender"] == str(other.id)
+
+        older = auth_client.get(latest.data["previous"])
+        assert [row["id"] for row in older.data["results"]] == ids[1:3]
+        oldest = auth_client.get(older.data["previous"])
+        assert [row["id"] for row in oldest.data["results"]] == ids[:1]
+        assert oldest.data["previous"] is None
+        newer = auth_client.get(oldest.data["next"])
+        assert [row["id"] for row in newer.data["results"]] == ids[1:3]
+
+    def test_message_id_anchors(self, auth_client, verified_user, django_assert_max_num_queries):
+        url, ids, _ = self._history(verified_user)
+
+        auth_client.get(url)  # warm the participant cache
+        # auth, anchor lookup, page, senders
+        with django_assert_max_num_queries(4):
+            after = auth_client.get(url, {"after": ids[1], "limit": 2})
+        assert [row["id"] for row in after.data["results"]] == ids[2:4]
+        assert after.data["next"]
+        before = auth_client.get(url, {"before": ids[1]})
+        assert [row["id"] for row in before.data["results"]] == ids[:1]
+
+        import uuid
+
+        assert auth_client.get(url, {"before": str(uuid.uuid4())}).status_code == 404
+        assert auth_client.get(url, {"after": "garbage"}).status_code == 404
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+class TestMessageBatcher:
+    """Tests for the write-coalescing chat batcher."""
+
+    async def test_flush_acknowledges_in_order(self):
+        from apps.messaging.models import Message
+        from apps.messaging.persistence import MessageBatcher
+
+        sender = await database_sync_to_async(UserFactory)()
+        room = await database_sync_to_async(ChatRoomFactory)()
+        batcher = MessageBatcher(batch_size=100, flush_interval=60)
+        futures = [
+            batcher.submit(Message(room_id=room.id, sender=sender, content=f"m{i}"))
+            for i in range(3)
+        ]
+        assert not any(future.done() for future in futures)
+
+        await batcher.flush()
+        stored = [future.result() for future in futures]
+        assert [message.content for message in stored] == ["m0", "m1", "m2"]
+
+        contents = await database_sync_to_async(
+            lambda: list(Message.objects.filter(room=room).values_list("content", flat=True))
+        )()
+        assert contents == ["m0", "m1", "m2"]
+        await database_sync_to_async(room.refresh_from_db)()
+        assert room.last_message == "m2"
+
+    async def test_failed_room_does_not_block_others(self):
+        import uuid
+
+        from django.db import DatabaseError
+
+        from apps.messaging.models import Message
+        from apps.messaging.persistence import MessageBatcher
+
+        sender = await database_sync_to_async(UserFactory)()
+        room = await database_sync_to_async(ChatRoomFactory)()
+        batcher = MessageBatcher(batch_size=100, flush_interval=60)
+        missing = batcher.submit(Message(room_id=uuid.uuid4(), sender=sender, content="lost"))
+        ok = batcher.submit(Message(room_id=room.id, sender=sender, content="kept"))
+
+        await batcher.flush()
+        assert isinstance(missing.exception(), DatabaseError)
+        assert ok.result().content == "kept"
+
+    async def test_unexpected_errors_resolve_every_future(self, monkeypatch):
+        from apps.messaging import persistence
+        from apps.messaging.models import Message
+        from apps.notifications.counters import UnreadCounters
+
+        sender = await database_sync_to_async(UserFactory)()
+        room = await database_sync_to_async(ChatRoomFactory)()
+
+        def counters_down(messages):
+            raise ConnectionError("redis down")
+
+        # Counter failures happen after the ack and never reach the sender
+        monkeypatch.setattr(UnreadCounters, "add_chat_messages", counters_down)
+        batcher = persistence.MessageBatcher(batch_size=100, flush_interval=60)
+        stored = batcher.submit(Message(room_id=room.id, sender=sender, content="kept"))
+        await batcher.flush()
+        assert stored.result().content == "kept"
+
+        def broken(messages):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(persistence, "write_messages", broken)
+        futures = [
+            batcher.submit(Message(room_id=room.id, sender=sender, content=f"m{i}"))
+            for i in range(2)
+        ]
+        await batcher.flush()
+        assert all(isinstance(future.exception(), RuntimeError) for future in futures)
+
+
+@pytest.mark.asyncio
+class TestTypingAndPresence:
+    """Tests for typing-indicator throttling and presence."""
+
+    async def test_typing_is_coalesced(self):
+        import uuid
+
+        from channels.layers import get_channel_layer
+
+        from apps.messaging.consumers import ChatConsumer
+
+        layer = get_channel_layer()
+        room_id = uuid.uuid4()
+        watcher = await layer.new_channel()
+        await layer.group_add(f"chat_{room_id}", watcher)
+
+        consumer = ChatConsumer()
+        consumer.channel_layer = layer
+        consumer.channel_name = await layer.new_channel()
+        consumer.user = UserFactory.build()
+        consumer.room_id, consumer.room_group_name = room_id, f"chat_{room_id}"
+        consumer.typing_sent_at = 0.0
+        consumer.presence_refreshed_at = 0.0
+        for _ in range(5):
+            await consumer.receive_json({"type": "chat.typing"})
+
+        event = await layer.receive(watcher)
+        assert event["type"] == "chat_typing"
+        assert event["user_id"] == str(consumer.user.id)
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(layer.receive(watcher), timeout=0.1)
+
+    async def test_presence_without_redis_is_offline(self):
+        from apps.messaging.presence import get_presence
+
+        assert get_presence(["a", "a", None]) == {"a": {"online": False, "last_seen": None}}
@@ -55,3 +55,154 @@ class TestUnreadCount:
         response = auth_client.get(url)
         assert response.status_code == status.HTTP_200_OK
         assert response.data["unread_count"] == 3
+
+
+@pytest.mark.django_db
+class TestBulkNotifications:
+    """Tests for the bulk notification engine."""
+
+    def test_send_bulk_chunks_and_skips_inactive(self, django_assert_max_num_queries):
+        from apps.notifications.models import Notification
+        from apps.notifications.services import NotificationService
+        from tests.factories import UserFactory
+
+        users = UserFactory.create_batch(5)
+        inactive = UserFactory(is_active=False)
+        user_ids = [user.id for user in users] + [inactive.id]
+        # type lookup + (user lookup + insert) per chunk of 3
+        with django_assert_max_num_queries(5):
+            stats = NotificationService.send_bulk(
+                user_ids, title="Sale", message="50% off", chunk_size=3
+            )
+        assert stats["sent"] == 5
+        assert stats["skipped"] == 1
+        assert Notification.objects.filter(title="Sale").count() == 5
+        assert not Notification.objects.filter(user=inactive).exists()
+
+    def test_notify_admins(self, admin_user, user):
+        from apps.notifications.models import Notification
+        from apps.notifications.services import NotificationService
+
+        assert NotificationService.notify_admins("New listing", "Review it") == 1
+        assert Notification.objects.get(title="New listing").user == admin_user
+
+    def test_campaign_reports_run(self, settings, monkeypatch, user, verified_user):
+        from celery import current_app
+
+        from apps.notifications.models import Notification
+        from apps.notifications.tasks import (
+            report_bulk_notification_run,
+            send_campaign_notification,
+        )
+        from tests.factories import UserFactory
+
+        UserFactory(is_verified=True)
+        monkeypatch.setitem(current_app.conf, "task_always_eager", True)
+        settings.NOTIFICATION_BULK_CHUNK_SIZE = 1
+        summaries = []
+        original_run = report_bulk_notification_run.run
+
+        def capture(*args, **kwargs):
+            summary = original_run(*args, **kwargs)
+            summaries.append(summary)
+            return summary
+
+        monkeypatch.setattr(report_bulk_notification_run, "run", capture)
+        send_campaign_notification.delay("Campaign", "Hello", audience={"is_verified": True})
+
+        assert Notification.objects.filter(title="Campaign").count() == 2
+        assert not Notification.objects.filter(title="Campaign", user=user).exists()
+        assert summaries[0]["chunks"] == 2
+        assert summaries[0]["sent"] == 2
+
+
+@pytest.mark.django_db
+class TestNotificationTypeRegistry:
+    """Tests for the in-process NotificationType cache."""
+
+    def test_lookups_hit_memory_after_first_load(self, user, django_assert_num_queries):
+        from apps.notifications.registry import notification_types
+        from apps.notifications.services import NotificationService
+        from tests.factories import NotificationTypeFactory
+
+        NotificationTypeFactory(code="admin")
+        notification_types.get("admin")
+        # only the notification INSERT
+        with django_assert_num_queries(1):
+            notification = NotificationService.create_notification(
+                user, "Hello", "World", type_code="admin"
+            )
+        assert notification.type.code == "admin"
+
+    def test_save_and_delete_refresh_registry(self, db):
+        from apps.notifications.registry import notification_types
+        from tests.factories import NotificationTypeFactory
+
+        assert notification_types.get("promo") is None
+        notification_type = NotificationTypeFactory(code="promo")
+        assert notification_types.get("promo") == notification_type
+        notification_type.delete()
+        assert notification_types.get("promo") is None
+
+
+@pytest.mark.django_db
+class TestBadgeCounts:
+    """Tests for the combined unread badge counts."""
+
+    def test_badges_combine_notifications_and_chat(self, auth_client, verified_user):
+        from apps.messaging.services import mark_room_read, record_new_messages
+        from tests.factories import ChatRoomFactory, MessageFactory, UserFactory
+
+        NotificationFactory.create_batch(2, user=verified_user, is_read=False)
+        other = UserFactory()
+        room = ChatRoomFactory(participants=[verified_user, other])
+        first = MessageFactory(room=room, sender=other)
+        record_new_messages([first, MessageFactory(room=room, sender=verified_user)])
+
+        url = reverse("notifications:badges")
+        data = auth_client.get(url).data["data"]
+        assert data["notifications"] == 2
+        assert data["chat"] == {str(room.id): 1}
+        assert data["chat_total"] == 1
+
+        mark_room_read(room.id, verified_user, first.id)
+        data = auth_client.get(url).data["data"]
+        assert data["chat"] == {}
+        assert data["chat_total"] == 0
+
+    def test_rebuild_without_redis_is_noop(self):
+        from apps.notifications.tasks import rebuild_unread_counters
+
+        assert rebuild_unread_counters() == 0
+
+
+@pytest.mark.django_db
+class TestUnreadCountersBestEffort:
+    """Redis errors must never break the writes that update badges."""
+
+    def test_redis_errors_are_swallowed(self, monkeypatch, down_redis, user):
+        from apps.messaging.models import Message
+        from apps.notifications import counters
+        from apps.notifications.counters import UnreadCounters
+        from tests.factories import ChatRoomFactory
+
+        monkeypatch.setattr(counters, "get_redis_client", lambda: down_redis)
+        monkeypatch.setattr(
+            UnreadCounters, "get", lambda user_id: pytest.fail("push must not recount")
+        )
+        room = ChatRoomFactory()
+        room.participants.add(user)
+
+        UnreadCounters.add_notifications([user.id])
+        UnreadCounters.add_chat_messages([Message(room=room, sender=user, content="hi")])
+        UnreadCounters.reset_notifications(user.id)
+        UnreadCounters.push([user.id])
+
+    def test_badge_counts_fall_back_to_database(self, monkeypatch, down_redis, user):
+        from apps.notifications import counters
+        from apps.notifications.counters import UnreadCounters
+
+        monkeypatch.setattr(counters, "get_redis_client", lambda: down_redis)
+        NotificationFactory(user=user)
+        assert UnreadCounters.get(user.id)["notifications"] == 1
+        assert UnreadCounters.rebuild(user.id)["notifications"] == 1
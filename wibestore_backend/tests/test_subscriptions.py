@@ -0,0 +1,193 @@
+"""
+WibeStore Backend - Subscriptions Tests
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.utils import timezone
+
+
+def lapsed_subscription(plan, auto_renew=True, balance=Decimal(0)):
+    from apps.subscriptions.models import UserSubscription
+    from tests.factories import UserFactory
+
+    now = timezone.now()
+    return UserSubscription.objects.create(
+        user=UserFactory(balance=balance),
+        plan=plan,
+        status="active",
+        start_date=now - timedelta(days=31),
+        end_date=now - timedelta(minutes=5),
+        auto_renew=auto_renew,
+    )
+
+
+@pytest.mark.django_db
+class TestSubscriptionRenewalRun:
+    """Tests for the batched expiry and renewal sweep."""
+
+    def test_renew_chunk_charges_and_expires_in_bulk(self, django_assert_max_num_queries):
+        from apps.payments.models import BalanceEntry
+        from apps.subscriptions.models import UserSubscription
+        from apps.subscriptions.services import SubscriptionService
+        from tests.factories import SubscriptionPlanFactory
+
+        plan = SubscriptionPlanFactory(price_monthly=Decimal("50.00"))
+        payers = [lapsed_subscription(plan, balance=Decimal("80.00")) for _ in range(3)]
+        broke = lapsed_subscription(plan, balance=Decimal("10.00"))
+        ids = [str(sub.id) for sub in [*payers, broke]]
+
+        # Per chunk apart from the ledger's one balance UPDATE per charged user
+        with django_assert_max_num_queries(10 + len(payers)):
+            stats = SubscriptionService.renew_chunk(ids)
+
+        assert (stats["renewed"], stats["expired"], stats["skipped"]) == (3, 1, 0)
+        assert Decimal(stats["charged"]) == Decimal("150.00")
+        statuses = dict(UserSubscription.objects.values_list("id", "status"))
+        assert {statuses[sub.id] for sub in payers} == {"active"}
+        assert statuses[broke.id] == "expired"
+        renewed = UserSubscription.objects.get(pk=payers[0].pk)
+        assert renewed.end_date > timezone.now() + timedelta(days=29)
+        assert renewed.payment_history[-1]["amount"] == "50.00"
+        payers[0].user.refresh_from_db()
+        assert payers[0].user.balance == Decimal("30.00")
+        assert BalanceEntry.objects.filter(kind="subscription").count() == 3
+
+        # A second run finds nothing left to renew
+        assert SubscriptionService.renew_chunk(ids)["skipped"] == 4
+
+    def test_hourly_run_expires_renews_and_reports(self, settings, monkeypatch):
+        from celery import current_app
+
+        from apps.subscriptions.models import UserSubscription
+        from apps.subscriptions.tasks import (
+            check_subscription_expirations,
+            report_subscription_run,
+        )
+        from tests.factories import SubscriptionPlanFactory
+
+        monkeypatch.setitem(current_app.conf, "task_always_eager", True)
+        settings.SUBSCRIPTION_RENEWAL_CHUNK_SIZE = 2
+        plan = SubscriptionPlanFactory(price_monthly=Decimal("5.00"))
+        lapsing = [lapsed_subscription(plan, auto_renew=False) for _ in range(2)]
+        renewing = [lapsed_subscription(plan, balance=Decimal("5.00")) for _ in range(3)]
+
+        summaries = []
+        original_run = report_subscription_run.run
+
+        def capture(*args, **kwargs):
+            summary = original_run(*args, **kwargs)
+            summaries.append(summary)
+            return summary
+
+        monkeypatch.setattr(report_subscription_run, "run", capture)
+        check_subscription_expirations.delay()
+
+        statuses = dict(UserSubscription.objects.values_list("id", "status"))
+        assert {statuses[sub.id] for sub in lapsing} == {"expired"}
+        assert {statuses[sub.id] for sub in renewing} == {"active"}
+        summary = summaries[0]
+        assert (summary["expired"], summary["chunks"], summary["renewed"]) == (2, 2, 3)
+        assert Decimal(summary["charged"]) == Decimal("15.00")
+        assert {"expire_seconds", "dispatch_seconds", "renew_seconds"} <= summary.keys()
+
+
+@pytest.mark.django_db
+class TestSellerPlanCache:
+    """Tests for cached seller plan and commission lookups."""
+
+    @pytest.fixture(autouse=True)
+    def locmem_cache(self, settings):
+        # The test settings use DummyCache, which would never hit
+        settings.CACHES = {
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "seller-plans",
+            }
+        }
+
+    def subscribe(self, user, plan, end_date=None):
+        from apps.subscriptions.models import UserSubscription
+
+        now = timezone.now()
+        return UserSubscription.objects.create(
+            user=user,
+            plan=plan,
+            status="active",
+            start_date=now,
+            end_date=end_date or now + timedelta(days=30),
+        )
+
+    def test_purchase_uses_plan_commission_without_subscription_queries(self, listing):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from apps.payments.services import EscrowService
+        from apps.subscriptions.plans import seller_plans
+        from tests.factories import SubscriptionPlanFactory, UserFactory
+
+        plan = SubscriptionPlanFactory(is_pro=True, commission_rate=Decimal("0.05"))
+        self.subscribe(listing.seller, plan)
+        assert seller_plans.get(listing.seller_id).tier == "pro"
+
+        buyer = UserFactory(balance=listing.price)
+        with CaptureQueriesContext(connection) as queries:
+            escrow = EscrowService.create_escrow(buyer, listing)
+        assert not [q for q in queries if "user_subscriptions" in q["sql"]]
+        assert not [q for q in queries if "subscription_plans" in q["sql"]]
+        assert escrow.commission_amount == (listing.price * Decimal("0.05")).quantize(
+            Decimal("0.01")
+        )
+        assert escrow.seller_earnings == listing.price - escrow.commission_amount
+
+    def test_subscription_changes_invalidate(self, settings, user):
+        from apps.subscriptions.plans import seller_plans
+        from apps.subscriptions.services import SubscriptionService
+        from tests.factories import SubscriptionPlanFactory
+
+        settings.COMMISSION_RATES = {"free": 0.12, "premium": 0.08, "pro": 0.05}
+        free = seller_plans.get(user.pk)
+        assert (free.tier, free.commission_rate) == ("free", Decimal("0.12"))
+
+        plan = SubscriptionPlanFactory(is_premium=True, commission_rate=Decimal("0.07"))
+        SubscriptionService.purchase_subscription(user, plan.slug)
+        assert seller_plans.get(user.pk) == (str(plan.id), "premium", Decimal("0.07"))
+
+        plan.commission_rate = Decimal("0.06")
+        plan.save()
+        assert seller_plans.get(user.pk).commission_rate == Decimal("0.06")
+
+        SubscriptionService.cancel_subscription(user)
+        assert seller_plans.get(user.pk).tier == "free"
+
+    def test_cached_plan_expires_at_end_date(self, monkeypatch, user):
+        import time
+
+        from apps.subscriptions.plans import seller_plans
+        from tests.factories import SubscriptionPlanFactory
+
+        plan = SubscriptionPlanFactory(is_pro=True)
+        end_date = timezone.now() + timedelta(minutes=5)
+        self.subscribe(user, plan, end_date=end_date)
+        assert seller_plans.get(user.pk).tier == "pro"
+
+        later = end_date + timedelta(seconds=1)
+        monkeypatch.setattr(time, "time", later.timestamp)
+        monkeypatch.setattr(timezone, "now", lambda: later)
+        assert seller_plans.get(user.pk).tier == "free"
+
+    def test_renewal_sweep_invalidates(self, django_capture_on_commit_callbacks):
+        from apps.subscriptions.plans import seller_plans
+        from apps.subscriptions.services import SubscriptionService
+        from tests.factories import SubscriptionPlanFactory
+
+        plan = SubscriptionPlanFactory(is_pro=True, price_monthly=Decimal("5.00"))
+        subscription = lapsed_subscription(plan, balance=Decimal("5.00"))
+        # Awaiting renewal: the seller is on the free tier until the sweep runs
+        assert seller_plans.get(subscription.user_id).tier == "free"
+
+        with django_capture_on_commit_callbacks(execute=True):
+            SubscriptionService.renew_chunk([str(subscription.id)])
+        assert seller_plans.get(subscription.user_id).tier == "pro"